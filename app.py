@@ -1,16 +1,92 @@
 import streamlit as st
+import hashlib
+import logging
 import os
-from config import Config
+import time
+from typing import Any, Dict, Optional
+from config import Config, allowed_file
 from database.db_manager import DatabaseManager
 from services.auth_service import AuthService
 from services.openai_service import OpenAIService
 from services.cv_analyzer import CVAnalyzer
+from services.completion_cache import build_completion_cache
+from services.question_bank import QuestionBank
+from services.answer_buffer import AnswerBuffer
+from services.interview_session import InterviewSession
+from services.job_queue import ANALYZE_CV, EVALUATE_INTERVIEW, FAILED, SUCCEEDED, build_job_queue
+from utils.log import configure_logging
+from utils.metrics import start_metrics_server
+from utils.session_cache import SessionCache
 
-# Initialize services
-db_manager = DatabaseManager()
-auth_service = AuthService(db_manager)
-openai_service = OpenAIService()
-cv_analyzer = CVAnalyzer(openai_service)
+logger = logging.getLogger(__name__)
+
+@st.cache_resource(show_spinner=False)
+def get_services() -> Dict[str, Any]:
+    """Process-wide services, built once rather than on every rerun.
+    
+    Creating the DatabaseManager runs the schema and migrations, and the
+    OpenAI service sets up its HTTP client; reruns reuse both.
+    """
+    configure_logging()
+    db_manager = DatabaseManager()
+    openai_service = OpenAIService(cache=build_completion_cache(db_manager))
+    return {
+        'db_manager': db_manager,
+        'auth_service': AuthService(db_manager),
+        'openai_service': openai_service,
+        'cv_analyzer': CVAnalyzer(openai_service, db_manager),
+    }
+
+services = get_services()
+db_manager = services['db_manager']
+auth_service = services['auth_service']
+openai_service = services['openai_service']
+cv_analyzer = services['cv_analyzer']
+
+@st.cache_resource(show_spinner=False)
+def get_question_bank() -> QuestionBank:
+    """Process-wide question bank with its background refill worker."""
+    bank = QuestionBank(db_manager, openai_service)
+    bank.start()
+    return bank
+
+question_bank = get_question_bank()
+
+@st.cache_resource(show_spinner=False)
+def get_job_queue():
+    """Process-wide background job queue with its worker threads."""
+    queue = build_job_queue(db_manager, openai_service, cv_analyzer)
+    queue.start()
+    return queue
+
+job_queue = get_job_queue()
+
+@st.cache_resource(show_spinner=False)
+def get_metrics_server():
+    """Prometheus /metrics endpoint for this process, if enabled and the port is free."""
+    if not Config.METRICS_ENABLED or not Config.METRICS_PORT:
+        return None
+    try:
+        return start_metrics_server()
+    except OSError as e:
+        logger.warning("Metrics endpoint not started", extra={'port': Config.METRICS_PORT,
+                                                              'error': str(e)})
+        return None
+
+get_metrics_server()
+
+def data_cache() -> SessionCache:
+    """Database reads cached for this session; see invalidate_user_data."""
+    return SessionCache(st.session_state)
+
+def invalidate_user_data(interview_id: Optional[int] = None):
+    """Forget cached reads changed by a write to the user's interviews."""
+    cache = data_cache()
+    user_id = st.session_state.user['id']
+    cache.invalidate('history', user_id)
+    cache.invalidate('stats', user_id)
+    if interview_id is not None:
+        cache.invalidate('interview', interview_id)
 
 # Page configuration
 st.set_page_config(
@@ -74,7 +150,12 @@ def show_main_app():
     with st.sidebar:
         st.write(f"👤 Welcome, {st.session_state.user['username']}!")
         if st.button("Logout"):
+            if st.session_state.get('active_interview'):
+                # Store the answers given so far
+                st.session_state.active_interview.close()
+                st.session_state.active_interview = None
             st.session_state.user = None
+            data_cache().clear()
             st.rerun()
         
         st.divider()
@@ -90,6 +171,10 @@ def show_main_app():
 
 def show_new_interview_page():
     """Page for starting a new interview."""
+    if st.session_state.get('active_interview'):
+        show_active_interview()
+        return
+    
     st.header("Start New Interview")
     
     col1, col2 = st.columns(2)
@@ -97,26 +182,196 @@ def show_new_interview_page():
     with col1:
         difficulty = st.selectbox(
             "Difficulty Level",
-            ["easy", "medium", "hard"]
+            Config.DIFFICULTY_LEVELS
         )
         num_questions = st.slider("Number of Questions", 3, 10, 5)
     
     with col2:
         use_cv = st.checkbox("Upload CV for personalized questions")
+        topic = None
+        if Config.QUESTION_BANK_TOPICS and not use_cv:
+            topic = st.selectbox("Topic", ["General"] + Config.QUESTION_BANK_TOPICS)
+            if topic == "General":
+                topic = None
         
     cv_file = None
+    cv_job_id = None
     if use_cv:
         cv_file = st.file_uploader("Upload your CV (PDF)", type=['pdf'])
+        if cv_file is not None and Config.BACKGROUND_JOBS:
+            # Start analyzing right away, while the user picks the other options
+            if allowed_file(cv_file.name) and cv_file.size <= Config.MAX_FILE_SIZE:
+                cv_job_id = queue_cv_analysis(cv_file.getvalue())
     
     if st.button("Start Interview", type="primary"):
-        st.info("Interview feature coming soon! The backend is now set up.")
-        # TODO: Implement interview logic
+        if use_cv and cv_file is None:
+            st.error("Please upload your CV or uncheck the CV option.")
+            return
+        
+        user_id = st.session_state.user['id']
+        cv_filename = None
+        cv_analysis = None
+        cv_document_id = None
+        # In adaptive mode only the first question is planned; the session
+        # generates the rest while the user is answering.
+        planned_count = 1 if Config.INTERVIEW_ADAPTIVE_QUESTIONS else num_questions
+        try:
+            with st.spinner("Preparing your interview..."):
+                if cv_file is not None:
+                    if not allowed_file(cv_file.name) or cv_file.size > Config.MAX_FILE_SIZE:
+                        st.error("Please upload a PDF file smaller than 10MB.")
+                        return
+                    cv_filename = cv_file.name
+                    if cv_job_id is not None:
+                        result = wait_for_cv_analysis(cv_job_id)
+                    else:
+                        result = cv_analyzer.analyze_cv_bytes(cv_file.getvalue())
+                    if not result['success']:
+                        st.error(f"CV analysis failed: {result.get('error', 'unknown error')}")
+                        return
+                    # A new set every time, or the same CV would repeat its questions
+                    questions = cv_analyzer.generate_cv_based_questions(
+                        result['analysis'], planned_count, difficulty, use_cache=False
+                    )
+                    if not questions:
+                        # Keep the interview going with general questions
+                        st.info("Could not tailor questions to your CV right now; "
+                                "using general questions instead.")
+                        questions = question_bank.draw(user_id, planned_count, difficulty, topic)
+                    # Interviews reference the shared CV record when there is one
+                    cv_document_id = result.get('cv_document_id')
+                    cv_analysis = result['analysis']
+                else:
+                    questions = question_bank.draw(user_id, planned_count, difficulty, topic)
+                
+                if not questions:
+                    st.error("Could not generate questions. Please try again.")
+                    return
+                
+                st.session_state.active_interview = InterviewSession(
+                    db_manager, openai_service, user_id, difficulty, num_questions,
+                    planned=questions, topic=topic, cv_filename=cv_filename,
+                    cv_analysis=cv_analysis, cv_document_id=cv_document_id
+                )
+                invalidate_user_data()
+        except Exception as e:
+            st.error(f"Could not prepare the interview: {e}")
+            return
+        
+        st.rerun()
+
+def queue_cv_analysis(data: bytes) -> int:
+    """Store an uploaded CV and queue its analysis; return the job ID."""
+    content_hash = hashlib.sha256(data).hexdigest()
+    jobs = st.session_state.setdefault('cv_jobs', {})
+    if content_hash not in jobs:
+        # The bytes wait in the database, not on disk; the job only names them
+        db_manager.save_cv_upload(content_hash, data)
+        jobs[content_hash] = job_queue.enqueue(
+            ANALYZE_CV, {'content_hash': content_hash},
+            idempotency_key=f"{ANALYZE_CV}:{content_hash}"
+        )
+    return jobs[content_hash]
+
+def wait_for_cv_analysis(job_id: int) -> Dict[str, Any]:
+    """Wait for a queued CV analysis and return it like analyze_cv_bytes."""
+    job = job_queue.wait(job_id, timeout=Config.OPENAI_REQUEST_TIMEOUT * 2)
+    if job['status'] == FAILED:
+        return {'success': False, 'error': job['last_error']}
+    if job['status'] != SUCCEEDED:
+        return {'success': False, 'error': 'the analysis is still running, please try again shortly'}
+    document = db_manager.get_cv_document(job['result']['cv_document_id'])
+    return {
+        'raw_text': document['extracted_text'],
+        'analysis': document['analysis'],
+        'success': True,
+        'cached': job['result']['cached'],
+        'cv_document_id': document['id']
+    }
+
+def show_active_interview():
+    """Ask the questions of the active interview one at a time."""
+    session = st.session_state.active_interview
+    turn = session.current
+    
+    if turn is not None:
+        index = len(session.turns) - 1
+        total = session.num_questions
+        st.header(f"Question {index + 1} of {total}")
+        st.progress(index / total)
+        if turn['kind'] == 'follow_up':
+            st.caption("Follow-up on one of your earlier answers")
+        st.write(turn['question'])
+        answer = st.text_area(
+            "Your answer",
+            key=f"answer_{session.interview_id}_{index}",
+            height=200
+        )
+        
+        if st.button("Submit Answer", type="primary"):
+            if not answer.strip():
+                st.warning("Please write an answer before submitting.")
+            else:
+                try:
+                    with st.spinner("Loading the next question..."):
+                        session.submit_answer(answer.strip())
+                    invalidate_user_data(session.interview_id)
+                except Exception as e:
+                    st.error(f"Could not load the next question: {e}")
+                    return
+                st.rerun()
+        
+        # Grades of earlier answers arrive in the background
+        graded = [(i, g) for i, g in enumerate(session.grades()) if g and g['success']]
+        if graded:
+            with st.expander("Feedback on your previous answers"):
+                for i, grade in graded:
+                    st.write(f"**Question {i + 1}:** {grade['score']:.1f}/10 - {grade['feedback']}")
+    else:
+        st.header("Interview Evaluation")
+        result = show_interview_evaluation(session.interview_id)
+        if Config.BACKGROUND_JOBS:
+            # Reruns the page until the queued evaluation has finished
+            poll_evaluation_jobs()
+        session.close()
+        st.session_state.active_interview = None
+        if result:
+            st.success(f"Interview completed! Overall score: {result['overall_score']:.1f}%")
+        timing = session.stats()
+        with st.expander("Session timing"):
+            st.write(f"Waiting avoided by preparing questions in the background: "
+                     f"{timing['total_saved']:.1f}s (you waited {timing['total_wait']:.1f}s)")
+            st.write(f"Answers graded in the background: {timing['total_grade_time']:.1f}s")
+            for i, turn in enumerate(timing['turns']):
+                st.write(f"Question {i + 1} ({turn['kind']}): waited {turn['question_wait']:.1f}s, "
+                         f"saved {turn['saved']:.1f}s")
+        st.button("Start Another Interview")
 
 def show_my_interviews_page():
-    """Page showing user's interview history."""
+    """Page showing user's interview history, one page at a time."""
     st.header("My Interview History")
     
-    interviews = db_manager.get_user_interviews(st.session_state.user['id'])
+    user_id = st.session_state.user['id']
+    query = st.text_input("Search your questions, answers and feedback",
+                          placeholder="e.g. distributed caching").strip()
+    if query:
+        show_search_results(user_id, query)
+        return
+    
+    pages = st.session_state.setdefault('history_pages', 1)
+    interviews = []
+    cursor = None
+    for _ in range(pages):
+        page = data_cache().get(
+            ('history', user_id, cursor),
+            lambda cursor=cursor: db_manager.get_user_interviews_page(
+                user_id, Config.HISTORY_PAGE_SIZE, before=cursor
+            )
+        )
+        interviews.extend(page['interviews'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
     
     if not interviews:
         st.info("You haven't taken any interviews yet. Start your first interview!")
@@ -128,6 +383,172 @@ def show_my_interviews_page():
                 if interview['score']:
                     st.write(f"**Score:** {interview['score']:.1f}%")
                 st.write(f"**Status:** {interview['status']}")
+                if interview['status'] == 'in_progress':
+                    if interview['id'] in st.session_state.get('evaluation_jobs', {}):
+                        show_evaluation_job(interview['id'])
+                    elif st.button("Evaluate Interview", key=f"evaluate_{interview['id']}"):
+                        show_interview_evaluation(interview['id'])
+                # Questions and evaluation are only read for the interviews opened
+                if st.toggle("Show details", key=f"details_{interview['id']}"):
+                    show_interview_details(interview['id'])
+        
+        if cursor is not None and st.button("Load more"):
+            st.session_state.history_pages = pages + 1
+            st.rerun()
+        
+        if Config.BACKGROUND_JOBS:
+            poll_evaluation_jobs()
+
+def show_search_results(user_id: int, query: str):
+    """Matches from the user's history, best first, one page at a time."""
+    if st.session_state.get('search_query') != query:
+        st.session_state.search_query = query
+        st.session_state.search_pages = 1
+    pages = st.session_state.search_pages
+    results = []
+    cursor = 0
+    for _ in range(pages):
+        page = data_cache().get(
+            ('history', user_id, 'search', query, cursor),
+            lambda cursor=cursor: db_manager.search_history(
+                user_id, query, Config.SEARCH_PAGE_SIZE, offset=cursor
+            )
+        )
+        results.extend(page['results'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    
+    if not results:
+        st.info("Nothing in your interviews matches that search.")
+        return
+    for i, result in enumerate(results):
+        source = "Question or answer" if result['kind'] == 'question' else "Evaluation"
+        st.markdown(f"**{source}** from the interview on {result['created_at']} "
+                    f"({result['difficulty_level']})")
+        st.markdown(f"> {result['snippet']}")
+        if st.toggle("Show interview", key=f"search_details_{i}"):
+            show_interview_details(result['interview_id'])
+    
+    if cursor is not None and st.button("More results"):
+        st.session_state.search_pages = pages + 1
+        st.rerun()
+
+def show_interview_details(interview_id: int):
+    """Show the questions, answers and evaluation of a past interview."""
+    if Config.ANSWER_WRITE_BEHIND:
+        # Answers submitted moments ago may still be waiting in the buffer
+        if AnswerBuffer.for_database(db_manager).flush_interview(interview_id):
+            data_cache().invalidate('interview', interview_id)
+    details = data_cache().get(('interview', interview_id), lambda: {
+        'questions': db_manager.get_interview_questions(interview_id),
+        'evaluation': db_manager.get_interview_evaluation(interview_id),
+    })
+    for question in details['questions']:
+        st.write(f"**Q{question['question_order']}:** {question['question_text']}")
+        if question['answer_text']:
+            st.write(question['answer_text'])
+        else:
+            st.caption("Not answered")
+    
+    evaluation = details['evaluation']
+    if evaluation is not None:
+        st.markdown("---")
+        st.markdown(evaluation['evaluation_text'])
+
+def show_interview_evaluation(interview_id: int) -> Optional[Dict[str, Any]]:
+    """Evaluate an interview and show the result.
+    
+    With background jobs the evaluation is queued and its progress shown;
+    the result is returned once the job has finished.
+    """
+    if Config.BACKGROUND_JOBS:
+        return show_evaluation_job(interview_id)
+    return stream_interview_evaluation(interview_id)
+
+def show_evaluation_job(interview_id: int) -> Optional[Dict[str, Any]]:
+    """Queue the evaluation of an interview (once) and show its status."""
+    jobs = st.session_state.setdefault('evaluation_jobs', {})
+    if interview_id not in jobs:
+        jobs[interview_id] = job_queue.enqueue(
+            EVALUATE_INTERVIEW, {'interview_id': interview_id},
+            idempotency_key=f"{EVALUATE_INTERVIEW}:{interview_id}"
+        )
+    job = job_queue.get(jobs[interview_id])
+    
+    if job['status'] == SUCCEEDED:
+        evaluation = db_manager.get_interview_evaluation(interview_id)
+        st.markdown(evaluation['evaluation_text'])
+        return {
+            'overall_score': evaluation['score'],
+            'evaluation_text': evaluation['evaluation_text'],
+            'feedback': evaluation['feedback'],
+            'success': True
+        }
+    if job['status'] == FAILED:
+        st.error(f"Evaluation failed: {job['last_error']}")
+        if st.button("Try Again", key=f"retry_evaluation_{interview_id}"):
+            # Enqueueing the same key again requeues the failed job
+            st.session_state.setdefault('settled_jobs', set()).discard(jobs.pop(interview_id))
+            st.rerun()
+        return None
+    
+    st.info(f"Grading your answers in the background (attempt "
+            f"{max(1, job['attempts'])} of {job['max_attempts']})...")
+    return None
+
+def settle_evaluation_jobs() -> bool:
+    """Drop cached reads for evaluation jobs that have finished since the last check.
+    
+    A finished job wrote to its interview in a worker thread, so this
+    session's cached history and stats no longer match the database.
+    Returns True while any evaluation job of this session is pending.
+    """
+    settled = st.session_state.setdefault('settled_jobs', set())
+    pending = False
+    for interview_id, job_id in st.session_state.get('evaluation_jobs', {}).items():
+        if job_id in settled:
+            continue
+        if job_queue.get(job_id)['status'] in (SUCCEEDED, FAILED):
+            settled.add(job_id)
+            invalidate_user_data(interview_id)
+        else:
+            pending = True
+    return pending
+
+def poll_evaluation_jobs():
+    """Rerun the page shortly while any evaluation job of this session is pending."""
+    if settle_evaluation_jobs():
+        time.sleep(Config.JOB_POLL_INTERVAL)
+        st.rerun()
+
+def stream_interview_evaluation(interview_id: int) -> Optional[Dict[str, Any]]:
+    """Evaluate an interview inline, rendering the feedback as it streams in."""
+    questions = db_manager.get_interview_questions(interview_id)
+    if not questions or any(not q['answer_text'] for q in questions):
+        st.warning("Answer all questions before requesting an evaluation.")
+        return None
+    
+    questions_and_answers = [
+        {'question': q['question_text'], 'answer': q['answer_text']}
+        for q in questions
+    ]
+    stream = openai_service.stream_interview_evaluation(questions_and_answers)
+    st.write_stream(iter(stream))
+    
+    result = stream.result
+    if not result['success']:
+        st.error(result['evaluation_text'])
+        return None
+    
+    # Persist once the full text has arrived and been parsed
+    db_manager.create_evaluation(
+        interview_id, result['evaluation_text'],
+        result['overall_score'], result['feedback']
+    )
+    db_manager.update_interview_status(interview_id, 'completed', result['overall_score'])
+    invalidate_user_data(interview_id)
+    return result
 
 def show_profile_page():
     """Page showing user profile."""
@@ -139,23 +560,25 @@ def show_profile_page():
     st.write(f"**Member since:** {user['created_at']}")
     
     # Statistics
-    interviews = db_manager.get_user_interviews(user['id'])
+    settle_evaluation_jobs()
+    stats = data_cache().get(('stats', user['id']), lambda: db_manager.get_user_stats(user['id']))
     st.subheader("Statistics")
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        st.metric("Total Interviews", len(interviews))
+        st.metric("Total Interviews", stats['total_interviews'])
     
     with col2:
-        completed = len([i for i in interviews if i['status'] == 'completed'])
-        st.metric("Completed", completed)
+        st.metric("Completed", stats['completed_interviews'])
     
     with col3:
-        if completed > 0:
-            avg_score = sum(i['score'] for i in interviews if i['score']) / completed
-            st.metric("Average Score", f"{avg_score:.1f}%")
+        if stats['average_score'] is not None:
+            st.metric("Average Score", f"{stats['average_score']:.1f}%")
         else:
             st.metric("Average Score", "N/A")
+    
+    if stats['last_activity_at']:
+        st.caption(f"Last activity: {stats['last_activity_at']}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Token savings and run time of CV compaction over a synthetic CV corpus.
+
+Usage:
+    python -m benchmarks.bench_cv_compaction --cvs 500 --budget 1500
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from collections import Counter
+
+from benchmarks.synthetic import synthetic_cv_text
+from services.cv_compactor import CVCompactor
+from utils.tokens import count_tokens, tiktoken
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cvs', type=int, default=500, help='number of synthetic CVs')
+    parser.add_argument('--budget', type=int, default=1500, help='token budget per CV')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = [
+        synthetic_cv_text(rng, jobs=rng.randint(1, 12), pages=rng.randint(1, 6))
+        for _ in range(args.cvs)
+    ]
+
+    compactor = CVCompactor(args.budget)
+    durations = []
+    savings = []
+    over_budget = 0
+    dropped = Counter()
+    for text in corpus:
+        start = time.perf_counter()
+        result = compactor.compact(text)
+        durations.append((time.perf_counter() - start) * 1000)
+        savings.append(result['saved_tokens'] / max(1, result['original_tokens']))
+        over_budget += result['compacted_tokens'] > args.budget
+        dropped.update(result['dropped_sections'])
+
+    stats = compactor.stats()
+    durations.sort()
+    results = {
+        'cvs': args.cvs,
+        'budget': args.budget,
+        'tokenizer': 'tiktoken' if tiktoken is not None else 'approximate',
+        'original_tokens': stats['original_tokens'],
+        'compacted_tokens': stats['compacted_tokens'],
+        'saved_tokens': stats['saved_tokens'],
+        'saved_ratio_mean': statistics.mean(savings),
+        'max_original_tokens': max(count_tokens(text) for text in corpus),
+        'over_budget': over_budget,
+        'dropped_sections': dict(dropped),
+        'p50_ms': durations[len(durations) // 2],
+        'p99_ms': durations[min(len(durations) - 1, int(len(durations) * 0.99))],
+    }
+
+    print(f"CVs: {args.cvs}, budget: {args.budget} tokens ({results['tokenizer']} tokenizer)")
+    print(f"Tokens: {stats['original_tokens']:,} -> {stats['compacted_tokens']:,} "
+          f"({results['saved_ratio_mean']:.1%} saved per CV on average)")
+    print(f"Over budget after compaction: {over_budget}")
+    print(f"Dropped sections: {dict(dropped)}")
+    print(f"Compaction time: p50 {results['p50_ms']:.2f}ms, p99 {results['p99_ms']:.2f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""Login throughput of password verification at each bcrypt cost.
+
+Verifies passwords through AuthService's hashing pool, first one at a time
+and then from many concurrent callers, and reports logins per second per
+core for every cost factor. The legacy salted SHA-256 check is included as
+a baseline.
+
+Usage:
+    python -m benchmarks.bench_password_hashing --rounds 10 11 12 13 --seconds 3
+"""
+import argparse
+import json
+import os
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from services.auth_service import AuthService
+
+PASSWORD = 'correct horse battery staple'
+LEGACY_HASH = 'ab' * 32 + '$' + '0' * 64
+
+
+def measure(verify, seconds: float, callers: int) -> dict:
+    """Call ``verify`` from ``callers`` threads for ``seconds``; return rate and latency."""
+    latencies = []
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + seconds
+
+    def run():
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            verify()
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'logins': len(latencies),
+        'logins_per_s': len(latencies) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, nargs='+', default=[10, 11, 12, 13],
+                        help='bcrypt cost factors to measure')
+    parser.add_argument('--seconds', type=float, default=3.0, help='duration of each run')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='size of the hashing pool')
+    parser.add_argument('--callers', type=int, default=32,
+                        help='concurrent logins in the concurrent run')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    executor = ThreadPoolExecutor(max_workers=args.workers)
+    results = {'workers': args.workers, 'callers': args.callers, 'rounds': {}}
+    print(f"Hashing pool of {args.workers} worker(s), {args.callers} concurrent callers")
+    print(f"{'cost':<8} {'serial/s':>9} {'p50':>9} {'concurrent/s':>13} {'per core/s':>11} {'p99':>10}")
+
+    legacy = AuthService(None, executor=executor)
+    serial = measure(lambda: legacy.verify_legacy_password(PASSWORD, LEGACY_HASH), args.seconds, 1)
+    results['legacy_sha256'] = serial
+    print(f"{'sha256':<8} {serial['logins_per_s']:>9.0f} {serial['p50_ms']:>7.3f}ms")
+
+    for rounds in args.rounds:
+        auth = AuthService(None, rounds=rounds, executor=executor)
+        stored = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=rounds)).decode()
+        verify = lambda: auth.verify_password(PASSWORD, stored)
+        serial = measure(verify, args.seconds, 1)
+        concurrent = measure(verify, args.seconds, args.callers)
+        per_core = concurrent['logins_per_s'] / args.workers
+        results['rounds'][rounds] = {
+            'serial': serial,
+            'concurrent': concurrent,
+            'logins_per_s_per_core': per_core,
+        }
+        print(f"{rounds:<8} {serial['logins_per_s']:>9.1f} {serial['p50_ms']:>7.1f}ms "
+              f"{concurrent['logins_per_s']:>13.1f} {per_core:>11.1f} {concurrent['p99_ms']:>8.0f}ms")
+
+    executor.shutdown()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Queueing behaviour of the OpenAI request scheduler under mixed traffic.
+
+Runs interactive (question generation) and batch (grading) callers
+against the local fake OpenAI server with deliberately low rate limits and
+reports per-priority wait times and the peak queue depth.
+
+Usage:
+    python -m benchmarks.bench_scheduler --rpm 120 --tpm 40000 --interactive 20 --batch 40 --burst 2
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from services.openai_service import OpenAIService
+from services.request_scheduler import BATCH, INTERACTIVE, PRIORITY_NAMES, RequestScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rpm', type=float, default=120, help='requests per minute limit')
+    parser.add_argument('--tpm', type=float, default=40000, help='tokens per minute limit')
+    parser.add_argument('--interactive', type=int, default=20, help='interactive requests')
+    parser.add_argument('--batch', type=int, default=40, help='batch requests')
+    parser.add_argument('--burst', type=float, default=2.0, help='seconds of capacity that may be saved up')
+    parser.add_argument('--latency', type=float, default=0.1, help='fake server latency in seconds')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(latency=args.latency).start()
+    scheduler = RequestScheduler(args.rpm, args.tpm, max_wait=600, burst_seconds=args.burst)
+    service = OpenAIService(api_key='bench', scheduler=scheduler, base_url=server.base_url)
+
+    waits = {INTERACTIVE: [], BATCH: []}
+    lock = threading.Lock()
+
+    def call(priority: int, index: int):
+        started = time.perf_counter()
+        service.generate_completion(f"request {priority}-{index}", max_tokens=300,
+                                    use_cache=False, priority=priority)
+        with lock:
+            waits[priority].append(time.perf_counter() - started)
+
+    # Batch work arrives first, interactive requests land while it is queued
+    threads = [threading.Thread(target=call, args=(BATCH, i)) for i in range(args.batch)]
+    threads += [threading.Thread(target=call, args=(INTERACTIVE, i)) for i in range(args.interactive)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        time.sleep(0.005)
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+
+    stats = scheduler.stats()
+    results = {'elapsed_s': elapsed, 'requests': server.requests,
+               'max_queue_depth': stats['max_queue_depth'], 'priorities': {}}
+    print(f"{server.requests} requests in {elapsed:.1f}s "
+          f"(limits: {args.rpm:g} rpm, {args.tpm:g} tpm), peak queue depth {stats['max_queue_depth']}")
+    for priority, latencies in waits.items():
+        name = PRIORITY_NAMES[priority]
+        latencies.sort()
+        summary = {
+            'count': len(latencies),
+            'p50_s': statistics.median(latencies),
+            'p99_s': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+            'avg_queue_wait_s': stats['priorities'][name]['avg_wait'],
+            'max_queue_wait_s': stats['priorities'][name]['max_wait'],
+        }
+        results['priorities'][name] = summary
+        print(f"  {name:<11} n={summary['count']:<4} p50 {summary['p50_s']:.2f}s "
+              f"p99 {summary['p99_s']:.2f}s (avg queue wait {summary['avg_queue_wait_s']:.2f}s)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
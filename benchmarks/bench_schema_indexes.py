@@ -0,0 +1,140 @@
+"""Query latency of the history/evaluation lookups before and after migrations.
+
+Builds a database from schema.sql, fills it with synthetic rows, times the
+queries DatabaseManager issues for get_user_interviews,
+get_interview_questions and get_interview_evaluation, then applies the
+schema migrations and times them again.
+
+Usage:
+    python -m benchmarks.bench_schema_indexes --rows 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+
+from database.migrator import apply_migrations
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', 'database', 'schema.sql')
+
+# Same statements as in DatabaseManager
+QUERIES = {
+    'get_user_interviews':
+        'SELECT * FROM interviews WHERE user_id = ? ORDER BY created_at DESC',
+    'get_interview_questions':
+        'SELECT * FROM questions WHERE interview_id = ? ORDER BY question_order',
+    'get_interview_evaluation':
+        'SELECT * FROM evaluations WHERE interview_id = ? ORDER BY created_at DESC LIMIT 1',
+}
+
+
+def populate(conn: sqlite3.Connection, rows: int, users: int, batch: int = 50000):
+    """Insert ``rows`` interviews, questions and evaluations in random order."""
+    rng = random.Random(42)
+    with open(SCHEMA_PATH, 'r') as f:
+        conn.executescript(f.read())
+
+    conn.executemany(
+        'INSERT INTO users (id, username, email, password_hash) VALUES (?, ?, ?, ?)',
+        ((i, f'user{i}', f'user{i}@example.com', 'x') for i in range(1, users + 1))
+    )
+
+    def interview_rows():
+        for i in range(1, rows + 1):
+            day = rng.randint(0, 3 * 365)
+            yield (i, rng.randint(1, users), 5, 'medium', 'completed',
+                   "2024-01-01 00:00:00", day)
+
+    def question_rows():
+        for i in range(1, rows + 1):
+            yield (rng.randint(1, rows), f'Question {i}', f'Answer {i}', rng.randint(1, 10))
+
+    def evaluation_rows():
+        for i in range(1, rows + 1):
+            yield (rng.randint(1, rows), f'Evaluation {i}', rng.uniform(0, 100), 'Feedback')
+
+    inserts = [
+        ('''INSERT INTO interviews
+            (id, user_id, question_count, difficulty_level, status, created_at)
+            VALUES (?, ?, ?, ?, ?, datetime(?, '+' || ? || ' days'))''', interview_rows()),
+        ('''INSERT INTO questions (interview_id, question_text, answer_text, question_order)
+            VALUES (?, ?, ?, ?)''', question_rows()),
+        ('''INSERT INTO evaluations (interview_id, evaluation_text, score, feedback)
+            VALUES (?, ?, ?, ?)''', evaluation_rows()),
+    ]
+    for sql, generator in inserts:
+        while True:
+            chunk = [row for _, row in zip(range(batch), generator)]
+            if not chunk:
+                break
+            conn.executemany(sql, chunk)
+        conn.commit()
+
+
+def time_queries(conn: sqlite3.Connection, keys: Dict[str, List[int]]) -> Dict[str, Dict[str, float]]:
+    """Return p50/p99/mean latency in milliseconds for every query."""
+    results = {}
+    for name, sql in QUERIES.items():
+        samples = []
+        for key in keys[name]:
+            start = time.perf_counter()
+            conn.execute(sql, (key,)).fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+        results[name] = {
+            'p50_ms': samples[len(samples) // 2],
+            'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+            'mean_ms': statistics.mean(samples),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='rows per table (interviews, questions, evaluations)')
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--lookups', type=int, default=50,
+                        help='lookups per query and phase')
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'bench.db'))
+        start = time.perf_counter()
+        populate(conn, args.rows, args.users)
+        print(f"Loaded {args.rows:,} rows per table in {time.perf_counter() - start:.1f}s")
+
+        rng = random.Random(7)
+        keys = {
+            'get_user_interviews': [rng.randint(1, args.users) for _ in range(args.lookups)],
+            'get_interview_questions': [rng.randint(1, args.rows) for _ in range(args.lookups)],
+            'get_interview_evaluation': [rng.randint(1, args.rows) for _ in range(args.lookups)],
+        }
+
+        before = time_queries(conn, keys)
+        start = time.perf_counter()
+        applied = apply_migrations(conn)
+        conn.execute('ANALYZE')
+        print(f"Applied migrations {applied} in {time.perf_counter() - start:.1f}s")
+        after = time_queries(conn, keys)
+        conn.close()
+
+    print(f"\n{'query':<26} {'before p50':>11} {'after p50':>10} {'before p99':>11} {'after p99':>10}")
+    for name in QUERIES:
+        print(f"{name:<26} {before[name]['p50_ms']:>9.2f}ms {after[name]['p50_ms']:>8.3f}ms "
+              f"{before[name]['p99_ms']:>9.2f}ms {after[name]['p99_ms']:>8.3f}ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': args.rows, 'users': args.users,
+                       'before': before, 'after': after}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Compare two benchmark result files operation by operation.
+
+Reads the JSON written by ``benchmarks.run_suite --output`` (or any file
+with the same 'scenarios' layout) and prints p50, p99 and throughput for
+both runs with the relative change. A latency increase or a throughput drop
+larger than ``--threshold`` is flagged as a regression; with
+``--fail-on-regression`` the exit status is 1 if there is one.
+
+Usage:
+    python -m benchmarks.compare_results before.json after.json --threshold 0.1
+"""
+import argparse
+import json
+import sys
+from typing import Optional
+
+# Metric, and whether a higher value is better
+METRICS = (('p50_ms', False), ('p99_ms', False), ('throughput_per_s', True))
+
+
+def relative_change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if before is None or after is None or before == 0:
+        return None
+    return (after - before) / before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative change counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    print(f"before: {before['meta'].get('revision', '?')}  after: {after['meta'].get('revision', '?')}")
+
+    regressions = []
+    print(f"{'operation':<22} {'metric':<17} {'before':>10} {'after':>10} {'change':>8}")
+    for operation, old in before['scenarios'].items():
+        new = after['scenarios'].get(operation)
+        if new is None:
+            print(f"{operation:<22} (missing from {args.after})")
+            continue
+        for metric, higher_is_better in METRICS:
+            change = relative_change(old.get(metric), new.get(metric))
+            flag = ''
+            if change is not None:
+                worse = -change if higher_is_better else change
+                if worse > args.threshold:
+                    flag = ' REGRESSION'
+                    regressions.append((operation, metric, change))
+            change_text = f"{change:+.1%}" if change is not None else 'n/a'
+            print(f"{operation:<22} {metric:<17} {old.get(metric) or 0:>10.2f} "
+                  f"{new.get(metric) or 0:>10.2f} {change_text:>8}{flag}")
+        if new.get('errors') != old.get('errors'):
+            print(f"{operation:<22} {'errors':<17} {old.get('errors'):>10} {new.get('errors'):>10}")
+
+    print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
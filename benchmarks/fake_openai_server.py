@@ -0,0 +1,265 @@
+"""Local stand-in for the OpenAI chat completions endpoint.
+
+Point the services at it with ``OPENAI_BASE_URL=http://127.0.0.1:8765/v1``.
+Responses report token usage and can be streamed, so the request scheduler
+and streaming code paths work exactly as they do against the real API.
+
+Replies are scripted from the prompt: question lists, single questions,
+answer and interview evaluations, batched JSON grading and CV analyses all
+come back in the format the services parse. Latency, token throughput and
+the share of failed requests are configurable, and every random choice is
+drawn from a seeded generator so runs can be repeated.
+
+Usage:
+    python -m benchmarks.fake_openai_server --port 8765 --latency 0.2 --tokens-per-second 80
+"""
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+from utils.tokens import count_tokens
+
+DEFAULT_REPLY = (
+    "1. Describe a system you designed end to end.\n"
+    "2. How do you debug a slow database query?\n"
+    "3. Tell me about a time you disagreed with a teammate.\n"
+    "Score: 80/100\nFeedback: Clear and well structured answer."
+)
+
+TOPICS = ['caching', 'database indexing', 'API design', 'concurrency', 'message queues',
+          'observability', 'testing strategy', 'schema migrations', 'load balancing',
+          'memory management', 'incident response', 'code review', 'CI pipelines']
+
+ERROR_MESSAGES = {
+    429: 'Rate limit reached for requests',
+    500: 'The server had an error while processing your request.',
+    503: 'The engine is currently overloaded, please try again later.',
+}
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def scripted_reply(body: Dict[str, Any]) -> str:
+    """Reply to a chat completion request in the format its prompt asks for.
+
+    The reply depends only on the prompt, so the same request always gets
+    the same answer.
+    """
+    prompt = '\n'.join(m.get('content', '') for m in body.get('messages', []))
+    rng = random.Random(_digest(prompt))
+
+    if (body.get('response_format') or {}).get('type') == 'json_object':
+        indices = [int(n) for n in re.findall(r'^Q(\d+):', prompt, re.M)] or [1]
+        return json.dumps({
+            'answers': [{
+                'index': index,
+                'score': rng.randint(3, 10),
+                'strengths': 'Covers the main trade-offs.',
+                'improvements': 'Give a concrete example.',
+                'feedback': 'A solid answer overall.',
+            } for index in indices],
+            'overall_score': rng.randint(40, 95),
+            'strengths': 'Structured reasoning.',
+            'improvements': 'More depth on failure modes.',
+            'recommendations': 'Practise explaining designs end to end.',
+            'summary': 'A good interview with room to go deeper.',
+        })
+
+    count = re.search(r'Generate (\d+)', prompt)
+    if count:
+        return '\n'.join(
+            f"{i}. How would you approach {rng.choice(TOPICS)} in a project like "
+            f"#{rng.randint(1, 10 ** 6)}?"
+            for i in range(1, int(count.group(1)) + 1)
+        )
+    if 'Reply with the question only' in prompt:
+        return f"Walk me through how you would handle {rng.choice(TOPICS)} at scale."
+    if 'Evaluate the following interview answer' in prompt:
+        return (f"Score: {rng.randint(3, 10)}/10\n"
+                "Strengths: Clear structure and correct terminology.\n"
+                "Areas for Improvement: Discuss alternatives and their costs.\n"
+                "Feedback: A reasonable answer that would benefit from an example.")
+    if 'Evaluate the following interview session' in prompt:
+        return (f"1. Overall Score: {rng.randint(40, 95)}/100\n"
+                "2. Strengths demonstrated: Good fundamentals.\n"
+                "3. Areas needing improvement: Depth on distributed systems.\n"
+                "4. Specific recommendations: Practise system design questions.\n"
+                "5. Summary feedback: A promising candidate.")
+    if 'Analyze the following CV' in prompt:
+        return ("- Skills: " + ', '.join(rng.sample(TOPICS, 4)) + "\n"
+                f"- Experience: {rng.randint(2, 15)} years in software engineering\n"
+                "- Education: B.Sc. Computer Engineering\n"
+                "- Key Strengths: Ownership, communication, system design\n"
+                "- Potential Interview Topics: " + ', '.join(rng.sample(TOPICS, 5)))
+    return DEFAULT_REPLY
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self.send_error(404)
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        body = json.loads(self.rfile.read(length) or b'{}')
+        server = self.server
+        latency, error_status = server.draw()
+
+        time.sleep(latency)
+        if error_status is not None:
+            headers = {'Retry-After': '1'} if error_status == 429 else None
+            self._send_json(error_status, {'error': {
+                'message': ERROR_MESSAGES.get(error_status, 'Injected error'),
+                'type': 'server_error' if error_status >= 500 else 'requests',
+                'code': None,
+            }}, headers)
+            return
+
+        prompt_tokens = sum(count_tokens(m.get('content', '')) for m in body.get('messages', []))
+        reply = server.reply(body) if callable(server.reply) else server.reply
+        completion_tokens = count_tokens(reply)
+        response_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        base = {'id': response_id, 'created': int(time.time()), 'model': body.get('model', 'gpt-3.5-turbo')}
+
+        if body.get('stream'):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Connection', 'close')
+            self.end_headers()
+            words = reply.split(' ')
+            for i, word in enumerate(words):
+                chunk = dict(base, object='chat.completion.chunk', choices=[{
+                    'index': 0,
+                    'delta': {'content': word if i == 0 else ' ' + word},
+                    'finish_reason': None,
+                }])
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                self.wfile.flush()
+                time.sleep(server.chunk_delay + server.generation_time(count_tokens(word)))
+            done = dict(base, object='chat.completion.chunk',
+                        choices=[{'index': 0, 'delta': {}, 'finish_reason': 'stop'}])
+            self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+            self.wfile.flush()
+            self.close_connection = True
+            return
+
+        time.sleep(server.generation_time(completion_tokens))
+        self._send_json(200, dict(base, object='chat.completion', choices=[{
+            'index': 0,
+            'message': {'role': 'assistant', 'content': reply},
+            'finish_reason': 'stop',
+        }], usage={
+            'prompt_tokens': prompt_tokens,
+            'completion_tokens': completion_tokens,
+            'total_tokens': prompt_tokens + completion_tokens,
+        }))
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """Fake API server; see the module docstring.
+
+    Each request waits ``latency`` seconds plus up to ``latency_jitter``
+    more before answering, then ``tokens_per_second`` sets how quickly the
+    reply is generated (0 sends it at once). A fraction ``error_rate`` of
+    requests fails with a status from ``error_statuses`` instead; 429s carry
+    a Retry-After header. ``reply`` is a fixed string or a function of the
+    request body.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 chunk_delay: float = 0.0,
+                 reply: Union[str, Callable[[Dict[str, Any]], str]] = scripted_reply,
+                 latency_jitter: float = 0.0, tokens_per_second: float = 0.0,
+                 error_rate: float = 0.0, error_statuses: Sequence[int] = (429, 500, 503),
+                 seed: int = 0):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.chunk_delay = chunk_delay
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.reply = reply
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def draw(self) -> tuple:
+        """Count a request and pick its (latency, error status or None)."""
+        with self.lock:
+            self.requests += 1
+            latency = self.latency + self.rng.uniform(0, self.latency_jitter)
+            error_status = None
+            if self.error_statuses and self.rng.random() < self.error_rate:
+                error_status = self.rng.choice(self.error_statuses)
+                self.errors += 1
+            return latency, error_status
+
+    def generation_time(self, tokens: int) -> float:
+        return tokens / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+    def start(self) -> 'FakeOpenAIServer':
+        """Serve from a daemon thread and return self."""
+        threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True).start()
+        return self
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.2, help='seconds before each response')
+    parser.add_argument('--latency-jitter', type=float, default=0.0,
+                        help='up to this many extra seconds of latency, drawn uniformly')
+    parser.add_argument('--chunk-delay', type=float, default=0.01, help='seconds between streamed chunks')
+    parser.add_argument('--tokens-per-second', type=float, default=0.0,
+                        help='reply generation speed (0 = instant)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of requests answered with an error')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(args.host, args.port, args.latency, args.chunk_delay,
+                              latency_jitter=args.latency_jitter,
+                              tokens_per_second=args.tokens_per_second,
+                              error_rate=args.error_rate, seed=args.seed)
+    print(f"Fake OpenAI API listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
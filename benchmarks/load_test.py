@@ -0,0 +1,364 @@
+"""Headless load test: many simulated candidates over a pool of processes.
+
+Every process builds its own DatabaseManager, AuthService, OpenAIService
+and CVAnalyzer on one shared SQLite file, exactly as separate app servers
+would. Completions come from the fake OpenAI server started here. Each
+simulated candidate runs one session from the mix. Sessions start evenly
+over the ramp-up period, and a candidate pauses for an exponentially
+distributed think time between steps.
+
+Session types:
+    interview  register, log in, take an interview (planned questions),
+               answering every question, get it graded, view the history
+    cv         the same, starting from an uploaded PDF CV
+    browse     log in as an earlier candidate (or a new one, if nobody has
+               signed up yet) and look at the history and profile stats
+
+The report gives throughput and p50/p95/p99 per step, plus SQLite lock
+contention. Contention is counted as writes retried after SQLITE_BUSY,
+"database is locked" errors that escaped, and waits for a pooled
+connection. The JSON output uses the run_suite layout, so two runs can be
+diffed with benchmarks.compare_results.
+
+Usage:
+    python -m benchmarks.load_test --processes 4 --candidates 2000 --concurrency 50 \\
+        --ramp-up 30 --think-time 2 --mix interview=0.6,cv=0.1,browse=0.3
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.run_suite import git_revision
+from benchmarks.synthetic import synthetic_cv_pdf, synthetic_interview
+
+SESSION_TYPES = ('interview', 'cv', 'browse')
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'interview=0.6,browse=0.4' -> normalised weights per session type."""
+    weights = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SESSION_TYPES:
+            raise argparse.ArgumentTypeError(f"unknown session type {name!r}")
+        weights[name] = float(weight or 1)
+    total = sum(weights.values())
+    if total <= 0:
+        raise argparse.ArgumentTypeError("the mix needs a positive weight")
+    return {name: weight / total for name, weight in weights.items()}
+
+
+def is_lock_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return isinstance(error, sqlite3.OperationalError) and ('locked' in message or 'busy' in message)
+
+
+class Recorder:
+    """Latencies and errors per step, shared by the threads of one process."""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.lock_errors = 0
+        self.first_errors = {}
+        self._lock = threading.Lock()
+
+    def step(self, name: str, fn, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            with self._lock:
+                self.errors[name] += 1
+                self.lock_errors += is_lock_error(e)
+                self.first_errors.setdefault(name, repr(e))
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.latencies[name].append(elapsed)
+
+
+def run_worker(worker: int, config: Dict[str, Any]) -> Dict[str, Any]:
+    """Simulate this process's share of the candidates and return raw measurements."""
+    # Imported here so each spawned process configures itself from scratch
+    from database.db_manager import DatabaseManager
+    from services.auth_service import AuthService
+    from services.cv_analyzer import CVAnalyzer
+    from services.interview_session import InterviewSession
+    from services.job_queue import evaluate_interview_handler
+    from services.openai_service import OpenAIService
+    from services.question_bank import QuestionBank
+
+    rng = random.Random(config['seed'] * 1000 + worker)
+    db = DatabaseManager(config['db_path'])
+    auth = AuthService(db, rounds=config['bcrypt_rounds'])
+    openai_service = OpenAIService(api_key='load-test', base_url=config['base_url'])
+    cv_analyzer = CVAnalyzer(openai_service, db)
+    bank = QuestionBank(db, openai_service)
+    evaluate = evaluate_interview_handler(db, openai_service)
+    recorder = Recorder()
+
+    # Candidates of this process: (index, session type, start offset)
+    names = list(config['mix'])
+    weights = [config['mix'][name] for name in names]
+    total = config['candidates']
+    mine = [i for i in range(total) if i % config['processes'] == worker]
+    plan = [(i, rng.choices(names, weights)[0], config['ramp_up'] * i / max(1, total))
+            for i in mine]
+    transcripts = [synthetic_interview(rng, config['questions']) for _ in range(16)]
+    cvs = [synthetic_cv_pdf(rng, jobs=rng.randint(1, 6), pages=rng.randint(1, 3))
+           for _ in range(4)]
+    started = time.monotonic()
+
+    def think(local_rng: random.Random):
+        if config['think_time'] > 0:
+            time.sleep(local_rng.expovariate(1 / config['think_time']))
+
+    registered = []
+    registered_lock = threading.Lock()
+
+    def checked_login(username: str, password: str) -> Dict[str, Any]:
+        success, user, message = auth.login_user(username, password)
+        if not success:
+            raise RuntimeError(message)
+        return user
+
+    def login(local_rng: random.Random, username: str, password: str) -> Dict[str, Any]:
+        user = recorder.step('login', checked_login, username, password)
+        think(local_rng)
+        return user
+
+    def interview(local_rng: random.Random, user: Dict[str, Any], use_cv: bool):
+        cv = {}
+        if use_cv:
+            # A few distinct files, so repeat uploads hit the stored analysis
+            result = recorder.step('cv_analysis', cv_analyzer.analyze_cv_bytes,
+                                   local_rng.choice(cvs))
+            cv = {'cv_analysis': result['analysis'], 'cv_document_id': result.get('cv_document_id'),
+                  'cv_filename': 'cv.pdf'}
+            think(local_rng)
+        questions = recorder.step('draw_questions', bank.draw, user['id'],
+                                  config['questions'], 'medium')
+        session = recorder.step('create_interview', InterviewSession, db, openai_service,
+                                user['id'], 'medium', config['questions'], planned=questions,
+                                max_follow_ups=0, **cv)
+        transcript = local_rng.choice(transcripts)
+        for qa in transcript:
+            if session.current is None:
+                break
+            think(local_rng)
+            recorder.step('submit_answer', session.submit_answer, qa['answer'])
+        session.close()
+        recorder.step('evaluate_interview', evaluate, {'interview_id': session.interview_id})
+        think(local_rng)
+        browse(user)
+
+    def browse(user: Dict[str, Any]):
+        page = recorder.step('history_page', db.get_user_interviews_page, user['id'],
+                             config['page_size'])
+        if page['interviews']:
+            recorder.step('interview_details', db.get_interview_questions,
+                          page['interviews'][0]['id'])
+        recorder.step('user_stats', db.get_user_stats, user['id'])
+
+    def session(index: int, kind: str, offset: float):
+        delay = started + offset - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        local_rng = random.Random(config['seed'] * 1_000_003 + index)
+        try:
+            with registered_lock:
+                returning = local_rng.choice(registered) if registered else None
+            if kind == 'browse' and returning is not None:
+                # A candidate who signed up earlier comes back
+                user = login(local_rng, *returning)
+                browse(user)
+                return 'browse'
+            username, password = f"{config['run_id']}_{index}", f"password-{index}"
+            ok, message = recorder.step('register', auth.register_user, username,
+                                        f"{username}@example.com", password)
+            if not ok:
+                raise RuntimeError(message)
+            with registered_lock:
+                registered.append((username, password))
+            think(local_rng)
+            user = login(local_rng, username, password)
+            if kind == 'browse':
+                browse(user)
+            else:
+                interview(local_rng, user, use_cv=(kind == 'cv'))
+            return kind
+        except Exception:
+            # Recorded by the failing step; the candidate gives up
+            return None
+
+    with ThreadPoolExecutor(max_workers=config['concurrency']) as executor:
+        outcomes = list(executor.map(lambda p: session(*p), plan))
+
+    completed = defaultdict(int)
+    for outcome in outcomes:
+        if outcome is not None:
+            completed[outcome] += 1
+    result = {
+        'latencies': dict(recorder.latencies),
+        'errors': dict(recorder.errors),
+        'first_errors': recorder.first_errors,
+        'sessions': len(plan),
+        'completed': dict(completed),
+        'busy_retries': db.busy_retries,
+        'lock_errors': recorder.lock_errors,
+        'pool': db.pool_stats(),
+    }
+    db.close()
+    return result
+
+
+def summarise(latencies: List[float], errors: int, wall: float) -> Dict[str, Any]:
+    latencies = sorted(latencies)
+
+    def percentile(q: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000
+
+    return {
+        'count': len(latencies),
+        'errors': errors,
+        'throughput_per_s': len(latencies) / wall if wall > 0 else None,
+        'mean_ms': statistics.mean(latencies) * 1000,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--candidates', type=int, default=1000, help='simulated candidates in total')
+    parser.add_argument('--concurrency', type=int, default=50,
+                        help='candidates active at once per process')
+    parser.add_argument('--ramp-up', type=float, default=10.0,
+                        help='seconds over which candidate sessions start')
+    parser.add_argument('--think-time', type=float, default=1.0,
+                        help='mean pause between a candidate\'s steps in seconds (0 = none)')
+    parser.add_argument('--mix', type=parse_mix, default='interview=0.6,cv=0.1,browse=0.3',
+                        help='session type weights')
+    parser.add_argument('--questions', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--bcrypt-rounds', type=int, default=8)
+    parser.add_argument('--db', help='SQLite file to use (default: a temporary one)')
+    parser.add_argument('--latency', type=float, default=0.2, help='fake server latency in seconds')
+    parser.add_argument('--latency-jitter', type=float, default=0.2)
+    parser.add_argument('--tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+    if isinstance(args.mix, str):
+        args.mix = parse_mix(args.mix)
+
+    server = FakeOpenAIServer(latency=args.latency, latency_jitter=args.latency_jitter,
+                              tokens_per_second=args.tokens_per_second,
+                              error_rate=args.error_rate, seed=args.seed).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db or os.path.join(tmp, 'load.db')
+        # Create the schema once, before the workers race for it
+        from database.db_manager import DatabaseManager
+        DatabaseManager(db_path).close()
+
+        config = {
+            'db_path': db_path,
+            'base_url': server.base_url,
+            'run_id': f"lt{int(time.time())}",
+            'candidates': args.candidates,
+            'processes': args.processes,
+            'concurrency': args.concurrency,
+            'ramp_up': args.ramp_up,
+            'think_time': args.think_time,
+            'mix': args.mix,
+            'questions': args.questions,
+            'page_size': args.page_size,
+            'bcrypt_rounds': args.bcrypt_rounds,
+            'seed': args.seed,
+        }
+        print(f"{args.candidates} candidates over {args.processes} processes "
+              f"({args.concurrency} concurrent each), ramp-up {args.ramp_up:g}s, "
+              f"think time {args.think_time:g}s")
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processes,
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            results = list(executor.map(run_worker, range(args.processes),
+                                        [config] * args.processes))
+        wall = time.perf_counter() - started
+    server.shutdown()
+
+    latencies, errors, first_errors = defaultdict(list), defaultdict(int), {}
+    completed = defaultdict(int)
+    for result in results:
+        for step, values in result['latencies'].items():
+            latencies[step].extend(values)
+        for step, count in result['errors'].items():
+            errors[step] += count
+        for step, error in result['first_errors'].items():
+            first_errors.setdefault(step, error)
+        for kind, count in result['completed'].items():
+            completed[kind] += count
+
+    contention = {
+        'busy_retries': sum(r['busy_retries'] for r in results),
+        'lock_errors': sum(r['lock_errors'] for r in results),
+        'pool_waits': sum(r['pool']['waits'] for r in results),
+        'pool_checkouts': sum(r['pool']['checkouts'] for r in results),
+    }
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'args': vars(args),
+            'wall_s': wall,
+            'sessions': sum(r['sessions'] for r in results),
+            'completed_sessions': dict(completed),
+            'sessions_per_s': sum(completed.values()) / wall,
+            'fake_server': {'requests': server.requests, 'errors': server.errors},
+            'contention': contention,
+            'first_errors': first_errors,
+        },
+        'scenarios': {step: summarise(values, errors[step], wall)
+                      for step, values in sorted(latencies.items())},
+    }
+
+    print(f"\n{report['meta']['sessions']} sessions in {wall:.1f}s: "
+          f"{sum(completed.values())} completed ({report['meta']['sessions_per_s']:.1f}/s), "
+          f"{server.requests} completions")
+    print(f"{'step':<20} {'n':>7} {'err':>5} {'ops/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for step, s in report['scenarios'].items():
+        print(f"{step:<20} {s['count']:>7} {s['errors']:>5} {s['throughput_per_s']:>8.1f} "
+              f"{s['p50_ms']:>7.1f}ms {s['p95_ms']:>7.1f}ms {s['p99_ms']:>7.1f}ms {s['max_ms']:>7.0f}ms")
+    print(f"\nSQLite contention: {contention['busy_retries']} busy retries, "
+          f"{contention['lock_errors']} 'database is locked' errors, "
+          f"{contention['pool_waits']} waits for a pooled connection "
+          f"(of {contention['pool_checkouts']} checkouts)")
+    for step, error in first_errors.items():
+        print(f"  first {step} error: {error}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
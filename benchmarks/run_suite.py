@@ -0,0 +1,272 @@
+"""End-to-end benchmark scenarios against a temporary database and the fake OpenAI server.
+
+Each scenario drives the real services (AuthService, QuestionBank and
+InterviewSession, CVAnalyzer, OpenAIService, DatabaseManager) with
+synthetic data and reports p50/p99 latency and throughput per operation.
+Nothing leaves the machine: completions come from the local fake server,
+whose latency, generation speed and error rate are set on the command line.
+Save the JSON results and compare two runs with ``benchmarks.compare_results``.
+
+Usage:
+    python -m benchmarks.run_suite --output before.json
+    python -m benchmarks.run_suite --scenarios grading history --latency 0.3 --error-rate 0.05
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.synthetic import synthetic_cv_pdf, synthetic_interview, synthetic_user
+from database.db_manager import DatabaseManager
+from services.async_openai_service import AsyncOpenAIService
+from services.auth_service import AuthService
+from services.cv_analyzer import CVAnalyzer
+from services.interview_session import InterviewSession
+from services.openai_service import OpenAIService
+from services.question_bank import QuestionBank
+
+
+def run_ops(ops: List[Callable[[], Any]], concurrency: int) -> Dict[str, Any]:
+    """Run ``ops`` on ``concurrency`` threads and summarise their latencies."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+
+    def timed(op):
+        started = time.perf_counter()
+        try:
+            op()
+        except Exception as e:
+            with lock:
+                errors.append(repr(e))
+        finally:
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        list(executor.map(timed, ops))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'errors': len(errors),
+        'first_error': errors[0] if errors else None,
+        'wall_s': wall,
+        'throughput_per_s': len(latencies) / wall if wall > 0 else None,
+        'mean_ms': statistics.mean(latencies) * 1000 if latencies else None,
+        'p50_ms': statistics.median(latencies) * 1000 if latencies else None,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+                  if latencies else None,
+    }
+
+
+def create_users(db: DatabaseManager, rng: random.Random, count: int, offset: int) -> List[int]:
+    """Users for scenarios that don't measure registration (placeholder password hash)."""
+    return [db.create_user(**{k: v for k, v in synthetic_user(rng, offset + i).items()
+                              if k != 'password'}, password_hash='x')
+            for i in range(count)]
+
+
+def bench_auth(ctx: Dict[str, Any], args) -> Dict[str, Any]:
+    auth = AuthService(ctx['db'], rounds=args.bcrypt_rounds)
+    users = [synthetic_user(ctx['rng'], i) for i in range(args.users)]
+    register = run_ops([
+        lambda u=u: auth.register_user(u['username'], u['email'], u['password'])
+        for u in users
+    ], args.concurrency)
+
+    def login(user):
+        success, _, message = auth.login_user(user['username'], user['password'])
+        if not success:
+            raise RuntimeError(message)
+
+    return {
+        'register': register,
+        'login': run_ops([lambda u=u: login(u) for u in users], args.concurrency),
+    }
+
+
+def bench_interview_creation(ctx: Dict[str, Any], args) -> Dict[str, Any]:
+    db, service = ctx['db'], ctx['openai_service']
+    bank = QuestionBank(db, service)
+    bank.refill('medium', '')
+    user_ids = create_users(db, ctx['rng'], args.interviews, 10_000)
+
+    def create(user_id):
+        questions = bank.draw(user_id, args.questions, 'medium')
+        session = InterviewSession(db, service, user_id, 'medium', args.questions,
+                                   planned=questions)
+        session.close()
+
+    result = run_ops([lambda u=u: create(u) for u in user_ids], args.concurrency)
+    result['question_bank'] = bank.stats()
+    return {'interview_creation': result}
+
+
+def bench_cv_analysis(ctx: Dict[str, Any], args) -> Dict[str, Any]:
+    analyzer = CVAnalyzer(ctx['openai_service'], ctx['db'])
+    rng = ctx['rng']
+    pdfs = [synthetic_cv_pdf(rng, jobs=rng.randint(1, 8), pages=rng.randint(1, 4))
+            for _ in range(args.cvs)]
+
+    def analyze(data):
+        result = analyzer.analyze_cv_bytes(data)
+        if not result['success']:
+            raise RuntimeError(result.get('error'))
+
+    # The second pass finds every CV already stored
+    return {
+        'cv_analysis': run_ops([lambda d=d: analyze(d) for d in pdfs], args.concurrency),
+        'cv_analysis_repeat': run_ops([lambda d=d: analyze(d) for d in pdfs], args.concurrency),
+    }
+
+
+def bench_grading(ctx: Dict[str, Any], args) -> Dict[str, Any]:
+    service = ctx['openai_service']
+    transcripts = [synthetic_interview(ctx['rng'], args.questions) for _ in range(args.interviews)]
+
+    def grade_batch(transcript):
+        result = service.evaluate_interview_batch(transcript)
+        if not result['success']:
+            raise RuntimeError(result['evaluation_text'])
+
+    def grade_each(transcript):
+        for qa in transcript:
+            if not service.evaluate_answer(qa['question'], qa['answer'])['success']:
+                raise RuntimeError('answer evaluation failed')
+
+    concurrent_service = AsyncOpenAIService(service)
+
+    def grade_concurrently(transcript):
+        if not all(result['success'] for result in concurrent_service.evaluate_answers(transcript)):
+            raise RuntimeError('answer evaluation failed')
+
+    return {
+        'grading_batch': run_ops([lambda t=t: grade_batch(t) for t in transcripts],
+                                 args.concurrency),
+        'grading_per_answer': run_ops([lambda t=t: grade_each(t) for t in transcripts],
+                                      args.concurrency),
+        'grading_concurrent': run_ops([lambda t=t: grade_concurrently(t) for t in transcripts],
+                                      args.concurrency),
+    }
+
+
+def bench_history(ctx: Dict[str, Any], args) -> Dict[str, Any]:
+    db, rng = ctx['db'], ctx['rng']
+    user_ids = create_users(db, rng, args.history_users, 20_000)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    db.bulk_insert(
+        'interviews',
+        ('user_id', 'question_count', 'difficulty_level', 'status', 'score', 'created_at'),
+        ((user_id, 5, rng.choice(['easy', 'medium', 'hard']), 'completed', rng.uniform(0, 100),
+          (start + timedelta(minutes=rng.randint(0, 10 ** 6))).strftime('%Y-%m-%d %H:%M:%S'))
+         for user_id in user_ids for _ in range(args.history_depth))
+    )
+
+    def walk(user_id):
+        cursor = None
+        while True:
+            page = db.get_user_interviews_page(user_id, args.page_size, before=cursor)
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    lookups = [rng.choice(user_ids) for _ in range(args.history_lookups)]
+    return {
+        'history_first_page': run_ops([
+            lambda u=u: db.get_user_interviews_page(u, args.page_size) for u in lookups
+        ], args.concurrency),
+        'history_all_pages': run_ops([lambda u=u: walk(u) for u in lookups], args.concurrency),
+    }
+
+
+SCENARIOS = {
+    'auth': bench_auth,
+    'interview_creation': bench_interview_creation,
+    'cv_analysis': bench_cv_analysis,
+    'grading': bench_grading,
+    'history': bench_history,
+}
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--concurrency', type=int, default=8, help='operations in flight')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--users', type=int, default=50, help='users registered and logged in')
+    parser.add_argument('--bcrypt-rounds', type=int, default=10)
+    parser.add_argument('--interviews', type=int, default=40,
+                        help='interviews created and transcripts graded')
+    parser.add_argument('--questions', type=int, default=5, help='questions per interview')
+    parser.add_argument('--cvs', type=int, default=20, help='CVs analyzed')
+    parser.add_argument('--history-users', type=int, default=200)
+    parser.add_argument('--history-depth', type=int, default=100, help='interviews per history user')
+    parser.add_argument('--history-lookups', type=int, default=500)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.05, help='fake server latency in seconds')
+    parser.add_argument('--latency-jitter', type=float, default=0.05)
+    parser.add_argument('--tokens-per-second', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--output', help='write results as JSON to this path')
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(latency=args.latency, latency_jitter=args.latency_jitter,
+                              tokens_per_second=args.tokens_per_second,
+                              error_rate=args.error_rate, seed=args.seed).start()
+    results = {
+        'meta': {
+            'revision': git_revision(),
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'args': vars(args),
+        },
+        'scenarios': {},
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(os.path.join(tmp, 'bench.db'))
+        ctx = {
+            'db': db,
+            'openai_service': OpenAIService(api_key='bench', base_url=server.base_url),
+            'rng': random.Random(args.seed),
+        }
+        print(f"{'operation':<22} {'n':>5} {'err':>4} {'p50':>10} {'p99':>10} {'ops/s':>9}")
+        for name in args.scenarios:
+            for operation, summary in SCENARIOS[name](ctx, args).items():
+                results['scenarios'][operation] = summary
+                print(f"{operation:<22} {summary['count']:>5} {summary['errors']:>4} "
+                      f"{summary['p50_ms']:>8.1f}ms {summary['p99_ms']:>8.1f}ms "
+                      f"{summary['throughput_per_s']:>9.1f}")
+        db.close()
+
+    server.shutdown()
+    results['meta']['fake_server'] = {'requests': server.requests, 'errors': server.errors}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Deterministic synthetic data for benchmarks."""
+import random
+from typing import List
+
+FIRST_NAMES = ['Ayse', 'Mehmet', 'Alex', 'Maria', 'Deniz', 'Sam', 'Elif', 'Jordan', 'Can', 'Priya']
+LAST_NAMES = ['Yilmaz', 'Kaya', 'Smith', 'Garcia', 'Demir', 'Chen', 'Ozturk', 'Novak', 'Sahin', 'Patel']
+COMPANIES = ['Acme Corp', 'Globex', 'Initech', 'Umbrella Labs', 'Hooli', 'Stark Industries',
+             'Wayne Tech', 'Cyberdyne', 'Soylent', 'Vandelay Industries']
+ROLES = ['Software Engineer', 'Backend Developer', 'Data Engineer', 'Machine Learning Engineer',
+         'DevOps Engineer', 'Full Stack Developer', 'Site Reliability Engineer']
+SKILLS = ['Python', 'Java', 'Go', 'SQL', 'PostgreSQL', 'Redis', 'Kafka', 'Docker', 'Kubernetes',
+          'AWS', 'GCP', 'Terraform', 'React', 'TypeScript', 'Spark', 'Airflow', 'PyTorch',
+          'scikit-learn', 'gRPC', 'Linux', 'CI/CD', 'Distributed caching', 'System design']
+VERBS = ['Designed', 'Built', 'Led', 'Migrated', 'Optimized', 'Maintained', 'Scaled', 'Automated']
+OBJECTS = ['a payment processing service', 'the data ingestion pipeline', 'an internal ML platform',
+           'the customer analytics dashboard', 'a multi-region Kubernetes cluster',
+           'the search indexing workers', 'a real-time notification system', 'the billing API']
+OUTCOMES = ['reducing latency by {n}%', 'cutting infrastructure cost by {n}%',
+            'serving {n}k requests per second', 'improving reliability to 99.{n}% uptime',
+            'shortening release cycles by {n}%']
+UNIVERSITIES = ['Zonguldak Bulent Ecevit University', 'Middle East Technical University',
+                'Bogazici University', 'Technical University of Munich', 'University of Toronto']
+
+
+def synthetic_cv_text(rng: random.Random, jobs: int = 3, pages: int = 2,
+                      noisy: bool = True) -> str:
+    """Return the text of a synthetic CV as PDF extraction would produce it.
+
+    With ``noisy`` the text carries the usual extraction artefacts: page
+    headers/footers repeated on every page, page numbers, separator lines,
+    a repeated skills section and reference boilerplate.
+    """
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    email = name.lower().replace(' ', '.') + '@example.com'
+    header = f"{name} | {email} | +90 555 {rng.randint(100, 999)} {rng.randint(1000, 9999)}"
+
+    sections = [
+        [name, rng.choice(ROLES), email],
+        ['Summary', f"{rng.choice(ROLES)} with {rng.randint(2, 15)} years of experience building "
+                    f"{rng.choice(OBJECTS)} and {rng.choice(OBJECTS)}."],
+    ]
+    experience = ['Experience']
+    for _ in range(jobs):
+        experience.append(f"{rng.choice(ROLES)} - {rng.choice(COMPANIES)} "
+                          f"({rng.randint(2010, 2020)} - {rng.randint(2020, 2024)})")
+        for _ in range(rng.randint(3, 6)):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(10, 90))
+            experience.append(f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)}, {outcome}.")
+    sections.append(experience)
+    skills = ['Skills', ', '.join(rng.sample(SKILLS, rng.randint(6, 12)))]
+    sections.append(skills)
+    sections.append(['Projects'] + [
+        f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} as an open source side project."
+        for _ in range(rng.randint(1, 4))
+    ])
+    sections.append(['Education', f"B.Sc. Computer Engineering, {rng.choice(UNIVERSITIES)}, "
+                                  f"{rng.randint(2005, 2020)}"])
+    sections.append(['Certifications', 'AWS Certified Solutions Architect',
+                     'Certified Kubernetes Administrator'])
+    sections.append(['Interests', 'Chess, hiking, photography, open source'])
+    if noisy:
+        sections.append(skills)
+        sections.append(['References', 'References available upon request.'])
+
+    lines = [line for section in sections for line in section + ['']]
+    if not noisy:
+        return '\n'.join(lines).strip()
+
+    # Spread the lines over pages with repeated header/footer artefacts
+    per_page = max(1, len(lines) // pages + 1)
+    out: List[str] = []
+    for page in range(pages):
+        chunk = lines[page * per_page:(page + 1) * per_page]
+        out += ['Curriculum Vitae', header, '-' * 40] + chunk + [f"Page {page + 1} of {pages}"]
+    return '\n'.join(out)
+
+
+ANSWER_SENTENCES = ['I would start by measuring where the time goes before changing anything.',
+                    'In my last role we added an index that matched the slow query.',
+                    'The main trade-off is freshness against load on the database.',
+                    'We put a cache in front of the service and invalidated it on writes.',
+                    'I split the work into idempotent background jobs.',
+                    'We kept the API backwards compatible while we migrated.',
+                    'Before shipping we load tested the change in staging.',
+                    'We added alerts on the p99 latency.',
+                    'It depends on the workload, so I would look at the access pattern first.']
+
+
+def synthetic_user(rng: random.Random, index: int) -> dict:
+    """Registration details for user number ``index``."""
+    name = f"{rng.choice(FIRST_NAMES)}{rng.choice(LAST_NAMES)}".lower()
+    return {
+        'username': f"{name}{index}",
+        'email': f"{name}{index}@example.com",
+        'password': f"pw-{rng.getrandbits(48):012x}",
+    }
+
+
+def synthetic_interview(rng: random.Random, questions: int = 5) -> List[dict]:
+    """Questions and answers of a finished interview."""
+    transcript = []
+    for _ in range(questions):
+        skill = rng.choice(SKILLS)
+        answer = ' '.join(rng.choice(ANSWER_SENTENCES) for _ in range(rng.randint(2, 8)))
+        transcript.append({
+            'question': f"How did you use {skill} when you {rng.choice(VERBS).lower()} "
+                        f"{rng.choice(OBJECTS)}?",
+            'answer': answer,
+        })
+    return transcript
+
+
+def _pdf_escape(text: str) -> str:
+    text = text.encode('latin-1', 'replace').decode('latin-1')
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def text_pdf(lines: List[str], lines_per_page: int = 50) -> bytes:
+    """Minimal PDF with ``lines`` of Helvetica text, ``lines_per_page`` per page."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    # Objects: 1 catalog, 2 page tree, 3 font, then a page and its content stream per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page_lines in pages:
+        page_number, content_number = len(objects) + 1, len(objects) + 2
+        kids.append(f"{page_number} 0 R")
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td\n" + ''.join(
+            f"({_pdf_escape(line)}) Tj T*\n" for line in page_lines
+        ) + "ET"
+        stream = stream.encode('latin-1')
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_number} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b''.join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def synthetic_cv_pdf(rng: random.Random, jobs: int = 3, pages: int = 2) -> bytes:
+    """A synthetic CV as PDF bytes, with its text spread over ``pages`` pages."""
+    lines = synthetic_cv_text(rng, jobs=jobs, pages=pages, noisy=False).splitlines()
+    return text_pdf(lines, max(1, -(-len(lines) // pages)))
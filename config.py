@@ -5,11 +5,121 @@ load_dotenv()
 
 class Config:
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
+    OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL') or None  # e.g. a local stub server
+    OPENAI_REQUEST_TIMEOUT = float(os.getenv('OPENAI_REQUEST_TIMEOUT', '30'))
+    EVALUATION_CONCURRENCY = int(os.getenv('EVALUATION_CONCURRENCY', '5'))
+    # Transcript tokens graded per batched evaluation call
+    EVALUATION_CONTEXT_BUDGET = int(os.getenv('EVALUATION_CONTEXT_BUDGET', '6000'))
+
+    # Client-side rate limits shared by all OpenAI calls in the process
+    OPENAI_REQUESTS_PER_MINUTE = float(os.getenv('OPENAI_REQUESTS_PER_MINUTE', '3000'))
+    OPENAI_TOKENS_PER_MINUTE = float(os.getenv('OPENAI_TOKENS_PER_MINUTE', '160000'))
+    OPENAI_SCHEDULER_MAX_WAIT = float(os.getenv('OPENAI_SCHEDULER_MAX_WAIT', '60'))  # seconds
+
+    # Retries, hedging and circuit breaking around OpenAI calls
+    OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '3'))
+    OPENAI_RETRY_BASE_DELAY = float(os.getenv('OPENAI_RETRY_BASE_DELAY', '0.5'))  # seconds
+    OPENAI_RETRY_MAX_DELAY = float(os.getenv('OPENAI_RETRY_MAX_DELAY', '8'))  # seconds
+    OPENAI_HEDGE_REQUESTS = os.getenv('OPENAI_HEDGE_REQUESTS', 'false').lower() == 'true'
+    OPENAI_BREAKER_FAILURE_THRESHOLD = int(os.getenv('OPENAI_BREAKER_FAILURE_THRESHOLD', '5'))
+    OPENAI_BREAKER_RECOVERY_TIME = float(os.getenv('OPENAI_BREAKER_RECOVERY_TIME', '30'))  # seconds
+
+    # Password hashing (bcrypt); logins whose hash used another cost are rehashed
+    BCRYPT_ROUNDS = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    # Hashes computed at once; bcrypt runs outside the GIL, so about one per core
+    AUTH_HASH_WORKERS = int(os.getenv('AUTH_HASH_WORKERS', str(os.cpu_count() or 2)))
+
+    # LLM completion cache
+    LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+    LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', '512'))
+    LLM_CACHE_TTL = float(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))  # seconds, 0 = no expiry
+    # Persistent tier: expired rows are purged, and the oldest rows beyond the cap
+    # dropped, at most once per interval (checked on writes)
+    LLM_CACHE_MAX_ROWS = int(os.getenv('LLM_CACHE_MAX_ROWS', '50000'))
+    LLM_CACHE_PURGE_INTERVAL = float(os.getenv('LLM_CACHE_PURGE_INTERVAL', '3600'))  # seconds
+
+    # Logging and metrics; the Prometheus endpoint is skipped when its port is taken
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')  # 'json' or 'text'
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    METRICS_HOST = os.getenv('METRICS_HOST', '127.0.0.1')
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '9464'))  # 0 = no HTTP endpoint
+
+    # Background jobs (interview evaluation, CV analysis)
+    BACKGROUND_JOBS = os.getenv('BACKGROUND_JOBS', 'true').lower() == 'true'
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', '2'))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))  # seconds
+    JOB_LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '300'))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+
+    # Interview sessions: background grading and speculative prefetch
+    INTERVIEW_PREFETCH_WORKERS = int(os.getenv('INTERVIEW_PREFETCH_WORKERS', '8'))
+    INTERVIEW_MAX_FOLLOW_UPS = int(os.getenv('INTERVIEW_MAX_FOLLOW_UPS', '2'))
+    INTERVIEW_FOLLOW_UP_THRESHOLD = float(os.getenv('INTERVIEW_FOLLOW_UP_THRESHOLD', '5'))  # score out of 10
+    # Plan only the first question and generate the rest turn by turn
+    INTERVIEW_ADAPTIVE_QUESTIONS = os.getenv('INTERVIEW_ADAPTIVE_QUESTIONS', 'false').lower() == 'true'
+
+    # Write-behind buffering of answers: flushed every interval or at this many questions
+    ANSWER_WRITE_BEHIND = os.getenv('ANSWER_WRITE_BEHIND', 'true').lower() == 'true'
+    ANSWER_FLUSH_INTERVAL = float(os.getenv('ANSWER_FLUSH_INTERVAL', '1'))  # seconds
+    ANSWER_BUFFER_SIZE = int(os.getenv('ANSWER_BUFFER_SIZE', '200'))
+
+    # Interview history: interviews per page on the My Interviews page
+    HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', '10'))
+    # Results per page of the history search
+    SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', '10'))
+
+    # Question bank: pre-generated questions per (difficulty, topic) bucket
+    DIFFICULTY_LEVELS = ['easy', 'medium', 'hard']
+    QUESTION_BANK_TOPICS = [t.strip() for t in os.getenv('QUESTION_BANK_TOPICS', '').split(',') if t.strip()]
+    QUESTION_BANK_DEPTH = int(os.getenv('QUESTION_BANK_DEPTH', '30'))
+    QUESTION_BANK_BATCH_SIZE = int(os.getenv('QUESTION_BANK_BATCH_SIZE', '10'))
+    QUESTION_BANK_REFILL_INTERVAL = float(os.getenv('QUESTION_BANK_REFILL_INTERVAL', '300'))
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'interview_simulator.db')
     UPLOAD_FOLDER = 'uploads'
     ALLOWED_EXTENSIONS = {'pdf'}
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 
+    # PDF text extraction limits
+    PDF_MAX_PAGES = int(os.getenv('PDF_MAX_PAGES', '30'))
+    PDF_EXTRACTION_TIMEOUT = float(os.getenv('PDF_EXTRACTION_TIMEOUT', '20'))  # seconds per document
+    PDF_PAGES_PER_TASK = int(os.getenv('PDF_PAGES_PER_TASK', '4'))
+    PDF_EXTRACTION_WORKERS = int(os.getenv('PDF_EXTRACTION_WORKERS', '2'))
+
+    # Token budgets for CV text and CV analysis pasted into prompts
+    CV_TOKEN_BUDGET = int(os.getenv('CV_TOKEN_BUDGET', '1500'))
+    CV_ANALYSIS_TOKEN_BUDGET = int(os.getenv('CV_ANALYSIS_TOKEN_BUDGET', '600'))
+
+    # Database connection pool
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+    DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+
+    # SQLite storage profiles. 'concurrent' uses WAL so readers never block
+    # writers and many interview sessions can write at the same time;
+    # 'durable' keeps SQLite's rollback journal with a full fsync per commit.
+    STORAGE_PROFILES = {
+        'durable': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'mmap_size': 0,
+            'cache_size': -2000,  # negative values are KiB
+            'busy_timeout': 5000,  # ms
+            'wal_autocheckpoint': 1000,  # pages
+            'checkpoint_interval': 0,  # seconds, 0 disables the background checkpointer
+        },
+        'concurrent': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64000,
+            'busy_timeout': 5000,
+            'wal_autocheckpoint': 10000,
+            'checkpoint_interval': 30,
+        },
+    }
+    STORAGE_PROFILE = os.getenv('STORAGE_PROFILE', 'concurrent')
+    DB_WRITE_RETRIES = int(os.getenv('DB_WRITE_RETRIES', '5'))
+
 def allowed_file(filename: str) -> bool:
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
\ No newline at end of file
@@ -0,0 +1,259 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Tuple
+
+from utils.metrics import REGISTRY
+
+
+def _pool_samples(*fields: str) -> Callable[['ConnectionPool'], Dict[Tuple[str, ...], float]]:
+    """Collector callback reading ``fields`` from a pool's stats, one label value each."""
+    def collect(pool: 'ConnectionPool') -> Dict[Tuple[str, ...], float]:
+        if pool._closed:
+            return {}
+        stats = pool.stats()
+        if len(fields) == 1:
+            return {(pool.db_path,): stats[fields[0]]}
+        return {(pool.db_path, field): stats[field] for field in fields}
+    return collect
+
+
+POOL_METRICS = (
+    REGISTRY.collector('db_pool_connections', 'Open pooled SQLite connections by state.',
+                       ('database', 'state'), _pool_samples('in_use', 'idle')),
+    REGISTRY.collector('db_pool_size', 'Most connections a pool may open.',
+                       ('database',), _pool_samples('size')),
+    REGISTRY.collector('db_pool_checkouts_total', 'Connections handed out by the pools.',
+                       ('database',), _pool_samples('checkouts'), kind='counter'),
+    REGISTRY.collector('db_pool_waits_total', 'Checkouts that had to wait for a connection.',
+                       ('database',), _pool_samples('waits'), kind='counter'),
+    REGISTRY.collector('db_pool_replaced_total', 'Broken connections replaced on checkout.',
+                       ('database',), _pool_samples('replaced'), kind='counter'),
+)
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """Thread-safe pool of reusable SQLite connections.
+
+    Connections are created lazily up to ``size`` and handed out through
+    :meth:`connection`. Pools are shared per database file and storage
+    profile via :meth:`for_path`, so Streamlit reruns and sessions reuse the
+    same connections instead of reconnecting on every call. Each
+    ``for_path`` is paired with a :meth:`release`; the pool closes when the
+    last user releases it.
+    """
+
+    _registry: Dict[Tuple[str, str], 'ConnectionPool'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_path: str, connect: Callable[[], sqlite3.Connection],
+                 size: int = 5, timeout: float = 30.0):
+        self.db_path = db_path
+        self._connect = connect
+        # Every ':memory:' connection is a separate database, so an in-memory
+        # pool can only ever hold one connection.
+        self.size = 1 if db_path == ':memory:' else max(1, size)
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkouts = 0
+        self._replaced = 0
+        self._waits = 0
+        self._closed = False
+        self._refs = 0
+        for metric in POOL_METRICS:
+            metric.add(self)
+
+    @classmethod
+    def for_path(cls, db_path: str, connect: Callable[[], sqlite3.Connection],
+                 size: int = 5, timeout: float = 30.0,
+                 profile: str = 'default') -> 'ConnectionPool':
+        """Take a reference to the process-wide pool for ``db_path`` and ``profile``.
+
+        Connections are configured by the profile, so managers using
+        different profiles never share a pool. A later caller asking for a
+        larger ``size`` grows the shared pool.
+        """
+        key = (db_path if db_path == ':memory:' else os.path.abspath(db_path), profile)
+        with cls._registry_lock:
+            pool = cls._registry.get(key)
+            if pool is None or pool._closed:
+                pool = cls(db_path, connect, size=size, timeout=timeout)
+                cls._registry[key] = pool
+            elif db_path != ':memory:':
+                with pool._lock:
+                    pool.size = max(pool.size, size)
+            pool._refs += 1
+            return pool
+
+    def release(self) -> bool:
+        """Drop one :meth:`for_path` reference; close the pool with the last one.
+
+        Returns True if the pool was closed.
+        """
+        registry = type(self)._registry
+        with self._registry_lock:
+            self._refs -= 1
+            if self._refs > 0:
+                return False
+            for key, pool in list(registry.items()):
+                if pool is self:
+                    del registry[key]
+        self.close()
+        return True
+
+    @classmethod
+    def close_all(cls):
+        """Close every registered pool."""
+        with cls._registry_lock:
+            pools = list(cls._registry.values())
+            cls._registry.clear()
+        for pool in pools:
+            pool.close()
+
+    def _acquire(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        while True:
+            conn = None
+            create = False
+            with self._lock:
+                if self._closed:
+                    raise PoolTimeoutError(f"Connection pool for {self.db_path} is closed")
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    if self._created < self.size:
+                        self._created += 1
+                        create = True
+                if conn is not None or create:
+                    self._in_use += 1
+                    self._checkouts += 1
+                elif not waited:
+                    waited = True
+                    self._waits += 1
+
+            if conn is not None:
+                return self._ensure_healthy(conn)
+            if create:
+                try:
+                    return self._connect()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                        self._in_use -= 1
+                    raise
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise PoolTimeoutError(
+                    f"Timed out after {self.timeout}s waiting for a database connection"
+                )
+            # Poll in short slices so capacity freed by a discarded connection
+            # is noticed as well as connections returned to the idle queue.
+            try:
+                conn = self._idle.get(timeout=min(remaining, 0.05))
+            except queue.Empty:
+                continue
+            with self._lock:
+                self._in_use += 1
+                self._checkouts += 1
+            return self._ensure_healthy(conn)
+
+    def _ensure_healthy(self, conn: sqlite3.Connection) -> sqlite3.Connection:
+        """Replace a connection that no longer answers a trivial query."""
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return conn
+        except sqlite3.Error:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            with self._lock:
+                self._replaced += 1
+            try:
+                return self._connect()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                    self._in_use -= 1
+                raise
+
+    def _release(self, conn: sqlite3.Connection, discard: bool = False):
+        if not discard and conn.in_transaction:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+
+        with self._lock:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._created -= 1
+                close = True
+            else:
+                close = False
+        if close:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        else:
+            self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        """Check out a pooled connection for the duration of the block.
+
+        Any transaction left open when the block exits (for example because
+        of an exception) is rolled back before the connection is returned.
+        """
+        conn = self._acquire()
+        discard = False
+        try:
+            yield conn
+        except sqlite3.DatabaseError as e:
+            # Corruption or a closed handle should not go back into the pool.
+            discard = not isinstance(e, (sqlite3.IntegrityError, sqlite3.OperationalError))
+            raise
+        finally:
+            self._release(conn, discard=discard)
+
+    def close(self):
+        """Close all idle connections; busy ones are closed when released."""
+        with self._lock:
+            self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._created -= 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool counters."""
+        with self._lock:
+            return {
+                'size': self.size,
+                'connections': self._created,
+                'in_use': self._in_use,
+                'idle': self._created - self._in_use,
+                'checkouts': self._checkouts,
+                'waits': self._waits,
+                'replaced': self._replaced,
+            }
@@ -1,124 +1,401 @@
 import sqlite3
-from typing import Optional, List, Dict, Any
+import hashlib
+import re
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Any, Iterable, Sequence, Tuple
 from datetime import datetime
 import os
 from config import Config
+from database.connection_pool import ConnectionPool
+from database.migrator import apply_migrations, get_schema_version
+from database.storage import (
+    WalCheckpointer, apply_connection_pragmas, apply_database_pragmas,
+    get_storage_profile, retry_on_busy
+)
+from utils.metrics import Instrument, instrument_methods
 
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+SEARCH_TERM_PATTERN = re.compile(r'\w+')
+# Dropped from searches: they match nearly every row, and bm25 reads the
+# whole doclist of each term to weigh it
+SEARCH_STOPWORDS = frozenset(
+    'a an and are as at be by do does for from how i in is it of on or the this '
+    'to was what when where which who why with you your'.split()
+)
+DB_CALLS = Instrument('db_call', 'DatabaseManager calls', label='method')
+
+def question_hash(question_text: str) -> str:
+    """Hash of a question's normalized text, used to spot repeated questions."""
+    normalized = ' '.join(question_text.lower().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+
+def search_expression(text: str) -> Optional[str]:
+    """FTS5 query matching every word of ``text``.
+    
+    Words are quoted, so operators and punctuation typed by the user are
+    never parsed as query syntax, and stopwords are left out unless there
+    is nothing else. There is no prefix matching (it reads the doclists of
+    every term with the prefix); the porter stemmer already matches other
+    forms of a word. Returns None if there is nothing to match.
+    """
+    words = SEARCH_TERM_PATTERN.findall(text.lower())
+    terms = [word for word in words if word not in SEARCH_STOPWORDS] or words
+    return ' '.join(f'"{term}"' for term in terms) if terms else None
+
+@instrument_methods(DB_CALLS, exclude=('get_connection', 'connection', 'transaction'))
 class DatabaseManager:
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, pool_size: Optional[int] = None,
+                 storage_profile: Optional[str] = None):
         self.db_path = db_path or Config.DATABASE_PATH
+        self.storage_profile_name = storage_profile or Config.STORAGE_PROFILE
+        self.storage_profile = get_storage_profile(self.storage_profile_name)
+        self.write_retries = Config.DB_WRITE_RETRIES
+        self.busy_retries = 0
+        self.journal_mode = None
+        self.checkpointer = None
+        self.schema_version = 0
+        self._closed = False
+        self.pool = ConnectionPool.for_path(
+            self.db_path,
+            self.get_connection,
+            size=pool_size or Config.DB_POOL_SIZE,
+            timeout=Config.DB_POOL_TIMEOUT,
+            profile=self.storage_profile_name
+        )
         self.init_db()
     
     def get_connection(self):
-        """Create and return a database connection."""
-        conn = sqlite3.connect(self.db_path)
+        """Create and return a new, unpooled database connection."""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.storage_profile['busy_timeout'] / 1000,
+            check_same_thread=False
+        )
         conn.row_factory = sqlite3.Row
+        apply_connection_pragmas(conn, self.storage_profile)
         return conn
     
+    def connection(self):
+        """Check out a pooled connection as a context manager."""
+        return self.pool.connection()
+    
+    @contextmanager
+    def transaction(self):
+        """Unit of work: run a block of statements in one atomic transaction.
+        
+        The write lock is taken up front (BEGIN IMMEDIATE); the block is
+        committed once on success and rolled back on any exception.
+        """
+        with self.connection() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+    
+    def bulk_insert(self, table: str, columns: Sequence[str],
+                    rows: Iterable[Sequence[Any]],
+                    conn: Optional[sqlite3.Connection] = None) -> int:
+        """Insert many rows with a single executemany and return the row count.
+        
+        Pass ``conn`` from :meth:`transaction` to take part in a larger unit
+        of work; otherwise the rows are committed in their own transaction.
+        """
+        for identifier in (table, *columns):
+            if not IDENTIFIER_PATTERN.match(identifier):
+                raise ValueError(f"Invalid SQL identifier: {identifier!r}")
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            table, ', '.join(columns), ', '.join('?' for _ in columns)
+        )
+        
+        if conn is not None:
+            return conn.executemany(sql, rows).rowcount
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+    
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool metrics."""
+        return self.pool.stats()
+    
+    def close(self):
+        """Release this manager's share of the pool and checkpointer.
+        
+        They are closed once no other manager on the same database uses
+        them. Calling close more than once has no further effect.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self.checkpointer is not None:
+            WalCheckpointer.release_for_path(self.db_path)
+        self.pool.release()
+    
     def init_db(self):
-        """Initialize the database with schema."""
+        """Initialize the database with schema, migrations and the storage profile."""
         schema_path = os.path.join(os.path.dirname(__file__), 'schema.sql')
         with open(schema_path, 'r') as f:
             schema = f.read()
         
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
+            self.journal_mode = apply_database_pragmas(conn, self.storage_profile)
             conn.executescript(schema)
             conn.commit()
-        finally:
-            conn.close()
+            apply_migrations(conn)
+            self.schema_version = get_schema_version(conn)
+        
+        interval = self.storage_profile.get('checkpoint_interval', 0)
+        if self.journal_mode == 'wal' and interval > 0:
+            self.checkpointer = WalCheckpointer.start_for_path(
+                self.db_path, self.get_connection, interval
+            )
+    
+    def storage_stats(self) -> Dict[str, Any]:
+        """Return storage metrics: journal mode, busy retries and checkpoints."""
+        stats = {
+            'journal_mode': self.journal_mode,
+            'busy_retries': self.busy_retries,
+        }
+        if self.checkpointer is not None:
+            stats.update(self.checkpointer.stats())
+        return stats
     
     # User operations
+    @retry_on_busy
     def create_user(self, username: str, email: str, password_hash: str) -> Optional[int]:
         """Create a new user and return the user ID."""
-        conn = self.get_connection()
         try:
-            cursor = conn.execute(
-                'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
-                (username, email, password_hash)
-            )
-            conn.commit()
-            return cursor.lastrowid
+            with self.connection() as conn:
+                cursor = conn.execute(
+                    'INSERT INTO users (username, email, password_hash) VALUES (?, ?, ?)',
+                    (username, email, password_hash)
+                )
+                conn.commit()
+                return cursor.lastrowid
         except sqlite3.IntegrityError:
             return None
-        finally:
-            conn.close()
     
     def get_user_by_username(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user by username."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute('SELECT * FROM users WHERE username = ?', (username,))
             row = cursor.fetchone()
             return dict(row) if row else None
-        finally:
-            conn.close()
     
     def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute('SELECT * FROM users WHERE email = ?', (email,))
             row = cursor.fetchone()
             return dict(row) if row else None
-        finally:
-            conn.close()
     
     def get_user_by_id(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Get user by ID."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute('SELECT * FROM users WHERE id = ?', (user_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
-        finally:
-            conn.close()
+    
+    @retry_on_busy
+    def update_user_password_hash(self, user_id: int, password_hash: str):
+        """Replace a user's stored password hash."""
+        with self.connection() as conn:
+            conn.execute(
+                'UPDATE users SET password_hash = ? WHERE id = ?',
+                (password_hash, user_id)
+            )
+            conn.commit()
     
     # Interview operations
+    @retry_on_busy
     def create_interview(self, user_id: int, cv_filename: Optional[str],
                         cv_analysis: Optional[str], question_count: int,
-                        difficulty_level: str) -> int:
+                        difficulty_level: str, cv_document_id: Optional[int] = None) -> int:
         """Create a new interview and return the interview ID."""
-        conn = self.get_connection()
-        try:
+        with self.transaction() as conn:
             cursor = conn.execute(
                 '''INSERT INTO interviews 
-                   (user_id, cv_filename, cv_analysis, question_count, difficulty_level)
-                   VALUES (?, ?, ?, ?, ?)''',
-                (user_id, cv_filename, cv_analysis, question_count, difficulty_level)
+                   (user_id, cv_filename, cv_analysis, cv_document_id,
+                    question_count, difficulty_level)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (user_id, cv_filename, cv_analysis, cv_document_id,
+                 question_count, difficulty_level)
             )
-            conn.commit()
+            self._count_new_interview(conn, user_id)
             return cursor.lastrowid
-        finally:
-            conn.close()
+    
+    @retry_on_busy
+    def create_interview_with_questions(self, user_id: int, cv_filename: Optional[str],
+                                        cv_analysis: Optional[str], difficulty_level: str,
+                                        questions: List[str],
+                                        cv_document_id: Optional[int] = None,
+                                        question_count: Optional[int] = None) -> Dict[str, Any]:
+        """Create an interview with its CV analysis and questions atomically.
+        
+        ``question_count`` is the interview's length when only its first
+        questions are known yet (default: ``len(questions)``).
+        
+        Returns:
+            Dict with 'interview_id' and 'question_ids' (in question order)
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                '''INSERT INTO interviews 
+                   (user_id, cv_filename, cv_analysis, cv_document_id,
+                    question_count, difficulty_level)
+                   VALUES (?, ?, ?, ?, ?, ?)''',
+                (user_id, cv_filename, cv_analysis, cv_document_id,
+                 question_count or len(questions), difficulty_level)
+            )
+            interview_id = cursor.lastrowid
+            self._count_new_interview(conn, user_id)
+            self.bulk_insert(
+                'questions',
+                ('interview_id', 'question_text', 'question_order'),
+                [(interview_id, text, order) for order, text in enumerate(questions, 1)],
+                conn=conn
+            )
+            cursor = conn.execute(
+                'SELECT id FROM questions WHERE interview_id = ? ORDER BY question_order',
+                (interview_id,)
+            )
+            question_ids = [row['id'] for row in cursor.fetchall()]
+        
+        return {'interview_id': interview_id, 'question_ids': question_ids}
     
     def get_interview(self, interview_id: int) -> Optional[Dict[str, Any]]:
-        """Get interview by ID."""
-        conn = self.get_connection()
-        try:
-            cursor = conn.execute('SELECT * FROM interviews WHERE id = ?', (interview_id,))
+        """Get interview by ID, with the CV analysis resolved from its CV document."""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                '''SELECT i.id, i.user_id, i.cv_filename,
+                          COALESCE(i.cv_analysis, d.analysis) AS cv_analysis,
+                          i.cv_document_id, i.question_count, i.difficulty_level,
+                          i.score, i.status, i.created_at, i.completed_at
+                   FROM interviews i
+                   LEFT JOIN cv_documents d ON d.id = i.cv_document_id
+                   WHERE i.id = ?''',
+                (interview_id,)
+            )
             row = cursor.fetchone()
             return dict(row) if row else None
-        finally:
-            conn.close()
     
     def get_user_interviews(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all interviews for a user."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 'SELECT * FROM interviews WHERE user_id = ? ORDER BY created_at DESC',
                 (user_id,)
             )
             return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
     
+    def get_user_interviews_page(self, user_id: int, limit: int,
+                                 before: Optional[Tuple[str, int]] = None) -> Dict[str, Any]:
+        """Get one page of a user's interviews, newest first.
+        
+        Only the columns the history list shows are read. ``before`` is the
+        ``next_cursor`` of the previous page; the query seeks to it on the
+        (user_id, created_at, id) index, so every page costs the same no
+        matter how deep into the history it is.
+        
+        Returns:
+            Dictionary with 'interviews' and 'next_cursor' ((created_at, id)
+            of the last row, or None on the last page)
+        """
+        columns = 'id, created_at, status, difficulty_level, question_count, score, completed_at'
+        with self.connection() as conn:
+            if before is None:
+                cursor = conn.execute(
+                    f'''SELECT {columns} FROM interviews
+                       WHERE user_id = ?
+                       ORDER BY created_at DESC, id DESC LIMIT ?''',
+                    (user_id, limit + 1)
+                )
+            else:
+                cursor = conn.execute(
+                    f'''SELECT {columns} FROM interviews
+                       WHERE user_id = ? AND (created_at, id) < (?, ?)
+                       ORDER BY created_at DESC, id DESC LIMIT ?''',
+                    (user_id, before[0], before[1], limit + 1)
+                )
+            interviews = [dict(row) for row in cursor.fetchall()]
+        
+        # The extra row only tells whether another page exists
+        next_cursor = None
+        if len(interviews) > limit:
+            interviews = interviews[:limit]
+            next_cursor = (interviews[-1]['created_at'], interviews[-1]['id'])
+        return {'interviews': interviews, 'next_cursor': next_cursor}
+    
+    def search_history(self, user_id: int, text: str, limit: int,
+                       offset: int = 0) -> Dict[str, Any]:
+        """Search a user's questions, answers and evaluations, best match first.
+        
+        Matches come from the questions_fts and evaluations_fts indexes,
+        restricted to the user's own rows by their owner token, and are
+        ranked by bm25 with question text weighted above answers. ``offset``
+        is the ``next_cursor`` of the previous page.
+        
+        Returns:
+            Dictionary with 'results' (kind 'question' or 'evaluation',
+            interview_id, question_id, snippet with the match in **bold**,
+            created_at, difficulty_level) and 'next_cursor' (None on the
+            last page)
+        """
+        expression = search_expression(text)
+        if expression is None:
+            return {'results': [], 'next_cursor': None}
+        owner = f'owner:"user{user_id}"'
+        question_match = f'{owner} AND {{question_text answer_text}}: ({expression})'
+        evaluation_match = f'{owner} AND {{feedback evaluation_text}}: ({expression})'
+        with self.connection() as conn:
+            cursor = conn.execute(
+                '''SELECT 'question' AS kind, q.interview_id, q.id AS question_id,
+                          snippet(questions_fts, -1, '**', '**', '...', 16) AS snippet,
+                          bm25(questions_fts, 2.0, 1.0, 0.0) AS rank
+                   FROM questions_fts JOIN questions q ON q.id = questions_fts.rowid
+                   WHERE questions_fts MATCH ?
+                   UNION ALL
+                   SELECT 'evaluation', e.interview_id, NULL,
+                          snippet(evaluations_fts, -1, '**', '**', '...', 16),
+                          bm25(evaluations_fts, 1.0, 1.0, 0.0)
+                   FROM evaluations_fts JOIN evaluations e ON e.id = evaluations_fts.rowid
+                   WHERE evaluations_fts MATCH ?
+                   ORDER BY rank, interview_id DESC, question_id
+                   LIMIT ? OFFSET ?''',
+                (question_match, evaluation_match, limit + 1, offset)
+            )
+            results = [dict(row) for row in cursor.fetchall()]
+            if results:
+                interview_ids = {result['interview_id'] for result in results}
+                placeholders = ','.join('?' * len(interview_ids))
+                cursor = conn.execute(
+                    f'''SELECT id, created_at, difficulty_level FROM interviews
+                        WHERE id IN ({placeholders})''',
+                    tuple(interview_ids)
+                )
+                interviews = {row['id']: row for row in cursor.fetchall()}
+        
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_cursor = offset + limit
+        for result in results:
+            interview = interviews[result['interview_id']]
+            result['created_at'] = interview['created_at']
+            result['difficulty_level'] = interview['difficulty_level']
+        return {'results': results, 'next_cursor': next_cursor}
+    
+    @retry_on_busy
     def update_interview_status(self, interview_id: int, status: str,
                                score: Optional[float] = None):
-        """Update interview status and optionally score."""
-        conn = self.get_connection()
-        try:
+        """Update interview status and optionally score (and the user's stats)."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                'SELECT user_id, status, score FROM interviews WHERE id = ?',
+                (interview_id,)
+            )
+            previous = cursor.fetchone()
             if status == 'completed':
                 conn.execute(
                     '''UPDATE interviews 
@@ -131,16 +408,60 @@ class DatabaseManager:
                     'UPDATE interviews SET status = ?, score = ? WHERE id = ?',
                     (status, score, interview_id)
                 )
-            conn.commit()
-        finally:
-            conn.close()
+            if previous is not None:
+                # Apply the difference, so repeated updates never double count
+                old_completed = previous['status'] == 'completed'
+                old_score = previous['score'] if old_completed else None
+                new_completed = status == 'completed'
+                new_score = score if new_completed else None
+                conn.execute(
+                    '''UPDATE user_stats
+                       SET completed_interviews = completed_interviews + ?,
+                           scored_interviews = scored_interviews + ?,
+                           score_sum = score_sum + ?,
+                           last_activity_at = CURRENT_TIMESTAMP
+                       WHERE user_id = ?''',
+                    (int(new_completed) - int(old_completed),
+                     int(new_score is not None) - int(old_score is not None),
+                     (new_score or 0) - (old_score or 0),
+                     previous['user_id'])
+                )
+    
+    def _count_new_interview(self, conn, user_id: int):
+        """Add a new interview to the user's stats (inside the caller's transaction)."""
+        conn.execute(
+            '''INSERT INTO user_stats (user_id, total_interviews, last_activity_at)
+               VALUES (?, 1, CURRENT_TIMESTAMP)
+               ON CONFLICT (user_id) DO UPDATE SET
+                   total_interviews = total_interviews + 1,
+                   last_activity_at = excluded.last_activity_at''',
+            (user_id,)
+        )
+    
+    def get_user_stats(self, user_id: int) -> Dict[str, Any]:
+        """Interview counts, average score and last activity for a user.
+        
+        The average is over scored interviews only; it is None until the
+        user has one.
+        """
+        with self.connection() as conn:
+            cursor = conn.execute('SELECT * FROM user_stats WHERE user_id = ?', (user_id,))
+            row = cursor.fetchone()
+        stats = dict(row) if row else {
+            'user_id': user_id, 'total_interviews': 0, 'completed_interviews': 0,
+            'scored_interviews': 0, 'score_sum': 0.0, 'last_activity_at': None
+        }
+        stats['average_score'] = (
+            stats['score_sum'] / stats['scored_interviews'] if stats['scored_interviews'] else None
+        )
+        return stats
     
     # Question operations
+    @retry_on_busy
     def add_question(self, interview_id: int, question_text: str,
                     question_order: int) -> int:
         """Add a question to an interview."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 '''INSERT INTO questions (interview_id, question_text, question_order)
                    VALUES (?, ?, ?)''',
@@ -148,39 +469,40 @@ class DatabaseManager:
             )
             conn.commit()
             return cursor.lastrowid
-        finally:
-            conn.close()
     
+    @retry_on_busy
     def update_question_answer(self, question_id: int, answer_text: str):
         """Update the answer for a question."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             conn.execute(
                 'UPDATE questions SET answer_text = ? WHERE id = ?',
                 (answer_text, question_id)
             )
             conn.commit()
-        finally:
-            conn.close()
+    
+    @retry_on_busy
+    def update_question_answers(self, updates: Iterable[Tuple[str, int]]) -> int:
+        """Update many answers, given as (answer_text, question_id), in one transaction."""
+        updates = list(updates)
+        with self.transaction() as conn:
+            conn.executemany('UPDATE questions SET answer_text = ? WHERE id = ?', updates)
+        return len(updates)
     
     def get_interview_questions(self, interview_id: int) -> List[Dict[str, Any]]:
         """Get all questions for an interview."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 'SELECT * FROM questions WHERE interview_id = ? ORDER BY question_order',
                 (interview_id,)
             )
             return [dict(row) for row in cursor.fetchall()]
-        finally:
-            conn.close()
     
     # Evaluation operations
+    @retry_on_busy
     def create_evaluation(self, interview_id: int, evaluation_text: str,
                          score: float, feedback: str) -> int:
         """Create an evaluation for an interview."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 '''INSERT INTO evaluations 
                    (interview_id, evaluation_text, score, feedback)
@@ -189,18 +511,300 @@ class DatabaseManager:
             )
             conn.commit()
             return cursor.lastrowid
-        finally:
-            conn.close()
     
     def get_interview_evaluation(self, interview_id: int) -> Optional[Dict[str, Any]]:
         """Get evaluation for an interview."""
-        conn = self.get_connection()
-        try:
+        with self.connection() as conn:
             cursor = conn.execute(
                 'SELECT * FROM evaluations WHERE interview_id = ? ORDER BY created_at DESC LIMIT 1',
                 (interview_id,)
             )
             row = cursor.fetchone()
             return dict(row) if row else None
-        finally:
-            conn.close()
\ No newline at end of file
+    
+    # Completion cache operations
+    def get_cached_completion(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Get a cached LLM completion by key (expired entries included)."""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                'SELECT * FROM completion_cache WHERE cache_key = ?',
+                (cache_key,)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    @retry_on_busy
+    def set_cached_completion(self, cache_key: str, response: str,
+                              created_at: float, expires_at: Optional[float]):
+        """Insert or replace a cached LLM completion."""
+        with self.connection() as conn:
+            conn.execute(
+                '''INSERT OR REPLACE INTO completion_cache
+                   (cache_key, response, created_at, expires_at)
+                   VALUES (?, ?, ?, ?)''',
+                (cache_key, response, created_at, expires_at)
+            )
+            conn.commit()
+    
+    @retry_on_busy
+    def delete_cached_completion(self, cache_key: str):
+        """Remove a cached LLM completion."""
+        with self.connection() as conn:
+            conn.execute('DELETE FROM completion_cache WHERE cache_key = ?', (cache_key,))
+            conn.commit()
+    
+    @retry_on_busy
+    def purge_expired_completions(self, now: float) -> int:
+        """Delete cached completions that expired before ``now``; return the count."""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                'DELETE FROM completion_cache WHERE expires_at IS NOT NULL AND expires_at <= ?',
+                (now,)
+            )
+            conn.commit()
+            return cursor.rowcount
+    
+    @retry_on_busy
+    def trim_cached_completions(self, max_rows: int) -> int:
+        """Delete the oldest cached completions beyond ``max_rows``; return the count."""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                '''DELETE FROM completion_cache WHERE cache_key IN (
+                       SELECT cache_key FROM completion_cache
+                       ORDER BY created_at DESC LIMIT -1 OFFSET ?
+                   )''',
+                (max_rows,)
+            )
+            conn.commit()
+            return cursor.rowcount
+    
+    # Question bank operations
+    @retry_on_busy
+    def add_bank_questions(self, difficulty_level: str, topic: str,
+                           questions: List[str]) -> int:
+        """Add questions to a bank bucket, skipping duplicates; return how many were added."""
+        with self.transaction() as conn:
+            cursor = conn.executemany(
+                '''INSERT OR IGNORE INTO question_bank
+                   (difficulty_level, topic, question_text, question_hash)
+                   VALUES (?, ?, ?, ?)''',
+                [(difficulty_level, topic, q, question_hash(q)) for q in questions]
+            )
+            return cursor.rowcount
+    
+    def count_bank_questions(self, difficulty_level: str, topic: str) -> int:
+        """Count the questions available in a bank bucket."""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                '''SELECT COUNT(*) FROM question_bank
+                   WHERE difficulty_level = ? AND topic = ?''',
+                (difficulty_level, topic)
+            )
+            return cursor.fetchone()[0]
+    
+    @retry_on_busy
+    def draw_bank_questions(self, user_id: int, difficulty_level: str, topic: str,
+                            limit: int) -> List[str]:
+        """Take up to ``limit`` questions the user has not seen out of a bank bucket.
+        
+        Drawn questions are removed from the bank and recorded as seen by
+        the user, all in one transaction.
+        """
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                '''SELECT id, question_text, question_hash FROM question_bank
+                   WHERE difficulty_level = ? AND topic = ?
+                     AND question_hash NOT IN (
+                         SELECT question_hash FROM user_seen_questions WHERE user_id = ?
+                     )
+                   LIMIT ?''',
+                (difficulty_level, topic, user_id, limit)
+            )
+            rows = cursor.fetchall()
+            conn.executemany(
+                'DELETE FROM question_bank WHERE id = ?',
+                [(row['id'],) for row in rows]
+            )
+            conn.executemany(
+                'INSERT OR IGNORE INTO user_seen_questions (user_id, question_hash) VALUES (?, ?)',
+                [(user_id, row['question_hash']) for row in rows]
+            )
+            return [row['question_text'] for row in rows]
+    
+    @retry_on_busy
+    def mark_questions_seen(self, user_id: int, questions: List[str]):
+        """Record questions as already asked to the user."""
+        with self.transaction() as conn:
+            conn.executemany(
+                'INSERT OR IGNORE INTO user_seen_questions (user_id, question_hash) VALUES (?, ?)',
+                [(user_id, question_hash(q)) for q in questions]
+            )
+    
+    # CV document operations
+    def get_cv_document_by_hash(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get a stored CV by the SHA-256 of its file bytes."""
+        with self.connection() as conn:
+            cursor = conn.execute(
+                'SELECT * FROM cv_documents WHERE content_hash = ?',
+                (content_hash,)
+            )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def get_cv_document(self, cv_document_id: int) -> Optional[Dict[str, Any]]:
+        """Get a stored CV by ID."""
+        with self.connection() as conn:
+            cursor = conn.execute('SELECT * FROM cv_documents WHERE id = ?', (cv_document_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    @retry_on_busy
+    def save_cv_document(self, content_hash: str, extracted_text: str,
+                         analysis: Optional[str] = None) -> int:
+        """Store a CV's text and analysis (keeping an existing analysis) and return its ID."""
+        with self.transaction() as conn:
+            conn.execute(
+                '''INSERT INTO cv_documents (content_hash, extracted_text, analysis, analyzed_at)
+                   VALUES (?, ?, ?, CASE WHEN ? IS NULL THEN NULL ELSE CURRENT_TIMESTAMP END)
+                   ON CONFLICT (content_hash) DO UPDATE SET
+                       extracted_text = excluded.extracted_text,
+                       file_data = NULL,
+                       analysis = COALESCE(excluded.analysis, cv_documents.analysis),
+                       analyzed_at = COALESCE(excluded.analyzed_at, cv_documents.analyzed_at)''',
+                (content_hash, extracted_text, analysis, analysis)
+            )
+            cursor = conn.execute(
+                'SELECT id FROM cv_documents WHERE content_hash = ?',
+                (content_hash,)
+            )
+            return cursor.fetchone()['id']
+    
+    @retry_on_busy
+    def save_cv_upload(self, content_hash: str, file_data: bytes) -> int:
+        """Store uploaded CV bytes until their text is extracted; return the document ID.
+        
+        A CV whose text is already stored keeps its record as it is.
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                '''INSERT INTO cv_documents (content_hash, file_data) VALUES (?, ?)
+                   ON CONFLICT (content_hash) DO UPDATE SET file_data = excluded.file_data
+                   WHERE cv_documents.extracted_text IS NULL''',
+                (content_hash, file_data)
+            )
+            cursor = conn.execute(
+                'SELECT id FROM cv_documents WHERE content_hash = ?',
+                (content_hash,)
+            )
+            return cursor.fetchone()['id']
+    
+    # Background job operations
+    @retry_on_busy
+    def enqueue_job(self, job_type: str, idempotency_key: str, payload: str,
+                    max_attempts: int, now: float) -> int:
+        """Queue a job unless one with the same key exists; return the job ID.
+        
+        A job with the same key that has failed for good is queued again;
+        queued, running and finished jobs are returned as they are.
+        """
+        with self.transaction() as conn:
+            conn.execute(
+                '''INSERT INTO jobs (job_type, idempotency_key, payload, max_attempts,
+                                     run_after, created_at, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (idempotency_key) DO UPDATE SET
+                       status = 'queued', attempts = 0, last_error = NULL,
+                       payload = excluded.payload, max_attempts = excluded.max_attempts,
+                       run_after = excluded.run_after, updated_at = excluded.updated_at
+                   WHERE jobs.status = 'failed'
+                ''',
+                (job_type, idempotency_key, payload, max_attempts, now, now, now)
+            )
+            cursor = conn.execute(
+                'SELECT id FROM jobs WHERE idempotency_key = ?',
+                (idempotency_key,)
+            )
+            return cursor.fetchone()['id']
+    
+    @retry_on_busy
+    def claim_job(self, worker_id: str, job_types: Sequence[str], lease_seconds: float,
+                  now: float) -> Optional[Dict[str, Any]]:
+        """Lease the next runnable job of ``job_types`` to ``worker_id``.
+        
+        Runnable jobs are queued jobs that are due and running jobs whose
+        lease has expired. The attempt counter is incremented on claim. A
+        job whose lease expired on its last attempt is failed instead of
+        claimed, so a job that keeps killing its worker stops being retried.
+        """
+        if not job_types:
+            return None
+        placeholders = ', '.join('?' for _ in job_types)
+        with self.transaction() as conn:
+            conn.execute(
+                f'''UPDATE jobs SET status = 'failed',
+                        last_error = 'Worker lease expired on the last attempt',
+                        locked_by = NULL, lease_expires_at = NULL, updated_at = ?
+                    WHERE job_type IN ({placeholders})
+                      AND status = 'running' AND lease_expires_at <= ?
+                      AND attempts >= max_attempts''',
+                (now, *job_types, now)
+            )
+            cursor = conn.execute(
+                f'''SELECT id FROM jobs
+                    WHERE job_type IN ({placeholders})
+                      AND ((status = 'queued' AND run_after <= ?)
+                           OR (status = 'running' AND lease_expires_at <= ?))
+                    ORDER BY run_after, id
+                    LIMIT 1''',
+                (*job_types, now, now)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                '''UPDATE jobs SET status = 'running', attempts = attempts + 1,
+                       locked_by = ?, lease_expires_at = ?, updated_at = ?
+                   WHERE id = ?''',
+                (worker_id, now + lease_seconds, now, row['id'])
+            )
+            cursor = conn.execute('SELECT * FROM jobs WHERE id = ?', (row['id'],))
+            return dict(cursor.fetchone())
+    
+    @retry_on_busy
+    def complete_job(self, job_id: int, worker_id: str, result: str, now: float) -> bool:
+        """Mark a job as succeeded; False if ``worker_id`` no longer holds it."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                '''UPDATE jobs SET status = 'succeeded', result = ?, last_error = NULL,
+                       locked_by = NULL, lease_expires_at = NULL, updated_at = ?
+                   WHERE id = ? AND status = 'running' AND locked_by = ?''',
+                (result, now, job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    @retry_on_busy
+    def fail_job(self, job_id: int, worker_id: str, error: str,
+                 retry_at: Optional[float], now: float) -> bool:
+        """Record a failed attempt: requeue at ``retry_at`` or, if None, fail the job."""
+        with self.transaction() as conn:
+            cursor = conn.execute(
+                '''UPDATE jobs SET status = ?, last_error = ?, run_after = COALESCE(?, run_after),
+                       locked_by = NULL, lease_expires_at = NULL, updated_at = ?
+                   WHERE id = ? AND status = 'running' AND locked_by = ?''',
+                ('queued' if retry_at is not None else 'failed', error, retry_at, now,
+                 job_id, worker_id)
+            )
+            return cursor.rowcount == 1
+    
+    def get_job(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Get a job by ID."""
+        with self.connection() as conn:
+            cursor = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+    
+    def count_jobs_by_status(self) -> Dict[str, int]:
+        """Number of jobs in each status."""
+        with self.connection() as conn:
+            cursor = conn.execute('SELECT status, COUNT(*) AS n FROM jobs GROUP BY status')
+            return {row['status']: row['n'] for row in cursor.fetchall()}
\ No newline at end of file
@@ -0,0 +1,3 @@
+-- Interview history for a user, newest first (get_user_interviews)
+CREATE INDEX IF NOT EXISTS idx_interviews_user_created
+    ON interviews (user_id, created_at DESC, id DESC);
@@ -0,0 +1,3 @@
+-- Questions of an interview in display order (get_interview_questions)
+CREATE INDEX IF NOT EXISTS idx_questions_interview_order
+    ON questions (interview_id, question_order);
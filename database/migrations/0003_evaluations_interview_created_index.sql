@@ -0,0 +1,3 @@
+-- Latest evaluation of an interview (get_interview_evaluation)
+CREATE INDEX IF NOT EXISTS idx_evaluations_interview_created
+    ON evaluations (interview_id, created_at);
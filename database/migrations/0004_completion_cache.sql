@@ -0,0 +1,10 @@
+-- Persistent tier of the LLM completion cache (services/completion_cache.py)
+CREATE TABLE IF NOT EXISTS completion_cache (
+    cache_key CHAR(64) PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL
+);
+
+CREATE INDEX IF NOT EXISTS idx_completion_cache_expires
+    ON completion_cache (expires_at);
@@ -0,0 +1,20 @@
+-- Pre-generated questions, one bucket per (difficulty_level, topic).
+-- Questions are removed from the bank when they are drawn.
+CREATE TABLE IF NOT EXISTS question_bank (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    difficulty_level VARCHAR(20) NOT NULL,
+    topic VARCHAR(100) NOT NULL DEFAULT '',
+    question_text TEXT NOT NULL,
+    question_hash CHAR(64) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (difficulty_level, topic, question_hash)
+);
+
+-- Questions each user has already been asked, by normalized text hash
+CREATE TABLE IF NOT EXISTS user_seen_questions (
+    user_id INTEGER NOT NULL,
+    question_hash CHAR(64) NOT NULL,
+    seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (user_id, question_hash),
+    FOREIGN KEY (user_id) REFERENCES users(id)
+) WITHOUT ROWID;
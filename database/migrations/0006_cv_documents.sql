@@ -0,0 +1,13 @@
+-- Uploaded CVs, deduplicated by the SHA-256 of the file bytes, with their
+-- extracted text and LLM analysis. Interviews point at the shared record
+-- instead of copying the analysis into interviews.cv_analysis.
+CREATE TABLE IF NOT EXISTS cv_documents (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    content_hash CHAR(64) UNIQUE NOT NULL,
+    extracted_text TEXT,
+    analysis TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    analyzed_at TIMESTAMP
+);
+
+ALTER TABLE interviews ADD COLUMN cv_document_id INTEGER REFERENCES cv_documents(id);
@@ -0,0 +1,21 @@
+-- Durable background jobs (interview evaluation, CV analysis). A job is
+-- claimed by a worker for a lease; a job whose lease ran out (crashed
+-- worker) is picked up again. Failed attempts are retried from run_after.
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_type VARCHAR(50) NOT NULL,
+    idempotency_key VARCHAR(255) UNIQUE NOT NULL,
+    payload TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    result TEXT,
+    last_error TEXT,
+    run_after REAL NOT NULL,
+    locked_by VARCHAR(100),
+    lease_expires_at REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_status_run_after ON jobs (status, run_after);
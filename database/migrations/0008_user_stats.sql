@@ -0,0 +1,24 @@
+-- Per-user interview statistics, maintained incrementally by
+-- create_interview(_with_questions) and update_interview_status so the
+-- profile page is a single primary-key lookup.
+CREATE TABLE IF NOT EXISTS user_stats (
+    user_id INTEGER PRIMARY KEY,
+    total_interviews INTEGER NOT NULL DEFAULT 0,
+    completed_interviews INTEGER NOT NULL DEFAULT 0,
+    scored_interviews INTEGER NOT NULL DEFAULT 0,
+    score_sum REAL NOT NULL DEFAULT 0,
+    last_activity_at TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES users(id)
+);
+
+-- Backfill from existing history
+INSERT OR REPLACE INTO user_stats
+    (user_id, total_interviews, completed_interviews, scored_interviews, score_sum, last_activity_at)
+SELECT user_id,
+       COUNT(*),
+       SUM(status = 'completed'),
+       SUM(status = 'completed' AND score IS NOT NULL),
+       COALESCE(SUM(CASE WHEN status = 'completed' THEN score END), 0),
+       MAX(COALESCE(completed_at, created_at))
+FROM interviews
+GROUP BY user_id;
@@ -0,0 +1,73 @@
+-- Full-text search over interview history (DatabaseManager.search_history).
+-- The FTS5 tables are external-content indexes over views that add an
+-- owner token ('user<id>'), so a search is an index intersection with the
+-- user's own rows instead of a scan over everyone's matches. Only the
+-- index is stored; the text stays in questions and evaluations. Triggers
+-- keep the index in step with every insert, update and delete.
+CREATE VIEW IF NOT EXISTS questions_search_source AS
+SELECT q.id, q.question_text, q.answer_text, 'user' || i.user_id AS owner
+FROM questions q JOIN interviews i ON i.id = q.interview_id;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+    question_text, answer_text, owner,
+    content = 'questions_search_source', content_rowid = 'id',
+    tokenize = 'porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN
+    INSERT INTO questions_fts (rowid, question_text, answer_text, owner)
+    SELECT new.id, new.question_text, new.answer_text, 'user' || user_id
+    FROM interviews WHERE id = new.interview_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN
+    INSERT INTO questions_fts (questions_fts, rowid, question_text, answer_text, owner)
+    SELECT 'delete', old.id, old.question_text, old.answer_text, 'user' || user_id
+    FROM interviews WHERE id = old.interview_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS questions_fts_update
+AFTER UPDATE OF question_text, answer_text ON questions BEGIN
+    INSERT INTO questions_fts (questions_fts, rowid, question_text, answer_text, owner)
+    SELECT 'delete', old.id, old.question_text, old.answer_text, 'user' || user_id
+    FROM interviews WHERE id = old.interview_id;
+    INSERT INTO questions_fts (rowid, question_text, answer_text, owner)
+    SELECT new.id, new.question_text, new.answer_text, 'user' || user_id
+    FROM interviews WHERE id = new.interview_id;
+END;
+
+CREATE VIEW IF NOT EXISTS evaluations_search_source AS
+SELECT e.id, e.feedback, e.evaluation_text, 'user' || i.user_id AS owner
+FROM evaluations e JOIN interviews i ON i.id = e.interview_id;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS evaluations_fts USING fts5(
+    feedback, evaluation_text, owner,
+    content = 'evaluations_search_source', content_rowid = 'id',
+    tokenize = 'porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS evaluations_fts_insert AFTER INSERT ON evaluations BEGIN
+    INSERT INTO evaluations_fts (rowid, feedback, evaluation_text, owner)
+    SELECT new.id, new.feedback, new.evaluation_text, 'user' || user_id
+    FROM interviews WHERE id = new.interview_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS evaluations_fts_delete AFTER DELETE ON evaluations BEGIN
+    INSERT INTO evaluations_fts (evaluations_fts, rowid, feedback, evaluation_text, owner)
+    SELECT 'delete', old.id, old.feedback, old.evaluation_text, 'user' || user_id
+    FROM interviews WHERE id = old.interview_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS evaluations_fts_update
+AFTER UPDATE OF feedback, evaluation_text ON evaluations BEGIN
+    INSERT INTO evaluations_fts (evaluations_fts, rowid, feedback, evaluation_text, owner)
+    SELECT 'delete', old.id, old.feedback, old.evaluation_text, 'user' || user_id
+    FROM interviews WHERE id = old.interview_id;
+    INSERT INTO evaluations_fts (rowid, feedback, evaluation_text, owner)
+    SELECT new.id, new.feedback, new.evaluation_text, 'user' || user_id
+    FROM interviews WHERE id = new.interview_id;
+END;
+
+-- Backfill from existing history
+INSERT INTO questions_fts (questions_fts) VALUES ('rebuild');
+INSERT INTO evaluations_fts (evaluations_fts) VALUES ('rebuild');
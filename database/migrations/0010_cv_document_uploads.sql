@@ -0,0 +1,4 @@
+-- Uploaded CV bytes waiting for a background analysis job. The job payload
+-- carries only the content hash; the bytes are cleared once the text has
+-- been extracted (DatabaseManager.save_cv_document).
+ALTER TABLE cv_documents ADD COLUMN file_data BLOB;
@@ -0,0 +1,4 @@
+-- Lets SQLiteCompletionCache.purge find the oldest rows beyond its cap
+-- without sorting the whole table.
+CREATE INDEX IF NOT EXISTS idx_completion_cache_created
+    ON completion_cache (created_at);
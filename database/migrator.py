@@ -0,0 +1,79 @@
+import os
+import re
+import sqlite3
+from typing import List, Optional, Tuple
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+    """Load numbered migrations as (version, name, sql), ordered by version."""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), 'r') as f:
+            migrations.append((int(match.group(1)), match.group(2), f.read()))
+    migrations.sort(key=lambda migration: migration[0])
+
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration version in {directory}")
+    return migrations
+
+
+def split_statements(sql: str) -> List[str]:
+    """Split a SQL script into complete statements (trigger bodies included)."""
+    statements = []
+    current = ''
+    for line in sql.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            statements.append(current.strip())
+            current = ''
+    # Whatever is left over can only be comments or whitespace.
+    leftover = '\n'.join(
+        line for line in current.splitlines() if not line.strip().startswith('--')
+    )
+    if leftover.strip():
+        raise ValueError(f"Incomplete SQL statement in migration: {leftover.strip()}")
+    return statements
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    """Return the highest applied migration version (0 if none)."""
+    row = conn.execute('SELECT MAX(version) FROM schema_migrations').fetchone()
+    return row[0] or 0
+
+
+def apply_migrations(conn: sqlite3.Connection,
+                     migrations: Optional[List[Tuple[int, str, str]]] = None) -> List[int]:
+    """Apply pending migrations in one transaction and return their versions.
+
+    The write lock is taken before the applied versions are read, so several
+    processes starting at once apply each migration exactly once.
+    """
+    if migrations is None:
+        migrations = load_migrations()
+
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        applied = {row[0] for row in conn.execute('SELECT version FROM schema_migrations')}
+        newly_applied = []
+        for version, name, sql in migrations:
+            if version in applied:
+                continue
+            for statement in split_statements(sql):
+                conn.execute(statement)
+            conn.execute(
+                'INSERT INTO schema_migrations (version, name) VALUES (?, ?)',
+                (version, name)
+            )
+            newly_applied.append(version)
+        conn.commit()
+        return newly_applied
+    except Exception:
+        conn.rollback()
+        raise
@@ -41,4 +41,11 @@ CREATE TABLE IF NOT EXISTS evaluations (
     feedback TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (interview_id) REFERENCES interviews(id)
-);
\ No newline at end of file
+);
+
+-- Applied schema migrations (see database/migrations/)
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    version INTEGER PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
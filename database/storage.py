@@ -0,0 +1,179 @@
+import functools
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Any, Optional
+from config import Config
+from utils.metrics import REGISTRY
+
+BUSY_RETRIES = REGISTRY.counter('db_busy_retries_total',
+                                'Writes retried because the database was locked.', ('method',))
+
+# Pragmas that only last for the lifetime of a connection and therefore have
+# to be applied to every new connection.
+CONNECTION_PRAGMAS = ('synchronous', 'cache_size', 'mmap_size', 'busy_timeout',
+                      'wal_autocheckpoint')
+
+
+def get_storage_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Return the storage profile settings for ``name`` (or the configured one)."""
+    name = name or Config.STORAGE_PROFILE
+    try:
+        return dict(Config.STORAGE_PROFILES[name])
+    except KeyError:
+        raise ValueError(f"Unknown storage profile: {name}")
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection, profile: Dict[str, Any]):
+    """Apply the per-connection pragmas of a storage profile."""
+    for pragma in CONNECTION_PRAGMAS:
+        if pragma in profile:
+            conn.execute(f"PRAGMA {pragma} = {profile[pragma]}")
+
+
+def apply_database_pragmas(conn: sqlite3.Connection, profile: Dict[str, Any]) -> str:
+    """Apply persistent database-level pragmas and return the journal mode in effect."""
+    row = conn.execute(f"PRAGMA journal_mode = {profile['journal_mode']}").fetchone()
+    return row[0].lower()
+
+
+def is_busy_error(error: Exception) -> bool:
+    """Return True if ``error`` is SQLite reporting a locked or busy database."""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+
+def retry_on_busy(method: Callable) -> Callable:
+    """Retry a DatabaseManager write method when SQLite reports a busy database.
+
+    The busy_timeout pragma already makes SQLite wait for locks; this covers
+    the cases it cannot (for example a lock upgrade deadlock) by re-running
+    the whole method with jittered exponential backoff.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        retries = getattr(self, 'write_retries', Config.DB_WRITE_RETRIES)
+        attempt = 0
+        while True:
+            try:
+                return method(self, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not is_busy_error(e) or attempt >= retries:
+                    raise
+                self.busy_retries += 1
+                BUSY_RETRIES.inc(method=method.__name__)
+                delay = min(1.0, 0.01 * (2 ** attempt))
+                time.sleep(random.uniform(0, delay))
+                attempt += 1
+    return wrapper
+
+
+class WalCheckpointer(threading.Thread):
+    """Background thread that checkpoints the WAL off the request path.
+
+    A PASSIVE checkpoint runs every ``interval`` seconds and never blocks
+    readers or writers. When the WAL grows past ``truncate_pages`` a
+    TRUNCATE checkpoint is attempted to reclaim the file.
+    """
+
+    _registry: Dict[str, 'WalCheckpointer'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_path: str, connect: Callable[[], sqlite3.Connection],
+                 interval: float, truncate_pages: int = 20000):
+        super().__init__(name=f"wal-checkpointer:{os.path.basename(db_path)}", daemon=True)
+        self.db_path = db_path
+        self._connect = connect
+        self.interval = interval
+        self.truncate_pages = truncate_pages
+        self._stop_event = threading.Event()
+        self._users = 0
+        self.checkpoints = 0
+        self.truncations = 0
+        self.failures = 0
+        self.last_log_pages = 0
+        self.last_checkpointed_pages = 0
+
+    @classmethod
+    def start_for_path(cls, db_path: str, connect: Callable[[], sqlite3.Connection],
+                       interval: float) -> 'WalCheckpointer':
+        """Start the process-wide checkpointer for ``db_path`` if not already running.
+
+        Every call counts as one user; pair it with :meth:`release_for_path`.
+        """
+        key = os.path.abspath(db_path)
+        with cls._registry_lock:
+            checkpointer = cls._registry.get(key)
+            if checkpointer is None or not checkpointer.is_alive():
+                checkpointer = cls(db_path, connect, interval)
+                cls._registry[key] = checkpointer
+                checkpointer.start()
+            checkpointer._users += 1
+            return checkpointer
+
+    @classmethod
+    def release_for_path(cls, db_path: str):
+        """Drop one user of the checkpointer for ``db_path``; stop it with the last one."""
+        key = os.path.abspath(db_path)
+        with cls._registry_lock:
+            checkpointer = cls._registry.get(key)
+            if checkpointer is None:
+                return
+            checkpointer._users -= 1
+            if checkpointer._users > 0:
+                return
+            del cls._registry[key]
+        checkpointer.stop()
+
+    @classmethod
+    def stop_for_path(cls, db_path: str):
+        """Stop the checkpointer for ``db_path`` if one is running."""
+        with cls._registry_lock:
+            checkpointer = cls._registry.pop(os.path.abspath(db_path), None)
+        if checkpointer is not None:
+            checkpointer.stop()
+
+    def checkpoint(self, conn: sqlite3.Connection, mode: str = 'PASSIVE'):
+        """Run one checkpoint and record how much of the WAL it copied back."""
+        busy, log_pages, checkpointed = conn.execute(
+            f"PRAGMA wal_checkpoint({mode})"
+        ).fetchone()
+        self.checkpoints += 1
+        self.last_log_pages = log_pages
+        self.last_checkpointed_pages = checkpointed
+        return busy, log_pages, checkpointed
+
+    def run(self):
+        conn = None
+        while not self._stop_event.wait(self.interval):
+            try:
+                if conn is None:
+                    conn = self._connect()
+                busy, log_pages, _ = self.checkpoint(conn)
+                if not busy and log_pages >= self.truncate_pages:
+                    self.checkpoint(conn, 'TRUNCATE')
+                    self.truncations += 1
+            except sqlite3.Error:
+                self.failures += 1
+                if conn is not None:
+                    conn.close()
+                    conn = None
+        if conn is not None:
+            conn.close()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return checkpoint counters."""
+        return {
+            'checkpoints': self.checkpoints,
+            'truncations': self.truncations,
+            'failures': self.failures,
+            'last_log_pages': self.last_log_pages,
+            'last_checkpointed_pages': self.last_checkpointed_pages,
+        }
@@ -0,0 +1,163 @@
+import atexit
+import logging
+import os
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from config import Config
+from database.db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerBuffer:
+    """Write-behind buffer for answer text.
+
+    ``put`` only records the answer in memory, so submitting an answer does
+    not wait for a commit; the answers of all sessions in the process are
+    written together in one transaction per flush. A question written again
+    before its flush costs a single row update. Pending answers are written
+    every ``flush_interval`` seconds by a background thread, when
+    ``max_pending`` questions are waiting, whenever a caller needs them in
+    the database (``flush_interview`` when an interview ends, before it is
+    graded and before its details are shown) and at interpreter exit. A
+    killed process (SIGKILL, out of memory) skips the exit flush and can
+    lose at most the last ``flush_interval`` seconds of answers.
+    """
+
+    _registry: Dict[str, 'AnswerBuffer'] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, db_manager: DatabaseManager, flush_interval: Optional[float] = None,
+                 max_pending: Optional[int] = None):
+        self.db = db_manager
+        self.flush_interval = flush_interval or Config.ANSWER_FLUSH_INTERVAL
+        self.max_pending = max_pending or Config.ANSWER_BUFFER_SIZE
+        self._pending: Dict[int, str] = {}
+        # Interview of each pending question, for flush_interview
+        self._interviews: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        # Held for a whole flush, so batches reach the database in order
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._worker = None
+        self.writes = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.failed_flushes = 0
+
+    @classmethod
+    def for_database(cls, db_manager: DatabaseManager) -> 'AnswerBuffer':
+        """Return the running process-wide buffer for the manager's database file."""
+        path = db_manager.db_path
+        key = path if path == ':memory:' else os.path.abspath(path)
+        with cls._registry_lock:
+            buffer = cls._registry.get(key)
+            if buffer is None:
+                buffer = cls._registry[key] = cls(db_manager)
+                buffer.start()
+            return buffer
+
+    def put(self, question_id: int, answer_text: str, interview_id: Optional[int] = None):
+        """Record an answer; it reaches the database on the next flush."""
+        with self._lock:
+            if question_id in self._pending:
+                self.coalesced += 1
+            self._pending[question_id] = answer_text
+            if interview_id is not None:
+                self._interviews[question_id] = interview_id
+            self.writes += 1
+            full = len(self._pending) >= self.max_pending
+        if full:
+            if self._worker is not None:
+                self._wakeup.set()
+            else:
+                self.flush()
+
+    def pending(self, question_id: int) -> Optional[str]:
+        """The buffered answer for a question, or None if nothing is waiting."""
+        with self._lock:
+            return self._pending.get(question_id)
+
+    def flush(self, question_ids: Optional[Iterable[int]] = None) -> int:
+        """Write pending answers (only those of ``question_ids`` if given) now.
+
+        Returns the number of rows written. If the write fails the answers
+        stay buffered, unless a newer answer arrived meanwhile, and the error
+        is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                if question_ids is None:
+                    batch, self._pending = self._pending, {}
+                else:
+                    batch = {qid: self._pending.pop(qid) for qid in question_ids
+                             if qid in self._pending}
+            if not batch:
+                return 0
+            try:
+                self.db.update_question_answers(
+                    (answer_text, question_id) for question_id, answer_text in batch.items()
+                )
+            except Exception:
+                with self._lock:
+                    self.failed_flushes += 1
+                    for question_id, answer_text in batch.items():
+                        self._pending.setdefault(question_id, answer_text)
+                raise
+            with self._lock:
+                self.flushes += 1
+                self.rows_flushed += len(batch)
+                for question_id in batch:
+                    if question_id not in self._pending:
+                        self._interviews.pop(question_id, None)
+            return len(batch)
+
+    def flush_interview(self, interview_id: int) -> int:
+        """Write the pending answers put for ``interview_id`` now."""
+        with self._lock:
+            question_ids = [question_id for question_id, owner in self._interviews.items()
+                            if owner == interview_id]
+        return self.flush(question_ids)
+
+    def start(self):
+        """Start the background flusher and the flush at exit (idempotent)."""
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._stop_event.clear()
+            self._worker = threading.Thread(target=self._run, name="answer-buffer", daemon=True)
+            self._worker.start()
+        atexit.register(self.close)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop the flusher and write everything still pending."""
+        self._stop_event.set()
+        self._wakeup.set()
+        worker, self._worker = self._worker, None
+        if worker is not None and worker is not threading.current_thread():
+            worker.join(timeout)
+        self.flush()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # Kept in the buffer; retried on the next tick
+                logger.exception("Answer flush failed", extra={'pending': len(self._pending)})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'pending': len(self._pending),
+                'writes': self.writes,
+                'coalesced': self.coalesced,
+                'flushes': self.flushes,
+                'rows_flushed': self.rows_flushed,
+                'failed_flushes': self.failed_flushes,
+            }
@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, List, Dict, Optional
+from config import Config
+from services.openai_service import OpenAIService
+from utils.metrics import Instrument, instrument_methods
+
+ASYNC_OPENAI_CALLS = Instrument('async_openai_call', 'AsyncOpenAIService calls', label='method')
+# Ends a stream read in a worker thread
+_END = object()
+
+@instrument_methods(ASYNC_OPENAI_CALLS)
+class AsyncOpenAIService:
+    """asyncio front end of OpenAIService.
+
+    Every call runs the matching OpenAIService method on a bounded pool of
+    worker threads, so caching, the rate-limit scheduler, retries, hedging
+    and the circuit breaker exist once, in the sync service. Answers are
+    graded concurrently, so grading an interview takes roughly as long as
+    the slowest single call instead of the sum of all calls.
+    """
+
+    def __init__(self, service: Optional[OpenAIService] = None,
+                 max_concurrency: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 max_workers: int = 32):
+        self.service = service or OpenAIService()
+        self.max_concurrency = max_concurrency or Config.EVALUATION_CONCURRENCY
+        self.timeout = timeout or Config.OPENAI_REQUEST_TIMEOUT
+        # Shared by every call in flight; the scheduler still paces the API
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, self.max_concurrency),
+                                            thread_name_prefix="openai-async")
+
+    async def _run(self, fn: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(*args, **kwargs))
+
+    async def generate_completion(self, prompt: str, **kwargs) -> str:
+        """OpenAIService.generate_completion (same keyword arguments), awaitable."""
+        return await self._run(self.service.generate_completion, prompt, **kwargs)
+
+    async def stream_completion(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Async generator over OpenAIService.stream_completion's chunks."""
+        chunks = self.service.stream_completion(prompt, **kwargs)
+        pending = None
+        try:
+            while True:
+                pending = self._executor.submit(next, chunks, _END)
+                chunk = await asyncio.wrap_future(pending)
+                if chunk is _END:
+                    return
+                yield chunk
+        finally:
+            # If the consumer was cancelled, a worker thread may still be
+            # inside next(chunks); the stream is closed once it is out.
+            if pending is None:
+                chunks.close()
+            else:
+                pending.add_done_callback(lambda _: chunks.close())
+
+    async def evaluate_answer(self, question: str, answer: str,
+                              timeout: Optional[float] = None) -> Dict[str, any]:
+        """Evaluate an interview answer, giving up after ``timeout`` seconds."""
+        return await self._run(self.service.evaluate_answer, question, answer,
+                               deadline=timeout or self.timeout)
+
+    async def evaluate_answers_concurrently(self,
+                                            questions_and_answers: List[Dict[str, str]],
+                                            max_concurrency: Optional[int] = None,
+                                            timeout: Optional[float] = None) -> List[Dict[str, any]]:
+        """Evaluate every answer concurrently.
+
+        At most ``max_concurrency`` requests of this call are in flight at
+        once and each is bounded by ``timeout`` seconds. Results are
+        returned in the same order as ``questions_and_answers``.
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        async def evaluate(qa: Dict[str, str]) -> Dict[str, any]:
+            async with semaphore:
+                return await self.evaluate_answer(qa['question'], qa['answer'], timeout)
+
+        return await asyncio.gather(*(evaluate(qa) for qa in questions_and_answers))
+
+    def evaluate_answers(self, questions_and_answers: List[Dict[str, str]],
+                         max_concurrency: Optional[int] = None,
+                         timeout: Optional[float] = None) -> List[Dict[str, any]]:
+        """Blocking wrapper around :meth:`evaluate_answers_concurrently`."""
+        return asyncio.run(self.evaluate_answers_concurrently(
+            questions_and_answers, max_concurrency, timeout
+        ))
@@ -1,32 +1,106 @@
 import hashlib
-import secrets
+import hmac
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple
+
+import bcrypt
+
+from config import Config
 from database.db_manager import DatabaseManager
 
+# bcrypt only reads the first 72 bytes of a password. Newer releases raise
+# instead of ignoring the rest, so cut it here to keep hashes compatible.
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all hashing in the process.
+    
+    bcrypt releases the GIL, so other sessions keep running while a hash is
+    computed, and the pool size caps how many cores logins can take at once.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, Config.AUTH_HASH_WORKERS),
+                thread_name_prefix="password-hash"
+            )
+        return _executor
+
+
+def _password_bytes(password: str) -> bytes:
+    return password.encode('utf-8')[:BCRYPT_MAX_PASSWORD_BYTES]
+
+
+def is_legacy_hash(stored_hash: str) -> bool:
+    """True for the old ``salt$sha256`` format (bcrypt hashes start with '$2')."""
+    return not stored_hash.startswith('$2')
+
+
+def hash_rounds(stored_hash: str) -> Optional[int]:
+    """Cost factor of a bcrypt hash ('$2b$12$...'), or None for other formats."""
+    parts = stored_hash.split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
 class AuthService:
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, rounds: Optional[int] = None,
+                 executor: Optional[ThreadPoolExecutor] = None):
         self.db = db_manager
+        self.rounds = rounds or Config.BCRYPT_ROUNDS
+        self.executor = executor or _get_executor()
+        self._dummy_hash = None
+        self.rehashed = 0
     
-    @staticmethod
-    def hash_password(password: str, salt: Optional[str] = None) -> Tuple[str, str]:
-        """Hash a password with a salt using SHA-256."""
-        if salt is None:
-            salt = secrets.token_hex(32)
-        
-        password_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-        # Store both hash and salt together
-        combined = f"{salt}${password_hash}"
-        return combined, salt
+    def hash_password(self, password: str) -> str:
+        """Hash a password with bcrypt at the configured cost, in the hashing pool."""
+        return self.executor.submit(
+            lambda: bcrypt.hashpw(
+                _password_bytes(password), bcrypt.gensalt(rounds=self.rounds)
+            ).decode('ascii')
+        ).result()
+    
+    def verify_password(self, password: str, stored_hash: str) -> bool:
+        """Verify a password against a bcrypt or legacy ``salt$hash`` record."""
+        if is_legacy_hash(stored_hash):
+            return self.verify_legacy_password(password, stored_hash)
+        try:
+            return self.executor.submit(
+                bcrypt.checkpw, _password_bytes(password), stored_hash.encode('ascii')
+            ).result()
+        except ValueError:
+            # Malformed hash
+            return False
     
     @staticmethod
-    def verify_password(password: str, stored_hash: str) -> bool:
-        """Verify a password against a stored hash."""
+    def verify_legacy_password(password: str, stored_hash: str) -> bool:
+        """Verify a password against a salted SHA-256 hash from before bcrypt."""
         try:
             salt, password_hash = stored_hash.split('$')
-            new_hash = hashlib.sha256((password + salt).encode()).hexdigest()
-            return new_hash == password_hash
         except ValueError:
             return False
+        new_hash = hashlib.sha256((password + salt).encode()).hexdigest()
+        return hmac.compare_digest(new_hash, password_hash)
+    
+    def needs_rehash(self, stored_hash: str) -> bool:
+        """True for legacy hashes and bcrypt hashes made with another cost."""
+        return is_legacy_hash(stored_hash) or hash_rounds(stored_hash) != self.rounds
+    
+    def _verify_unknown_user(self, password: str):
+        """Spend as long as a real check, so timing doesn't reveal unknown usernames."""
+        if self._dummy_hash is None:
+            self._dummy_hash = self.hash_password('unused password')
+        self.verify_password(password, self._dummy_hash)
     
     def register_user(self, username: str, email: str, password: str) -> Tuple[bool, str]:
         """Register a new user.
@@ -52,7 +126,7 @@ class AuthService:
             return False, "Email already registered"
         
         # Hash password and create user
-        password_hash, _ = self.hash_password(password)
+        password_hash = self.hash_password(password)
         user_id = self.db.create_user(username, email, password_hash)
         
         if user_id:
@@ -69,9 +143,12 @@ class AuthService:
         user = self.db.get_user_by_username(username)
         
         if not user:
+            self._verify_unknown_user(password)
             return False, None, "Invalid username or password"
         
         if self.verify_password(password, user['password_hash']):
+            if self.needs_rehash(user['password_hash']):
+                self._rehash(user['id'], password)
             # Don't return password hash to the caller
             user_data = {
                 'id': user['id'],
@@ -83,6 +160,15 @@ class AuthService:
         else:
             return False, None, "Invalid username or password"
     
+    def _rehash(self, user_id: int, password: str):
+        """Store a new hash for a user who just logged in with the old one."""
+        try:
+            self.db.update_user_password_hash(user_id, self.hash_password(password))
+            self.rehashed += 1
+        except Exception:
+            # The old hash still works; try again at the next login
+            logger.exception("Password rehash failed", extra={'user_id': user_id})
+    
     def get_user_info(self, user_id: int) -> Optional[dict]:
         """Get user information by ID (without password hash)."""
         user = self.db.get_user_by_id(user_id)
@@ -0,0 +1,203 @@
+import hashlib
+from abc import ABC, abstractmethod
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from config import Config
+from database.db_manager import DatabaseManager
+from utils.metrics import REGISTRY
+
+CACHE_EVENTS = REGISTRY.counter('completion_cache_events_total',
+                                'Completion cache hits, misses and evictions.', ('cache', 'event'))
+
+
+def make_cache_key(model: str, system_prompt: str, prompt: str,
+                   max_tokens: int, temperature: float,
+                   response_format: Optional[Dict[str, Any]] = None) -> str:
+    """Content address of a completion request (SHA-256 over all inputs)."""
+    inputs = [model, system_prompt, prompt, max_tokens, temperature]
+    if response_format:
+        # Only appended when set so existing plain-text keys stay valid
+        inputs.append(response_format)
+    payload = json.dumps(inputs, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CompletionCache(ABC):
+    """Interface for completion caches used by OpenAIService."""
+
+    # The 'cache' label of CACHE_EVENTS
+    metric_name = 'cache'
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _count(self, counter: str, amount: int = 1):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+        CACHE_EVENTS.inc(amount, cache=self.metric_name, event=counter)
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for ``key``, or None on a miss."""
+
+    @abstractmethod
+    def set(self, key: str, value: str):
+        """Store a completion under ``key``."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters."""
+        with self._stats_lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+
+class MemoryCompletionCache(CompletionCache):
+    """In-process LRU cache with an optional TTL."""
+
+    metric_name = 'memory'
+
+    def __init__(self, max_entries: int = 512, ttl: Optional[float] = None):
+        super().__init__()
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is not None and expires_at <= time.time():
+                    del self._entries[key]
+                    entry = None
+                    self._count('evictions')
+                else:
+                    self._entries.move_to_end(key)
+        self._count('hits' if entry is not None else 'misses')
+        return entry[0] if entry is not None else None
+
+    def set(self, key: str, value: str, expires_at: Optional[float] = None):
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            evicted = 0
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                evicted += 1
+        if evicted:
+            self._count('evictions', evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['entries'] = len(self._entries)
+        return stats
+
+
+class SQLiteCompletionCache(CompletionCache):
+    """Persistent cache stored in the completion_cache table, with a TTL.
+
+    Writes purge the table at most every ``purge_interval`` seconds: expired
+    rows are deleted and, beyond ``max_rows``, the oldest ones, so the table
+    stays bounded even when entries are never read again.
+    """
+
+    metric_name = 'sqlite'
+
+    def __init__(self, db_manager: DatabaseManager, ttl: Optional[float] = None,
+                 max_rows: Optional[int] = None, purge_interval: Optional[float] = None):
+        super().__init__()
+        self.db = db_manager
+        self.ttl = ttl
+        self.max_rows = max_rows or Config.LLM_CACHE_MAX_ROWS
+        self.purge_interval = (Config.LLM_CACHE_PURGE_INTERVAL if purge_interval is None
+                               else purge_interval)
+        self._next_purge = 0.0
+        self._purge_lock = threading.Lock()
+
+    def get_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the live row for ``key`` (value and expiry) or None."""
+        row = self.db.get_cached_completion(key)
+        if row is not None and row['expires_at'] is not None and row['expires_at'] <= time.time():
+            self.db.delete_cached_completion(key)
+            self._count('evictions')
+            row = None
+        self._count('hits' if row is not None else 'misses')
+        return row
+
+    def get(self, key: str) -> Optional[str]:
+        row = self.get_entry(key)
+        return row['response'] if row is not None else None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl is not None else None
+        self.db.set_cached_completion(key, value, now, expires_at)
+        with self._purge_lock:
+            due = now >= self._next_purge
+            if due:
+                self._next_purge = now + self.purge_interval
+        if due:
+            self.purge()
+
+    def purge(self) -> int:
+        """Delete expired rows and the oldest rows beyond ``max_rows``; return the count."""
+        removed = self.db.purge_expired_completions(time.time())
+        removed += self.db.trim_cached_completions(self.max_rows)
+        if removed:
+            self._count('evictions', removed)
+        return removed
+
+
+class TieredCompletionCache(CompletionCache):
+    """Memory LRU in front of the persistent SQLite cache.
+
+    Persistent hits are promoted into memory with their remaining TTL, so
+    entries never outlive the expiry they were stored with.
+    """
+
+    metric_name = 'tiered'
+
+    def __init__(self, memory: MemoryCompletionCache, persistent: SQLiteCompletionCache):
+        super().__init__()
+        self.memory = memory
+        self.persistent = persistent
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.memory.get(key)
+        if value is None:
+            row = self.persistent.get_entry(key)
+            if row is not None:
+                value = row['response']
+                self.memory.set(key, value, expires_at=row['expires_at'])
+        self._count('hits' if value is not None else 'misses')
+        return value
+
+    def set(self, key: str, value: str):
+        self.memory.set(key, value)
+        self.persistent.set(key, value)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats['memory'] = self.memory.stats()
+        stats['persistent'] = self.persistent.stats()
+        stats['evictions'] = stats['memory']['evictions'] + stats['persistent']['evictions']
+        return stats
+
+
+def build_completion_cache(db_manager: DatabaseManager) -> Optional[CompletionCache]:
+    """Build the completion cache described by Config, or None when disabled."""
+    if not Config.LLM_CACHE_ENABLED:
+        return None
+    ttl = Config.LLM_CACHE_TTL or None
+    return TieredCompletionCache(
+        MemoryCompletionCache(Config.LLM_CACHE_MAX_ENTRIES, ttl),
+        SQLiteCompletionCache(db_manager, ttl)
+    )
@@ -1,29 +1,46 @@
-import PyPDF2
+import hashlib
+import logging
 from typing import Optional, Dict, Any
 import os
+from config import Config
+from database.db_manager import DatabaseManager
+from services.cv_compactor import CVCompactor
 from services.openai_service import OpenAIService
+from services.pdf_extractor import PDFExtractionError, PDFTextExtractor
+
+logger = logging.getLogger(__name__)
 
 class CVAnalyzer:
-    def __init__(self, openai_service: OpenAIService):
+    def __init__(self, openai_service: OpenAIService,
+                 db_manager: Optional[DatabaseManager] = None,
+                 pdf_extractor: Optional[PDFTextExtractor] = None,
+                 compactor: Optional[CVCompactor] = None):
         self.openai_service = openai_service
+        self.db = db_manager
+        self.pdf_extractor = pdf_extractor or PDFTextExtractor()
+        self.compactor = compactor or CVCompactor()
     
     def extract_text_from_pdf(self, pdf_path: str) -> Optional[str]:
         """Extract text content from a PDF file."""
         try:
             with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                text = ""
-                
-                for page in pdf_reader.pages:
-                    text += page.extract_text() + "\n"
-                
-                return text.strip()
-        except Exception as e:
-            print(f"Error extracting text from PDF: {e}")
+                return self.extract_text_from_bytes(file.read())
+        except OSError as e:
+            logger.warning("Could not read PDF", extra={'path': pdf_path, 'error': str(e)})
+            return None
+    
+    def extract_text_from_bytes(self, data: bytes) -> Optional[str]:
+        """Extract text content from PDF bytes (e.g. straight from an upload)."""
+        try:
+            return self.pdf_extractor.extract(data)
+        except PDFExtractionError as e:
+            logger.warning("PDF text extraction failed",
+                           extra={'bytes': len(data), 'error': str(e)})
             return None
     
     def analyze_cv(self, cv_text: str) -> Optional[Dict[str, Any]]:
         """Analyze CV content using OpenAI to extract key information."""
+        compacted = self.compactor.compact(cv_text)
         prompt = f"""Analyze the following CV/Resume and extract key information in a structured format.
 
 Provide the analysis in the following format:
@@ -34,7 +51,7 @@ Provide the analysis in the following format:
 - Potential Interview Topics: Suggest 5 topics that would be good to discuss in an interview
 
 CV Content:
-{cv_text}
+{compacted['text']}
 
 Provide a comprehensive but concise analysis."""
         
@@ -43,10 +60,11 @@ Provide a comprehensive but concise analysis."""
             return {
                 'raw_text': cv_text,
                 'analysis': analysis,
-                'success': True
+                'success': True,
+                'saved_tokens': compacted['saved_tokens']
             }
         except Exception as e:
-            print(f"Error analyzing CV: {e}")
+            logger.exception("CV analysis failed", extra={'cv_chars': len(cv_text)})
             return {
                 'raw_text': cv_text,
                 'analysis': None,
@@ -56,8 +74,55 @@ Provide a comprehensive but concise analysis."""
     
     def analyze_cv_file(self, file_path: str) -> Optional[Dict[str, Any]]:
         """Extract text from CV file and analyze it."""
+        try:
+            with open(file_path, 'rb') as file:
+                data = file.read()
+        except OSError as e:
+            logger.warning("Could not read CV file", extra={'path': file_path, 'error': str(e)})
+            return {
+                'success': False,
+                'error': 'Could not extract text from PDF'
+            }
+        
+        return self.analyze_cv_bytes(data)
+    
+    def analyze_cv_bytes(self, data: bytes) -> Optional[Dict[str, Any]]:
+        """Extract text from CV bytes and analyze it, reusing stored results.
+        
+        CVs are looked up by the SHA-256 of their bytes first, so uploading
+        the same file again skips both PDF extraction and the LLM analysis.
+        The result carries 'cv_document_id' when a database is configured.
+        """
+        content_hash = hashlib.sha256(data).hexdigest()
+        document = self.db.get_cv_document_by_hash(content_hash) if self.db else None
+        return self._analyze_document(content_hash, document, data)
+    
+    def analyze_stored_cv(self, content_hash: str) -> Dict[str, Any]:
+        """Analyze a CV stored with DatabaseManager.save_cv_upload."""
+        document = self.db.get_cv_document_by_hash(content_hash)
+        if document is None:
+            return {
+                'success': False,
+                'error': 'Uploaded CV not found'
+            }
+        return self._analyze_document(content_hash, document, document['file_data'])
+    
+    def _analyze_document(self, content_hash: str, document: Optional[Dict[str, Any]],
+                          data: Optional[bytes]) -> Dict[str, Any]:
+        if document and document['analysis']:
+            return {
+                'raw_text': document['extracted_text'],
+                'analysis': document['analysis'],
+                'success': True,
+                'cached': True,
+                'cv_document_id': document['id']
+            }
+        
         # Extract text
-        cv_text = self.extract_text_from_pdf(file_path)
+        if document and document['extracted_text']:
+            cv_text = document['extracted_text']
+        else:
+            cv_text = self.extract_text_from_bytes(data) if data else None
         
         if not cv_text:
             return {
@@ -66,25 +131,38 @@ Provide a comprehensive but concise analysis."""
             }
         
         # Analyze the extracted text
-        return self.analyze_cv(cv_text)
+        result = self.analyze_cv(cv_text)
+        result['cached'] = False
+        if self.db:
+            # Keep the extracted text even if the analysis failed
+            result['cv_document_id'] = self.db.save_cv_document(
+                content_hash, cv_text, result['analysis']
+            )
+        return result
     
     def generate_cv_based_questions(self, cv_analysis: str, 
                                    num_questions: int = 5,
-                                   difficulty: str = 'medium') -> list:
-        """Generate interview questions based on CV analysis."""
+                                   difficulty: str = 'medium',
+                                   use_cache: bool = True) -> list:
+        """Generate interview questions based on CV analysis.
+        
+        The same CV analysis gets the same questions from the completion
+        cache; pass ``use_cache=False`` for a fresh set.
+        """
+        compacted = self.compactor.compact(cv_analysis, Config.CV_ANALYSIS_TOKEN_BUDGET)
         prompt = f"""Based on the following CV analysis, generate {num_questions} interview questions
 at {difficulty} difficulty level. The questions should be relevant to the candidate's background
 and test their knowledge and experience.
 
 CV Analysis:
-{cv_analysis}
+{compacted['text']}
 
 Generate {num_questions} questions, numbered 1-{num_questions}. 
 Make them specific, relevant, and appropriate for a {difficulty} difficulty interview.
 Each question should be on a new line starting with the number."""
         
         try:
-            response = self.openai_service.generate_completion(prompt)
+            response = self.openai_service.generate_completion(prompt, use_cache=use_cache)
             # Parse the response into individual questions
             questions = []
             for line in response.split('\n'):
@@ -96,6 +174,7 @@ Each question should be on a new line starting with the number."""
                         questions.append(question)
             
             return questions[:num_questions]  # Ensure we return exactly the requested number
-        except Exception as e:
-            print(f"Error generating CV-based questions: {e}")
+        except Exception:
+            logger.exception("CV-based question generation failed",
+                             extra={'num_questions': num_questions, 'difficulty': difficulty})
             return []
\ No newline at end of file
@@ -0,0 +1,233 @@
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from config import Config
+from utils.tokens import count_tokens
+
+# Section headings in keep order: when the budget is tight, sections later
+# in this list are truncated or dropped first.
+SECTION_PRIORITIES: List[Tuple[str, Tuple[str, ...]]] = [
+    ('experience', ('experience', 'employment', 'work history', 'professional background', 'career')),
+    ('skills', ('skills', 'technical skills', 'competencies', 'technologies', 'tech stack')),
+    ('projects', ('projects', 'personal projects', 'key projects')),
+    ('education', ('education', 'academic background', 'qualifications')),
+    ('summary', ('summary', 'profile', 'objective', 'about me', 'key strengths')),
+    ('certifications', ('certifications', 'certificates', 'licenses', 'courses', 'training')),
+    ('publications', ('publications', 'research', 'talks')),
+    ('awards', ('awards', 'honors', 'achievements')),
+    ('languages', ('languages',)),
+    ('volunteering', ('volunteering', 'volunteer', 'activities', 'leadership')),
+    ('interests', ('interests', 'hobbies')),
+    ('references', ('references', 'referees')),
+]
+
+_PRIORITY = {name: rank for rank, (name, _) in enumerate(SECTION_PRIORITIES)}
+_HEADING_KEYWORDS = {
+    keyword: name for name, keywords in SECTION_PRIORITIES for keyword in keywords
+}
+_HEADING_PATTERN = re.compile(
+    r'^[\s\-\*•#>]*(?P<title>[A-Za-z][A-Za-z &/]{1,40}?)\s*(?::\s*(?P<rest>.*))?$'
+)
+
+# Text that carries no information for an interviewer; removed from lines
+# (a line left empty is dropped)
+BOILERPLATE_PATTERNS = [
+    re.compile(r'^\s*page\s+\d+(\s+of\s+\d+)?\s*$', re.I),
+    re.compile(r'^\s*\d+\s*/\s*\d+\s*$'),
+    re.compile(r'^\s*(curriculum vitae|resume|résumé|cv)\s*$', re.I),
+    re.compile(r'references (are )?available (up)?on request\.?', re.I),
+    re.compile(r'^\s*[-_=*•·.~]{3,}\s*$'),
+    re.compile(r'i hereby declare[^.]*\.?', re.I),
+    re.compile(r'^\s*(confidential|private and confidential)\s*$', re.I),
+]
+
+
+def _match_heading(line: str) -> Optional[Tuple[str, str]]:
+    """Return (section, inline content) if ``line`` starts a known section."""
+    match = _HEADING_PATTERN.match(line)
+    if not match:
+        return None
+    title = match.group('title').strip().lower()
+    section = _HEADING_KEYWORDS.get(title)
+    if section is None:
+        return None
+    return section, (match.group('rest') or '').strip()
+
+
+class CVCompactor:
+    """Shrinks CV text (or its analysis) to a token budget before prompting.
+
+    Compaction strips boilerplate, drops repeated lines and sections (such
+    as per-page headers and footers), then keeps whole sections in
+    priority order until the budget is spent, truncating sections that do
+    not fit. No section may take more than ``max_section_share`` of the
+    budget while lower-priority sections are still waiting for room. A line
+    that does not fit is cut at a word boundary rather than dropped, since
+    PDF extraction often returns a whole CV or section as one line.
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, max_section_share: float = 0.5):
+        self.token_budget = token_budget or Config.CV_TOKEN_BUDGET
+        self.max_section_share = max_section_share
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.original_tokens = 0
+        self.compacted_tokens = 0
+
+    @staticmethod
+    def clean_lines(text: str) -> List[str]:
+        """Normalize whitespace, remove boilerplate and duplicate lines."""
+        lines = []
+        seen = set()
+        for raw_line in text.splitlines():
+            line = ' '.join(raw_line.split())
+            if not line:
+                if lines and lines[-1]:
+                    lines.append('')
+                continue
+            for pattern in BOILERPLATE_PATTERNS:
+                line = pattern.sub('', line)
+            # Only the boilerplate is removed, as a whole CV may be one line
+            line = ' '.join(line.split())
+            if not line:
+                continue
+            key = line.lower()
+            # Short lines (single skills, dates) legitimately repeat
+            if len(key) >= 20 and _match_heading(line) is None:
+                if key in seen:
+                    continue
+                seen.add(key)
+            lines.append(line)
+        while lines and not lines[-1]:
+            lines.pop()
+        return lines
+
+    @staticmethod
+    def split_sections(lines: List[str]) -> List[Dict[str, Any]]:
+        """Group lines into sections; text before the first heading is the 'header'."""
+        sections = [{'name': 'header', 'lines': []}]
+        for line in lines:
+            heading = _match_heading(line)
+            if heading is not None:
+                sections.append({'name': heading[0], 'lines': [line]})
+            else:
+                sections[-1]['lines'].append(line)
+
+        # Merge repeated headings and drop sections repeated verbatim
+        merged = []
+        by_name = {}
+        for section in sections:
+            existing = by_name.get(section['name'])
+            if existing is None:
+                by_name[section['name']] = section
+                merged.append(section)
+            elif section['lines'][1:] != existing['lines'][1:]:
+                existing['lines'].extend(section['lines'][1:])
+        return [s for s in merged if any(line for line in s['lines'])]
+
+    @staticmethod
+    def fit_words(line: str, allowance: int) -> Tuple[int, int]:
+        """Longest prefix of ``line``'s words costing at most ``allowance`` tokens.
+
+        Returns (words, cost), with the cost counted like a whole line's.
+        """
+        words = line.split(' ')
+        low, high = 0, len(words)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if count_tokens(' '.join(words[:middle])) + 1 <= allowance:
+                low = middle
+            else:
+                high = middle - 1
+        return low, (count_tokens(' '.join(words[:low])) + 1 if low else 0)
+
+    def compact(self, text: str, token_budget: Optional[int] = None) -> Dict[str, Any]:
+        """Compact ``text`` to at most ``token_budget`` tokens.
+
+        Returns:
+            Dict with 'text', 'original_tokens', 'compacted_tokens',
+            'saved_tokens' and 'dropped_sections'
+        """
+        budget = token_budget or self.token_budget
+        original_tokens = count_tokens(text)
+        sections = self.split_sections(self.clean_lines(text))
+
+        # The header (name, contact, headline) goes first, then by priority
+        ranked = sorted(
+            range(len(sections)),
+            key=lambda i: -1 if sections[i]['name'] == 'header'
+            else _PRIORITY.get(sections[i]['name'], len(_PRIORITY))
+        )
+        line_tokens = [[count_tokens(line) + 1 for line in s['lines']] for s in sections]
+
+        # First pass: no single section may take more than its share of the
+        # budget, so a long work history cannot starve the skills section.
+        # Second pass: hand what is left back out in priority order.
+        cap = max(1, int(budget * self.max_section_share))
+        taken = [0] * len(sections)
+        used = [0] * len(sections)
+        # Words (and their cost) kept of the first line that did not fit
+        partial = [(0, 0)] * len(sections)
+        remaining = budget
+        for limit in (cap, budget):
+            for index in ranked:
+                tokens = line_tokens[index]
+                while taken[index] < len(tokens):
+                    spent = partial[index][1]
+                    allowance = min(remaining, limit - used[index]) + spent
+                    cost = tokens[taken[index]]
+                    if cost <= allowance:
+                        used[index] += cost - spent
+                        remaining -= cost - spent
+                        partial[index] = (0, 0)
+                        taken[index] += 1
+                        continue
+                    words, cost = self.fit_words(sections[index]['lines'][taken[index]], allowance)
+                    if words > partial[index][0]:
+                        used[index] += cost - spent
+                        remaining -= cost - spent
+                        partial[index] = (words, cost)
+                    break
+
+        kept = {}
+        dropped = []
+        for index, section in enumerate(sections):
+            lines = section['lines'][:taken[index]]
+            words = partial[index][0]
+            if words:
+                cut = section['lines'][taken[index]].split(' ')[:words]
+                lines.append(' '.join(cut))
+            while lines and not lines[-1]:
+                lines.pop()
+            # A heading without any of its content is not worth keeping
+            heading = _match_heading(lines[0]) if lines else None
+            if lines and (len(lines) > 1 or section['name'] == 'header'
+                          or (heading is not None and heading[1])):
+                kept[index] = '\n'.join(lines)
+            elif section['name'] != 'header':
+                dropped.append(section['name'])
+
+        compacted = '\n\n'.join(kept[i] for i in sorted(kept)).strip()
+        compacted_tokens = count_tokens(compacted)
+        with self._lock:
+            self.calls += 1
+            self.original_tokens += original_tokens
+            self.compacted_tokens += compacted_tokens
+
+        return {
+            'text': compacted,
+            'original_tokens': original_tokens,
+            'compacted_tokens': compacted_tokens,
+            'saved_tokens': original_tokens - compacted_tokens,
+            'dropped_sections': dropped
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cumulative token savings."""
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'original_tokens': self.original_tokens,
+                'compacted_tokens': self.compacted_tokens,
+                'saved_tokens': self.original_tokens - self.compacted_tokens,
+            }
@@ -0,0 +1,198 @@
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# "85", "8.5/10", "85 / 100", "85%", "-3" (clamped later)
+_SCORE_PATTERN = re.compile(
+    r'(?P<value>-?\d+(?:\.\d+)?)\s*(?:(?P<percent>%)|/\s*(?P<scale>\d+(?:\.\d+)?))?'
+)
+# Markdown decoration and list numbering in front of a heading
+_HEADING_PREFIX = re.compile(r'^[\s#>*_\-•]*(?:\d+[.)]\s*)?[*_]*')
+# What may follow a heading: a parenthesised range, then a separator or nothing
+_HEADING_SUFFIX = re.compile(r'\s*(?:\([^)]*\))?\s*[*_]*\s*(?:[:\-–]\s*[*_]*\s*(?P<rest>.*)|$)')
+
+ANSWER_SECTIONS = {
+    'score': ('score', 'rating', 'grade'),
+    'strengths': ('strengths', 'strength'),
+    'improvements': ('areas for improvement', 'areas to improve', 'improvements', 'weaknesses'),
+    'feedback': ('overall feedback', 'feedback'),
+}
+
+INTERVIEW_SECTIONS = {
+    'score': ('overall score', 'score', 'overall rating', 'rating'),
+    'strengths': ('strengths demonstrated across the interview', 'strengths demonstrated',
+                  'strengths'),
+    'improvements': ('areas needing improvement', 'areas for improvement', 'improvements',
+                     'weaknesses'),
+    'recommendations': ('specific recommendations for the candidate', 'specific recommendations',
+                        'recommendations'),
+    'summary': ('summary feedback', 'summary', 'overall feedback', 'overall assessment'),
+}
+
+
+def parse_score(text: Any, scale: float) -> Optional[float]:
+    """Read a score from free text and express it on a 0-``scale`` range.
+
+    Understands bare numbers, fractions ("8/10", "85/100") and percentages.
+    Returns None when there is no number to read.
+    """
+    if isinstance(text, bool) or text is None:
+        return None
+    if isinstance(text, (int, float)):
+        value = float(text)
+    else:
+        match = _SCORE_PATTERN.search(str(text))
+        if not match:
+            return None
+        value = float(match.group('value'))
+        if match.group('percent'):
+            value = value / 100 * scale
+        elif match.group('scale'):
+            denominator = float(match.group('scale'))
+            if denominator > 0:
+                value = value / denominator * scale
+    return min(max(value, 0.0), scale)
+
+
+def split_sections(text: str, headings: Dict[str, Tuple[str, ...]]) -> Dict[str, str]:
+    """Split a plain-text evaluation into its labelled sections.
+
+    A heading may be decorated with markdown or numbering ("**Score:**",
+    "1. Overall Score (0-100):") and its content may continue on the
+    following lines until the next heading.
+    """
+    aliases = sorted(
+        ((alias, key) for key, names in headings.items() for alias in names),
+        key=lambda item: -len(item[0])
+    )
+    sections: Dict[str, List[str]] = {}
+    current = None
+    for raw_line in text.splitlines():
+        line = _HEADING_PREFIX.sub('', raw_line, count=1).strip()
+        lowered = line.lower()
+        found = None
+        for alias, key in aliases:
+            if lowered.startswith(alias):
+                # "Score (0-10): 7", "Strengths - ...", "**Summary:**" or a bare heading
+                match = _HEADING_SUFFIX.match(line[len(alias):])
+                if match:
+                    found = (key, (match.group('rest') or '').strip())
+                    break
+        if found is not None and found[0] not in sections:
+            current = found[0]
+            sections[current] = [found[1]] if found[1] else []
+        elif current is not None:
+            sections[current].append(raw_line.strip())
+    return {key: '\n'.join(lines).strip() for key, lines in sections.items()}
+
+
+def parse_answer_evaluation(response: str) -> Dict[str, Any]:
+    """Parse a single-answer evaluation in the 'Score: / Strengths: ...' format."""
+    sections = split_sections(response, ANSWER_SECTIONS)
+    score = parse_score(sections.get('score'), 10)
+    return {
+        'score': score,
+        'strengths': sections.get('strengths', ''),
+        'improvements': sections.get('improvements', ''),
+        'feedback': sections.get('feedback', ''),
+        'raw_evaluation': response,
+        'success': score is not None
+    }
+
+
+def parse_interview_evaluation(response: str) -> Dict[str, Any]:
+    """Parse a whole-interview evaluation; the summary becomes the short feedback."""
+    sections = split_sections(response, INTERVIEW_SECTIONS)
+    score = parse_score(sections.get('score'), 100)
+    if score is None:
+        return {
+            'overall_score': None,
+            'evaluation_text': 'Error during evaluation: the response had no overall score',
+            'feedback': sections.get('summary', ''),
+            'raw_evaluation': response,
+            'success': False
+        }
+    return {
+        'overall_score': score,
+        'evaluation_text': response,
+        'feedback': sections.get('summary', ''),
+        'success': True
+    }
+
+
+def extract_json(response: str) -> Dict[str, Any]:
+    """Load the JSON object in a completion, tolerating code fences and chatter.
+
+    Raises:
+        ValueError: if the response does not contain a JSON object.
+    """
+    text = response.strip()
+    fenced = re.search(r'```(?:json)?\s*(.*?)```', text, re.S)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find('{'), text.rfind('}')
+        if start == -1 or end <= start:
+            raise ValueError("no JSON object in response")
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON in response: {e}")
+    if not isinstance(data, dict):
+        raise ValueError("expected a JSON object")
+    return data
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ''
+    if isinstance(value, (list, tuple)):
+        return '\n'.join(f"- {_text(item)}" for item in value if item)
+    return str(value).strip()
+
+
+def parse_batch_evaluation(response: str, first_index: int, count: int) -> Dict[str, Any]:
+    """Parse a batched grading response for questions ``first_index``..+``count``.
+
+    Answers are matched on their 'index' field (falling back to position),
+    and any answer the model skipped gets a failed entry with score None.
+
+    Raises:
+        ValueError: if the response is not a usable JSON object.
+    """
+    data = extract_json(response)
+    items = data.get('answers')
+    if not isinstance(items, list):
+        raise ValueError("response has no 'answers' list")
+
+    by_index = {}
+    for position, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        index = item.get('index')
+        if not isinstance(index, int) or isinstance(index, bool):
+            index = first_index + position
+        by_index.setdefault(index, item)
+
+    answers = []
+    for index in range(first_index, first_index + count):
+        item = by_index.get(index, {})
+        score = parse_score(item.get('score'), 10)
+        answers.append({
+            'score': score,
+            'strengths': _text(item.get('strengths')),
+            'improvements': _text(item.get('improvements')),
+            'feedback': _text(item.get('feedback')),
+            'success': score is not None
+        })
+
+    return {
+        'answers': answers,
+        'overall_score': parse_score(data.get('overall_score'), 100),
+        'strengths': _text(data.get('strengths')),
+        'improvements': _text(data.get('improvements')),
+        'recommendations': _text(data.get('recommendations')),
+        'summary': _text(data.get('summary')),
+    }
@@ -0,0 +1,306 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from config import Config
+from database.db_manager import DatabaseManager, question_hash
+from services.answer_buffer import AnswerBuffer
+from services.openai_service import OpenAIService
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all sessions in the process."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=Config.INTERVIEW_PREFETCH_WORKERS,
+                thread_name_prefix="interview-prefetch"
+            )
+        return _executor
+
+
+class Speculation:
+    """A background call whose result may be thrown away.
+
+    Records when the work started and finished, so the caller can tell how
+    much of its latency was hidden from the user.
+    """
+
+    def __init__(self, executor: ThreadPoolExecutor, fn: Callable, *args):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.discarded = False
+        self.future: Future = executor.submit(self._run, fn, *args)
+
+    def _run(self, fn: Callable, *args):
+        try:
+            return fn(*args)
+        finally:
+            self.finished = time.perf_counter()
+
+    def done(self) -> bool:
+        return self.future.done()
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.finished is None else self.finished - self.started
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        return self.future.result(timeout)
+
+    def discard(self):
+        """Drop the result; work that has not started yet is cancelled."""
+        self.discarded = True
+        self.future.cancel()
+
+
+class InterviewSession:
+    """Turn-by-turn interview that hides LLM latency behind the user's typing.
+
+    While a question is on screen the session already generates the next
+    one (when the plan has run out). While a follow-up can still be asked,
+    a submitted answer is graded in the background and, if the grade is
+    low, a follow-up question is generated; it is asked a turn later, in
+    place of the last planned question, so the interview keeps its length.
+    Other answers are left to the interview evaluation, which grades every
+    answer in one call anyway. The interview is created together with its
+    first question; later questions are stored with ``add_question`` when
+    they are asked, since a follow-up may take a planned one's place.
+    Answers go through an ``AnswerBuffer`` (write-behind, unless
+    ``Config.ANSWER_WRITE_BEHIND`` is off) and are flushed once the last
+    one is in and when the session is closed, so grading the interview
+    reads them from the database. ``stats`` reports how much waiting each
+    turn avoided compared with calling the API in line.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, openai_service: OpenAIService,
+                 user_id: int, difficulty: str, num_questions: int,
+                 planned: Optional[List[str]] = None, topic: Optional[str] = None,
+                 cv_filename: Optional[str] = None, cv_analysis: Optional[str] = None,
+                 cv_document_id: Optional[int] = None,
+                 max_follow_ups: Optional[int] = None,
+                 follow_up_threshold: Optional[float] = None,
+                 executor: Optional[ThreadPoolExecutor] = None,
+                 answer_buffer: Optional[AnswerBuffer] = None):
+        self.db = db_manager
+        self.openai_service = openai_service
+        self.difficulty = difficulty
+        self.num_questions = num_questions
+        self.topic = topic
+        self.cv_analysis = cv_analysis
+        self.max_follow_ups = Config.INTERVIEW_MAX_FOLLOW_UPS if max_follow_ups is None else max_follow_ups
+        self.follow_up_threshold = follow_up_threshold or Config.INTERVIEW_FOLLOW_UP_THRESHOLD
+        self.executor = executor or _get_executor()
+        if answer_buffer is None and Config.ANSWER_WRITE_BEHIND:
+            answer_buffer = AnswerBuffer.for_database(db_manager)
+        self.answer_buffer = answer_buffer
+
+        self.turns: List[Dict[str, Any]] = []
+        self._plan = deque(planned or [])
+        self._next: Optional[Speculation] = None
+        self._follow_up: Optional[Speculation] = None
+        self._follow_up_duration = 0.0
+        self.follow_ups_asked = 0
+        self.discarded = 0
+        # The interview and its first question are stored in one transaction
+        first = self._next_question()
+        created = self.db.create_interview_with_questions(
+            user_id, cv_filename, None if cv_document_id else cv_analysis, difficulty,
+            [first[0]], cv_document_id=cv_document_id, question_count=num_questions
+        )
+        self.interview_id = created['interview_id']
+        self._ask(*first, question_id=created['question_ids'][0])
+
+    @property
+    def finished(self) -> bool:
+        return len(self.turns) >= self.num_questions and self.turns[-1]['answer'] is not None
+
+    @property
+    def current(self) -> Optional[Dict[str, Any]]:
+        """The turn waiting for an answer, or None when the interview is over."""
+        return None if self.finished else self.turns[-1]
+
+    def _asked(self) -> List[str]:
+        return [turn['question'] for turn in self.turns]
+
+    def _prefetch_next(self):
+        """Start generating the next question if the plan cannot supply it."""
+        if self._next is None and not self._plan and len(self.turns) < self.num_questions:
+            self._next = Speculation(
+                self.executor, self.openai_service.generate_next_question,
+                self._asked(), self.difficulty, self.topic, self.cv_analysis
+            )
+
+    def _next_question(self) -> tuple:
+        """Return (question, kind, wait, generation_time) for the next turn."""
+        follow_up = self._take_follow_up()
+        if follow_up is not None:
+            return follow_up, 'follow_up', 0.0, self._follow_up_duration
+        if self._plan:
+            return self._plan.popleft(), 'planned', 0.0, 0.0
+
+        self._prefetch_next()
+        speculation, self._next = self._next, None
+        waited_from = time.perf_counter()
+        try:
+            question = speculation.result()
+        except Exception:
+            question = None
+        wait = time.perf_counter() - waited_from
+        # Generated before the latest questions were asked: may repeat one.
+        # A failed prefetch is retried in line.
+        asked = {question_hash(q) for q in self._asked()}
+        if not question or question_hash(question) in asked:
+            self.discarded += 1
+            started = time.perf_counter()
+            question = self.openai_service.generate_next_question(
+                self._asked(), self.difficulty, self.topic, self.cv_analysis
+            )
+            extra = time.perf_counter() - started
+            return question, 'generated', wait + extra, (speculation.duration or 0.0) + extra
+        return question, 'generated', wait, speculation.duration
+
+    def _follow_up_for(self, grade: Speculation, question: str, answer: str) -> Optional[str]:
+        """Wait for an answer's grade and generate a follow-up only if it is low."""
+        score = grade.result()['score']
+        if score is None or score >= self.follow_up_threshold:
+            return None
+        return self.openai_service.generate_follow_up_question(question, answer, self.difficulty)
+
+    def _take_follow_up(self) -> Optional[str]:
+        """Use the speculative follow-up if one is ready, else discard it.
+
+        The interview never waits for a follow-up.
+        """
+        follow_up, self._follow_up = self._follow_up, None
+        self._follow_up_duration = 0.0
+        if follow_up is None:
+            return None
+        question = None
+        if follow_up.done() and not follow_up.future.cancelled():
+            try:
+                question = follow_up.result()
+            except Exception:
+                question = None
+        if not question:
+            follow_up.discard()
+            self.discarded += 1
+            return None
+        self.follow_ups_asked += 1
+        self._follow_up_duration = follow_up.duration or 0.0
+        return question
+
+    def _ask(self, question: str, kind: str, wait: float, generation_time: float,
+             question_id: Optional[int] = None):
+        if question_id is None:
+            question_id = self.db.add_question(self.interview_id, question, len(self.turns) + 1)
+        self.turns.append({
+            'question': question,
+            'question_id': question_id,
+            'kind': kind,
+            'answer': None,
+            'grade': None,
+            'question_wait': wait,
+            'question_generation_time': generation_time,
+        })
+        # Generate the following question while this one is being answered
+        self._prefetch_next()
+
+    def submit_answer(self, answer: str):
+        """Store the answer to the current question and move on to the next one."""
+        turn = self.current
+        if turn is None:
+            raise ValueError("the interview has no open question")
+        if self.answer_buffer is not None:
+            self.answer_buffer.put(turn['question_id'], answer, self.interview_id)
+        else:
+            self.db.update_question_answer(turn['question_id'], answer)
+        turn['answer'] = answer
+
+        remaining = self.num_questions - len(self.turns)
+        if remaining <= 0:
+            self._discard_pending()
+            self.flush_answers()
+            return
+
+        # The follow-up for the previous answer is decided now; the one for
+        # this answer on the next turn. Grading is only started while a
+        # follow-up can still be asked, since nothing else waits for it.
+        next_question = self._next_question()
+        if (turn['kind'] != 'follow_up' and self.follow_ups_asked < self.max_follow_ups
+                and remaining > 1):
+            turn['grade'] = Speculation(
+                self.executor, self.openai_service.evaluate_answer, turn['question'], answer
+            )
+            self._follow_up = Speculation(
+                self.executor, self._follow_up_for, turn['grade'], turn['question'], answer
+            )
+        self._ask(*next_question)
+
+    def grades(self, wait: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """Per-question grades that are ready (all of them with ``wait``)."""
+        grades = []
+        for turn in self.turns:
+            grade = turn['grade']
+            if grade is None or (not wait and not grade.done()):
+                grades.append(None)
+                continue
+            try:
+                grades.append(grade.result())
+            except Exception as e:
+                grades.append(self.openai_service.answer_evaluation_error(e))
+        return grades
+
+    def _discard_pending(self):
+        for speculation in (self._next, self._follow_up):
+            if speculation is not None:
+                speculation.discard()
+                self.discarded += 1
+        self._next = None
+        self._follow_up = None
+
+    def flush_answers(self):
+        """Write this session's buffered answers to the database now."""
+        if self.answer_buffer is not None:
+            self.answer_buffer.flush_interview(self.interview_id)
+
+    def close(self):
+        """End the session: store its answers and drop all speculative work still pending."""
+        self.flush_answers()
+        self._discard_pending()
+        for turn in self.turns:
+            if turn['grade'] is not None and not turn['grade'].done():
+                turn['grade'].discard()
+
+    def stats(self) -> Dict[str, Any]:
+        """Latency hidden per turn by generating questions ahead of time.
+
+        'saved' is how long the user would have waited for each question
+        had it been generated in line. 'grade_time' is the time spent
+        grading the answer in the background; without follow-ups that
+        grading would not happen per turn at all, so it is reported on its
+        own rather than counted as waiting saved.
+        """
+        turns = []
+        for turn in self.turns:
+            grade = turn['grade']
+            turns.append({
+                'kind': turn['kind'],
+                'question_wait': turn['question_wait'],
+                'saved': max(0.0, turn['question_generation_time'] - turn['question_wait']),
+                'grade_time': grade.duration if grade is not None and grade.duration else 0.0,
+            })
+        return {
+            'turns': turns,
+            'total_saved': sum(t['saved'] for t in turns),
+            'total_wait': sum(t['question_wait'] for t in turns),
+            'total_grade_time': sum(t['grade_time'] for t in turns),
+            'follow_ups_asked': self.follow_ups_asked,
+            'discarded': self.discarded,
+        }
@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from config import Config
+from database.db_manager import DatabaseManager
+from services.cv_analyzer import CVAnalyzer
+from services.openai_service import OpenAIService
+from services.resilience import OpenAIServiceError
+from utils.metrics import Instrument
+
+# Job states, as stored in jobs.status
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+
+EVALUATE_INTERVIEW = 'evaluate_interview'
+ANALYZE_CV = 'analyze_cv'
+
+logger = logging.getLogger(__name__)
+JOB_RUNS = Instrument('job', 'background job attempts', label='job_type')
+
+
+class JobError(Exception):
+    """Raised by a handler for a failure that retrying will not fix."""
+
+
+class JobQueue:
+    """Durable background jobs stored in the SQLite jobs table.
+
+    Jobs are enqueued under an idempotency key, so asking twice for the
+    same work returns the existing job. Worker threads lease jobs, run the
+    registered handler and store its JSON result. Failed attempts are
+    retried with exponential backoff up to ``max_attempts``; a job whose
+    worker died is picked up again once its lease expires. Any process
+    sharing the database can enqueue jobs or run workers.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, workers: Optional[int] = None,
+                 poll_interval: Optional[float] = None, lease_seconds: Optional[float] = None,
+                 max_attempts: Optional[int] = None, retry_delay: float = 2.0):
+        self.db = db_manager
+        self.workers = workers or Config.JOB_WORKERS
+        self.poll_interval = poll_interval or Config.JOB_POLL_INTERVAL
+        self.lease_seconds = lease_seconds or Config.JOB_LEASE_SECONDS
+        self.max_attempts = max_attempts or Config.JOB_MAX_ATTEMPTS
+        self.retry_delay = retry_delay
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._threads = []
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.worker_prefix = f"{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.succeeded = 0
+        self.retried = 0
+        self.failed = 0
+
+    def register(self, job_type: str, handler: Callable[[Dict[str, Any]], Any]):
+        """Run ``handler(payload)`` for jobs of ``job_type``; its return value is the result."""
+        self.handlers[job_type] = handler
+
+    def enqueue(self, job_type: str, payload: Dict[str, Any],
+                idempotency_key: Optional[str] = None,
+                max_attempts: Optional[int] = None) -> int:
+        """Queue a job and return its ID (the existing one for a known key)."""
+        key = idempotency_key or f"{job_type}:{uuid.uuid4().hex}"
+        job_id = self.db.enqueue_job(
+            job_type, key, json.dumps(payload), max_attempts or self.max_attempts, time.time()
+        )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        """Return a job with its payload and result decoded, or None."""
+        job = self.db.get_job(job_id)
+        if job is None:
+            return None
+        job['payload'] = json.loads(job['payload'])
+        job['result'] = json.loads(job['result']) if job['result'] is not None else None
+        return job
+
+    def wait(self, job_id: int, timeout: float) -> Optional[Dict[str, Any]]:
+        """Poll until the job has finished or ``timeout`` seconds have passed."""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if job is None or job['status'] in (SUCCEEDED, FAILED) or time.monotonic() >= deadline:
+                return job
+            time.sleep(min(0.25, max(0.0, deadline - time.monotonic())))
+
+    def run_once(self, worker_id: str) -> bool:
+        """Claim and run one job; return False if there was nothing to do."""
+        job = self.db.claim_job(worker_id, list(self.handlers), self.lease_seconds, time.time())
+        if job is None:
+            return False
+
+        try:
+            with JOB_RUNS.track(job['job_type']):
+                result = self.handlers[job['job_type']](json.loads(job['payload']))
+        except Exception as e:
+            retryable = not isinstance(e, JobError) and not (
+                isinstance(e, OpenAIServiceError) and not e.retryable
+            )
+            retry_at = None
+            if retryable and job['attempts'] < job['max_attempts']:
+                delay = self.retry_delay * (2 ** (job['attempts'] - 1))
+                retry_at = time.time() + random.uniform(delay / 2, delay)
+            self.db.fail_job(job['id'], worker_id, str(e), retry_at, time.time())
+            logger.warning("Job attempt failed", extra={
+                'job_id': job['id'], 'job_type': job['job_type'], 'attempt': job['attempts'],
+                'will_retry': retry_at is not None, 'error': str(e),
+            })
+            with self._lock:
+                if retry_at is not None:
+                    self.retried += 1
+                else:
+                    self.failed += 1
+            return True
+
+        self.db.complete_job(job['id'], worker_id, json.dumps(result), time.time())
+        with self._lock:
+            self.succeeded += 1
+        return True
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self._lock:
+            if self._threads:
+                return
+            self._stop_event.clear()
+            for i in range(self.workers):
+                thread = threading.Thread(
+                    target=self._run, args=(f"{self.worker_prefix}-{i}",),
+                    name=f"job-worker-{i}", daemon=True
+                )
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stop_event.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _run(self, worker_id: str):
+        while not self._stop_event.is_set():
+            try:
+                busy = self.run_once(worker_id)
+            except Exception:
+                logger.exception("Job worker error", extra={'worker_id': worker_id})
+                busy = False
+            if not busy:
+                # Jobs enqueued in this process wake the workers at once;
+                # jobs from other processes and retries are found by polling.
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker counters and the number of jobs in each state."""
+        with self._lock:
+            stats = {
+                'workers': len(self._threads),
+                'succeeded': self.succeeded,
+                'retried': self.retried,
+                'failed': self.failed,
+            }
+        stats['jobs'] = self.db.count_jobs_by_status()
+        return stats
+
+
+def evaluate_interview_handler(db_manager: DatabaseManager,
+                               openai_service: OpenAIService) -> Callable:
+    """Handler that grades an interview and stores the evaluation."""
+
+    def handle(payload: Dict[str, Any]) -> Dict[str, Any]:
+        interview_id = payload['interview_id']
+        # A retried job may find the work already done by an earlier attempt
+        existing = db_manager.get_interview_evaluation(interview_id)
+        if existing is not None:
+            db_manager.update_interview_status(interview_id, 'completed', existing['score'])
+            return {'evaluation_id': existing['id'], 'overall_score': existing['score']}
+
+        questions = db_manager.get_interview_questions(interview_id)
+        if not questions or any(not q['answer_text'] for q in questions):
+            raise JobError("Answer all questions before requesting an evaluation.")
+        result = openai_service.evaluate_interview_batch([
+            {'question': q['question_text'], 'answer': q['answer_text']}
+            for q in questions
+        ])
+        if not result['success']:
+            raise Exception(result['evaluation_text'])
+
+        evaluation_id = db_manager.create_evaluation(
+            interview_id, result['evaluation_text'],
+            result['overall_score'], result['feedback']
+        )
+        db_manager.update_interview_status(interview_id, 'completed', result['overall_score'])
+        return {'evaluation_id': evaluation_id, 'overall_score': result['overall_score']}
+
+    return handle
+
+
+def analyze_cv_handler(cv_analyzer: CVAnalyzer) -> Callable:
+    """Handler that extracts and analyzes a CV stored by its content hash."""
+
+    def handle(payload: Dict[str, Any]) -> Dict[str, Any]:
+        result = cv_analyzer.analyze_stored_cv(payload['content_hash'])
+        if not result['success']:
+            error = result.get('error', 'CV analysis failed')
+            if 'analysis' not in result:
+                # The CV is missing or has no text; retrying won't help
+                raise JobError(error)
+            raise Exception(error)
+        return {'cv_document_id': result.get('cv_document_id'), 'cached': result.get('cached', False)}
+
+    return handle
+
+
+def build_job_queue(db_manager: DatabaseManager, openai_service: OpenAIService,
+                    cv_analyzer: CVAnalyzer) -> JobQueue:
+    """Job queue with the evaluation and CV analysis handlers registered."""
+    queue = JobQueue(db_manager)
+    queue.register(EVALUATE_INTERVIEW, evaluate_interview_handler(db_manager, openai_service))
+    queue.register(ANALYZE_CV, analyze_cv_handler(cv_analyzer))
+    return queue
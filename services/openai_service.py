@@ -1,35 +1,258 @@
+import threading
+import time
 from openai import OpenAI
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, Iterator, List, Dict, Optional
 from config import Config
+from services import evaluation_parser
+from services.completion_cache import CompletionCache, make_cache_key
+from services.request_scheduler import BATCH, INTERACTIVE, RequestScheduler
+from services.resilience import (OpenAIServiceError, ResiliencePolicy,
+                                 UpstreamUnavailableError, classify_error)
+from utils.metrics import REGISTRY, Instrument, instrument_methods
+from utils.tokens import count_tokens
 
+SYSTEM_PROMPT = "You are a helpful AI assistant specialized in conducting job interviews and providing professional feedback."
+
+OPENAI_CALLS = Instrument('openai_call', 'OpenAIService calls', label='method')
+# Single attempts against the API, without scheduler wait and retries
+OPENAI_REQUESTS = Instrument('openai_request', 'chat completion requests sent to the API', label='kind')
+PROMPT_TOKENS = REGISTRY.counter('openai_prompt_tokens_total', 'Prompt tokens sent.', ('model',))
+COMPLETION_TOKENS = REGISTRY.counter('openai_completion_tokens_total',
+                                     'Completion tokens received.', ('model',))
+STREAM_TTFB = REGISTRY.histogram('openai_stream_ttfb_seconds',
+                                 'Time from sending a streamed request to its first chunk.')
+
+
+def record_usage(model: str, prompt_tokens: int, completion_tokens: int):
+    PROMPT_TOKENS.inc(prompt_tokens, model=model)
+    COMPLETION_TOKENS.inc(completion_tokens, model=model)
+
+class StreamStats:
+    """Time-to-first-byte statistics for streamed completions."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.streams = 0
+        self.total_ttfb = 0.0
+        self.max_ttfb = 0.0
+        self.last_ttfb = None
+    
+    def record_ttfb(self, seconds: float):
+        with self._lock:
+            self.streams += 1
+            self.total_ttfb += seconds
+            self.max_ttfb = max(self.max_ttfb, seconds)
+            self.last_ttfb = seconds
+        STREAM_TTFB.observe(seconds)
+    
+    def stats(self) -> Dict[str, any]:
+        with self._lock:
+            return {
+                'streams': self.streams,
+                'avg_ttfb': self.total_ttfb / self.streams if self.streams else None,
+                'max_ttfb': self.max_ttfb,
+                'last_ttfb': self.last_ttfb,
+            }
+
+class CompletionStream:
+    """Iterable over streamed text that parses the full response at the end.
+    
+    ``text`` and ``result`` are available once iteration has finished. If the
+    stream fails, ``result`` is built by ``on_error`` instead of raising.
+    """
+    
+    def __init__(self, chunks: Iterable[str],
+                 parse: Callable[[str], Dict[str, any]],
+                 on_error: Callable[[Exception], Dict[str, any]]):
+        self._chunks = chunks
+        self._parse = parse
+        self._on_error = on_error
+        self.text = None
+        self.result = None
+    
+    def __iter__(self) -> Iterator[str]:
+        parts = []
+        try:
+            for chunk in self._chunks:
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            self.text = ''.join(parts).strip()
+            self.result = self._on_error(e)
+            return
+        self.text = ''.join(parts).strip()
+        self.result = self._parse(self.text)
+
+@instrument_methods(OPENAI_CALLS)
 class OpenAIService:
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None,
+                 cache: Optional[CompletionCache] = None,
+                 scheduler: Optional[RequestScheduler] = None,
+                 base_url: Optional[str] = None,
+                 resilience: Optional[ResiliencePolicy] = None):
         self.api_key = api_key or Config.OPENAI_API_KEY
-        self.client = OpenAI(api_key=self.api_key)
+        # Retries are handled by the resilience policy, not the client
+        self.client = OpenAI(api_key=self.api_key, base_url=base_url or Config.OPENAI_BASE_URL,
+                             max_retries=0)
         self.model = "gpt-3.5-turbo"
+        self.cache = cache
+        self.scheduler = scheduler or RequestScheduler.shared()
+        self.resilience = resilience or ResiliencePolicy()
+        self.stream_stats = StreamStats()
     
     def generate_completion(self, prompt: str, 
                           max_tokens: int = 1000,
-                          temperature: float = 0.7) -> str:
-        """Generate a completion using OpenAI's API."""
+                          temperature: float = 0.7,
+                          use_cache: bool = True,
+                          priority: int = INTERACTIVE,
+                          deadline: Optional[float] = None,
+                          response_format: Optional[Dict[str, str]] = None) -> str:
+        """Generate a completion using OpenAI's API.
+        
+        Identical requests are served from the completion cache when one is
+        configured; pass ``use_cache=False`` to always get a fresh response
+        (which is then not stored either).
+        Requests go through the shared rate-limit scheduler at ``priority``
+        and are retried until ``deadline`` seconds have passed. While the
+        upstream is unavailable a cached response is returned if one exists,
+        even with ``use_cache=False``. ``response_format`` is passed through
+        to the API, e.g. ``{"type": "json_object"}``.
+        
+        Raises:
+            OpenAIServiceError: if no completion could be produced.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = make_cache_key(self.model, SYSTEM_PROMPT, prompt, max_tokens, temperature,
+                                       response_format)
+            if use_cache:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+        
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a helpful AI assistant specialized in conducting job interviews and providing professional feedback."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
+            content = self.resilience.call(
+                lambda timeout: self._create_completion(prompt, max_tokens, temperature,
+                                                        priority, timeout, response_format),
+                deadline=deadline
             )
-            return response.choices[0].message.content.strip()
+        except OpenAIServiceError as e:
+            if cache_key is not None and (e.retryable or isinstance(e, UpstreamUnavailableError)):
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+            raise
+        if cache_key is not None and use_cache:
+            # Fresh responses (unique prompts) could never be read back
+            self.cache.set(cache_key, content)
+        return content
+    
+    @staticmethod
+    def estimate_tokens(prompt: str, max_tokens: int) -> int:
+        """Upper bound of the tokens a request can use, for rate limiting."""
+        return count_tokens(SYSTEM_PROMPT) + count_tokens(prompt) + max_tokens
+    
+    def _create_completion(self, prompt: str, max_tokens: int, temperature: float,
+                           priority: int = INTERACTIVE, timeout: Optional[float] = None,
+                           response_format: Optional[Dict[str, str]] = None) -> str:
+        """Send one chat completion request to the API."""
+        extra = {'response_format': response_format} if response_format else {}
+        with self.scheduler.slot(self.estimate_tokens(prompt, max_tokens), priority,
+                                 timeout=timeout) as ticket:
+            with OPENAI_REQUESTS.track('completion'):
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    timeout=timeout,
+                    **extra
+                )
+            if response.usage is not None:
+                ticket.actual_tokens = response.usage.total_tokens
+                record_usage(self.model, response.usage.prompt_tokens,
+                             response.usage.completion_tokens)
+        return response.choices[0].message.content.strip()
+    
+    def stream_completion(self, prompt: str,
+                          max_tokens: int = 1000,
+                          temperature: float = 0.7,
+                          use_cache: bool = True,
+                          priority: int = INTERACTIVE) -> Iterator[str]:
+        """Generate a completion, yielding text chunks as they arrive.
+        
+        The assembled response is cached like generate_completion, and a
+        cached response is yielded as a single chunk. Opening the stream is
+        retried like generate_completion; errors mid-stream are not.
+        """
+        cache_key = None
+        if self.cache is not None and use_cache:
+            cache_key = make_cache_key(self.model, SYSTEM_PROMPT, prompt, max_tokens, temperature)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+        
+        def open_stream(timeout: float):
+            ticket = self.scheduler.acquire(self.estimate_tokens(prompt, max_tokens), priority,
+                                            timeout=timeout)
+            try:
+                stream = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    stream=True,
+                    timeout=timeout
+                )
+            except Exception:
+                self.scheduler.settle(ticket)
+                raise
+            return ticket, stream
+        
+        # Only opening the stream is retried; once text has been shown a
+        # failure is reported to the caller.
+        started = time.perf_counter()
+        ticket, stream = self.resilience.call(open_stream, hedge=False)
+        first_chunk = True
+        parts = []
+        try:
+            with OPENAI_REQUESTS.track('stream'):
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if not text:
+                        continue
+                    if first_chunk:
+                        self.stream_stats.record_ttfb(time.perf_counter() - started)
+                        first_chunk = False
+                    parts.append(text)
+                    yield text
+            # Streamed responses carry no usage; count the output locally
+            completion_tokens = count_tokens(''.join(parts))
+            ticket.actual_tokens = ticket.estimated_tokens - max_tokens + completion_tokens
+            record_usage(self.model, ticket.estimated_tokens - max_tokens, completion_tokens)
         except Exception as e:
-            raise Exception(f"OpenAI API error: {str(e)}")
+            raise classify_error(e) from e
+        finally:
+            self.scheduler.settle(ticket)
+        
+        if cache_key is not None:
+            self.cache.set(cache_key, ''.join(parts).strip())
     
     def generate_interview_questions(self, 
                                     num_questions: int = 5,
                                     difficulty: str = 'medium',
-                                    topic: Optional[str] = None) -> List[str]:
+                                    topic: Optional[str] = None,
+                                    use_cache: bool = True,
+                                    priority: int = INTERACTIVE) -> List[str]:
         """Generate interview questions."""
         topic_text = f" about {topic}" if topic else ""
         prompt = f"""Generate {num_questions} technical interview questions{topic_text}
@@ -38,7 +261,7 @@ at {difficulty} difficulty level.
 Provide exactly {num_questions} questions, numbered 1-{num_questions}.
 Make them clear, specific, and appropriate for a {difficulty} difficulty interview."""
         
-        response = self.generate_completion(prompt)
+        response = self.generate_completion(prompt, use_cache=use_cache, priority=priority)
         
         # Parse questions from response
         questions = []
@@ -52,9 +275,52 @@ Make them clear, specific, and appropriate for a {difficulty} difficulty intervi
         
         return questions[:num_questions]
     
-    def evaluate_answer(self, question: str, answer: str) -> Dict[str, any]:
-        """Evaluate an interview answer."""
-        prompt = f"""Evaluate the following interview answer on a scale of 0-10.
+    @staticmethod
+    def parse_single_question(response: str) -> str:
+        """First question in a response, without numbering or quotes."""
+        for line in response.split('\n'):
+            question = line.strip().lstrip('0123456789.-) ').strip().strip('"')
+            if question:
+                return question
+        return ''
+    
+    def generate_next_question(self, asked: List[str], difficulty: str = 'medium',
+                               topic: Optional[str] = None,
+                               cv_analysis: Optional[str] = None) -> str:
+        """Generate one more question for an interview that already asked ``asked``."""
+        topic_text = f" about {topic}" if topic else ""
+        context = f"\nCandidate background:\n{cv_analysis}\n" if cv_analysis else ""
+        asked_text = "\n".join(f"- {q}" for q in asked) or "- (none yet)"
+        prompt = f"""You are interviewing a candidate{topic_text} at {difficulty} difficulty level.
+{context}
+Questions asked so far:
+{asked_text}
+
+Write the next interview question. It must cover a different area from the questions above.
+Reply with the question only."""
+        
+        response = self.generate_completion(prompt, max_tokens=200, use_cache=False)
+        return self.parse_single_question(response)
+    
+    def generate_follow_up_question(self, question: str, answer: str,
+                                    difficulty: str = 'medium') -> str:
+        """Generate a follow-up that probes a weak answer more deeply."""
+        prompt = f"""Earlier in an interview at {difficulty} difficulty level the candidate was asked:
+
+Question: {question}
+
+Answer: {answer}
+
+The answer was incomplete. Write one follow-up question that returns to this topic and
+gives the candidate a chance to show deeper understanding. Reply with the question only."""
+        
+        response = self.generate_completion(prompt, max_tokens=200, use_cache=False)
+        return self.parse_single_question(response)
+    
+    @staticmethod
+    def build_answer_prompt(question: str, answer: str) -> str:
+        """Build the prompt used to evaluate a single answer."""
+        return f"""Evaluate the following interview answer on a scale of 0-10.
 
 Question: {question}
 
@@ -71,53 +337,52 @@ Score: [number]
 Strengths: [text]
 Areas for Improvement: [text]
 Overall Feedback: [text]"""
+    
+    @staticmethod
+    def parse_answer_evaluation(response: str) -> Dict[str, any]:
+        """Parse a single-answer evaluation response."""
+        return evaluation_parser.parse_answer_evaluation(response)
+    
+    @staticmethod
+    def answer_evaluation_error(error: Exception) -> Dict[str, any]:
+        """Result returned when an answer could not be evaluated.
+        
+        The score is None rather than 0 so a failed call is never mistaken
+        for a bad answer; 'retryable' tells whether asking again may help.
+        """
+        return {
+            'score': None,
+            'strengths': '',
+            'improvements': '',
+            'feedback': f'Error evaluating answer: {str(error)}',
+            'raw_evaluation': '',
+            'success': False,
+            'retryable': isinstance(error, OpenAIServiceError) and (
+                error.retryable or isinstance(error, UpstreamUnavailableError)
+            )
+        }
+    
+    def evaluate_answer(self, question: str, answer: str,
+                        deadline: Optional[float] = None) -> Dict[str, any]:
+        """Evaluate an interview answer, giving up after ``deadline`` seconds."""
+        prompt = self.build_answer_prompt(question, answer)
         
         try:
-            response = self.generate_completion(prompt, max_tokens=500)
-            
-            # Parse the response
-            score = 0
-            strengths = ""
-            improvements = ""
-            feedback = ""
-            
-            for line in response.split('\n'):
-                if line.startswith('Score:'):
-                    try:
-                        score = float(line.split(':')[1].strip())
-                    except:
-                        score = 5.0
-                elif line.startswith('Strengths:'):
-                    strengths = line.split(':', 1)[1].strip()
-                elif line.startswith('Areas for Improvement:'):
-                    improvements = line.split(':', 1)[1].strip()
-                elif line.startswith('Overall Feedback:'):
-                    feedback = line.split(':', 1)[1].strip()
-            
-            return {
-                'score': score,
-                'strengths': strengths,
-                'improvements': improvements,
-                'feedback': feedback,
-                'raw_evaluation': response
-            }
+            response = self.generate_completion(prompt, max_tokens=500, priority=BATCH,
+                                                deadline=deadline)
+            return self.parse_answer_evaluation(response)
         except Exception as e:
-            return {
-                'score': 0,
-                'strengths': '',
-                'improvements': '',
-                'feedback': f'Error evaluating answer: {str(e)}',
-                'raw_evaluation': ''
-            }
+            return self.answer_evaluation_error(e)
     
-    def evaluate_interview(self, questions_and_answers: List[Dict[str, str]]) -> Dict[str, any]:
-        """Evaluate an entire interview session."""
+    @staticmethod
+    def build_interview_prompt(questions_and_answers: List[Dict[str, str]]) -> str:
+        """Build the prompt used to evaluate a whole interview session."""
         qa_text = "\n\n".join([
             f"Q{i+1}: {qa['question']}\nA{i+1}: {qa['answer']}"
             for i, qa in enumerate(questions_and_answers)
         ])
         
-        prompt = f"""Evaluate the following interview session. Provide an overall assessment.
+        return f"""Evaluate the following interview session. Provide an overall assessment.
 
 {qa_text}
 
@@ -129,29 +394,157 @@ Provide:
 5. Summary feedback
 
 Format your response clearly with these sections."""
+    
+    @staticmethod
+    def parse_interview_evaluation(response: str) -> Dict[str, any]:
+        """Parse a whole-interview evaluation response."""
+        return evaluation_parser.parse_interview_evaluation(response)
+    
+    @staticmethod
+    def interview_evaluation_error(error: Exception) -> Dict[str, any]:
+        """Result returned when an interview could not be evaluated."""
+        return {
+            'overall_score': None,
+            'evaluation_text': f'Error during evaluation: {str(error)}',
+            'feedback': '',
+            'success': False
+        }
+    
+    def evaluate_interview(self, questions_and_answers: List[Dict[str, str]]) -> Dict[str, any]:
+        """Evaluate an entire interview session."""
+        prompt = self.build_interview_prompt(questions_and_answers)
         
         try:
-            response = self.generate_completion(prompt, max_tokens=1500)
-            
-            # Try to extract overall score
-            score = 50.0  # default
-            for line in response.split('\n'):
-                if 'score' in line.lower() and ':' in line:
-                    try:
-                        score_text = line.split(':')[1].strip()
-                        score = float(''.join(filter(str.isdigit, score_text)))
-                        break
-                    except:
-                        pass
-            
-            return {
-                'overall_score': score,
-                'evaluation_text': response,
-                'success': True
-            }
+            response = self.generate_completion(prompt, max_tokens=1500, priority=BATCH)
+            return self.parse_interview_evaluation(response)
         except Exception as e:
-            return {
-                'overall_score': 0,
-                'evaluation_text': f'Error during evaluation: {str(e)}',
-                'success': False
-            }
\ No newline at end of file
+            return self.interview_evaluation_error(e)
+    
+    def stream_interview_evaluation(self, questions_and_answers: List[Dict[str, str]]) -> 'CompletionStream':
+        """Evaluate an entire interview session, streaming the feedback.
+        
+        Iterate the returned stream to receive text as it arrives; once it is
+        exhausted ``stream.result`` holds the same dict as evaluate_interview.
+        """
+        prompt = self.build_interview_prompt(questions_and_answers)
+        return CompletionStream(
+            self.stream_completion(prompt, max_tokens=1500, priority=BATCH),
+            self.parse_interview_evaluation,
+            self.interview_evaluation_error
+        )
+    
+    @staticmethod
+    def build_batch_prompt(questions_and_answers: List[Dict[str, str]], first_index: int = 1,
+                           total: Optional[int] = None) -> str:
+        """Build the prompt that grades every answer and the session in one call."""
+        total = total or len(questions_and_answers)
+        qa_text = "\n\n".join([
+            f"Q{first_index + i}: {qa['question']}\nA{first_index + i}: {qa['answer']}"
+            for i, qa in enumerate(questions_and_answers)
+        ])
+        scope = ("the whole interview" if len(questions_and_answers) == total else
+                 f"questions {first_index}-{first_index + len(questions_and_answers) - 1} "
+                 f"of a {total}-question interview")
+        
+        return f"""Evaluate {scope}. Grade every answer and the session as a whole.
+
+{qa_text}
+
+Respond with a single JSON object of this shape:
+{{"answers": [{{"index": <question number>, "score": <0-10>, "strengths": "...", "improvements": "...", "feedback": "..."}}],
+ "overall_score": <0-100>,
+ "strengths": "...",
+ "improvements": "...",
+ "recommendations": "...",
+ "summary": "..."}}
+Include one entry in "answers" for every question above."""
+    
+    @staticmethod
+    def chunk_transcript(questions_and_answers: List[Dict[str, str]],
+                         token_budget: int) -> List[List[Dict[str, str]]]:
+        """Split a transcript into consecutive chunks of at most ``token_budget`` tokens.
+        
+        A single question and answer longer than the budget gets a chunk of
+        its own rather than being cut.
+        """
+        chunks = [[]]
+        used = 0
+        for qa in questions_and_answers:
+            tokens = count_tokens(qa['question']) + count_tokens(qa['answer']) + 8
+            if chunks[-1] and used + tokens > token_budget:
+                chunks.append([])
+                used = 0
+            chunks[-1].append(qa)
+            used += tokens
+        return chunks
+    
+    @staticmethod
+    def render_batch_evaluation(result: Dict[str, any],
+                                questions_and_answers: List[Dict[str, str]]) -> str:
+        """Readable evaluation text for a batched grading result."""
+        parts = [f"Overall Score: {result['overall_score']:.0f}/100"]
+        for title, key in (("Strengths", 'strengths'), ("Areas for Improvement", 'improvements'),
+                           ("Recommendations", 'recommendations'), ("Summary", 'summary')):
+            if result.get(key):
+                parts.append(f"{title}:\n{result[key]}")
+        for i, (qa, answer) in enumerate(zip(questions_and_answers, result['answers'])):
+            score = f"{answer['score']:.1f}/10" if answer['score'] is not None else "not graded"
+            lines = [f"Q{i + 1}: {qa['question']}", f"Score: {score}"]
+            lines += [text for text in (answer['strengths'], answer['improvements'],
+                                        answer['feedback']) if text]
+            parts.append("\n".join(lines))
+        return "\n\n".join(parts)
+    
+    def evaluate_interview_batch(self, questions_and_answers: List[Dict[str, str]],
+                                 context_budget: Optional[int] = None) -> Dict[str, any]:
+        """Grade every answer and the whole session in one structured completion.
+        
+        Replaces one evaluate_answer call per question plus evaluate_interview.
+        Transcripts longer than ``context_budget`` tokens are graded in
+        chunks and the chunk scores combined, weighted by question count.
+        
+        Returns:
+            The evaluate_interview dict plus 'answers' (one evaluate_answer
+            style dict per question) and 'calls' (completions made)
+        """
+        budget = context_budget or Config.EVALUATION_CONTEXT_BUDGET
+        chunks = self.chunk_transcript(questions_and_answers, budget)
+        total = len(questions_and_answers)
+        
+        answers = []
+        overall = []
+        sections = {'strengths': [], 'improvements': [], 'recommendations': [], 'summary': []}
+        first_index = 1
+        try:
+            for chunk in chunks:
+                prompt = self.build_batch_prompt(chunk, first_index, total)
+                response = self.generate_completion(
+                    prompt, max_tokens=min(4000, 300 + 200 * len(chunk)), temperature=0.3,
+                    priority=BATCH, response_format={"type": "json_object"}
+                )
+                parsed = evaluation_parser.parse_batch_evaluation(response, first_index, len(chunk))
+                answers += parsed['answers']
+                if parsed['overall_score'] is not None:
+                    overall.append((parsed['overall_score'], len(chunk)))
+                for key in sections:
+                    if parsed[key]:
+                        sections[key].append(parsed[key])
+                first_index += len(chunk)
+        except Exception as e:
+            result = self.interview_evaluation_error(e)
+            result['answers'] = []
+            return result
+        
+        if not overall:
+            result = self.interview_evaluation_error(ValueError("the response had no overall score"))
+            result['answers'] = answers
+            return result
+        
+        result = {key: "\n\n".join(values) for key, values in sections.items()}
+        result['overall_score'] = sum(score * n for score, n in overall) / sum(n for _, n in overall)
+        result['answers'] = answers
+        result['evaluation_text'] = self.render_batch_evaluation(result, questions_and_answers)
+        result['feedback'] = result['summary']
+        result['calls'] = len(chunks)
+        result['success'] = True
+        return result
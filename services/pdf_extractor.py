@@ -0,0 +1,202 @@
+import io
+import multiprocessing
+import threading
+import time
+from collections import deque
+from typing import List, Optional, Tuple
+import PyPDF2
+from config import Config
+from utils.metrics import REGISTRY, Instrument
+
+PDF_EXTRACTIONS = Instrument('pdf_extraction', 'PDF text extraction stages', label='stage')
+PDF_PAGES = REGISTRY.counter('pdf_pages_extracted_total', 'PDF pages handed to text extraction.')
+
+
+class PDFExtractionError(Exception):
+    """Raised when a PDF cannot be extracted within the configured limits."""
+
+
+def extract_page_range(data: bytes, start: int, end: int) -> Tuple[int, List[str]]:
+    """Return the page count and the text of pages [start, end) of PDF bytes.
+
+    Runs in a worker process, so it takes the raw bytes and parses the
+    document itself rather than receiving an unpicklable reader. ``end`` is
+    clipped to the page count.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+    return page_count, [reader.pages[i].extract_text() or ''
+                        for i in range(start, min(end, page_count))]
+
+
+def _serve(conn):
+    """Worker process loop: extract the page ranges sent over ``conn``."""
+    while True:
+        try:
+            data, start, end = conn.recv()
+        except EOFError:
+            return
+        try:
+            conn.send((True, extract_page_range(data, start, end)))
+        except Exception as e:
+            conn.send((False, str(e)))
+
+
+class _Worker:
+    """One extraction process and the pipe to it; runs one task at a time."""
+
+    def __init__(self):
+        # Forking a multi-threaded server process is unsafe, so workers are
+        # spawned fresh.
+        context = multiprocessing.get_context('spawn')
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), daemon=True,
+                                       name="pdf-extractor")
+        self.process.start()
+        child.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class PDFTextExtractor:
+    """Extracts PDF text in parallel page ranges with page and time limits.
+
+    All parsing happens in worker processes shared by the class, so every
+    document is bound by ``timeout``. The first task reads the page count
+    along with the first ``pages_per_task`` pages, which is the whole of
+    most CVs; longer documents have their remaining ranges extracted in
+    parallel. A worker that misses the deadline is killed and replaced
+    without touching the tasks of other documents. Page texts are joined
+    once at the end instead of being concatenated page by page.
+    """
+
+    _idle: List[_Worker] = []
+    _started = 0
+    _workers = threading.Condition()
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_pages: Optional[int] = None,
+                 timeout: Optional[float] = None,
+                 pages_per_task: Optional[int] = None):
+        self.max_workers = max_workers or Config.PDF_EXTRACTION_WORKERS
+        self.max_pages = max_pages or Config.PDF_MAX_PAGES
+        self.timeout = timeout or Config.PDF_EXTRACTION_TIMEOUT
+        self.pages_per_task = pages_per_task or Config.PDF_PAGES_PER_TASK
+
+    def _timed_out(self) -> PDFExtractionError:
+        return PDFExtractionError(f"PDF text extraction exceeded {self.timeout}s")
+
+    def _checkout(self, deadline: float, block: bool = True) -> Optional[_Worker]:
+        """An idle worker, a new one below ``max_workers``, or None if ``block`` is off."""
+        cls = type(self)
+        with cls._workers:
+            while not cls._idle and cls._started >= self.max_workers:
+                remaining = deadline - time.monotonic()
+                if not block:
+                    return None
+                if remaining <= 0:
+                    raise self._timed_out()
+                cls._workers.wait(remaining)
+            if cls._idle:
+                return cls._idle.pop()
+            cls._started += 1
+        try:
+            return _Worker()
+        except Exception:
+            with cls._workers:
+                cls._started -= 1
+                cls._workers.notify()
+            raise
+
+    def _checkin(self, worker: _Worker):
+        cls = type(self)
+        with cls._workers:
+            cls._idle.append(worker)
+            cls._workers.notify()
+
+    def _discard(self, worker: _Worker):
+        """Kill a worker that is stuck or broken; a new one takes its place."""
+        worker.kill()
+        cls = type(self)
+        with cls._workers:
+            cls._started -= 1
+            cls._workers.notify()
+
+    @classmethod
+    def shutdown(cls):
+        """Stop the idle workers (busy ones are stopped when their task ends)."""
+        with cls._workers:
+            idle, cls._idle = cls._idle, []
+            cls._started -= len(idle)
+        for worker in idle:
+            worker.kill()
+
+    def _send(self, worker: _Worker, data: bytes, start: int):
+        try:
+            worker.conn.send((data, start, start + self.pages_per_task))
+        except (OSError, ValueError) as e:
+            self._discard(worker)
+            raise PDFExtractionError(f"Could not extract text: {e}")
+
+    def _result(self, worker: _Worker, deadline: float) -> Tuple[int, List[str]]:
+        try:
+            if not worker.conn.poll(max(0.0, deadline - time.monotonic())):
+                # Stop the pages stuck past the deadline from using CPU
+                self._discard(worker)
+                raise self._timed_out()
+            ok, value = worker.conn.recv()
+        except (EOFError, OSError) as e:
+            self._discard(worker)
+            raise PDFExtractionError(f"Could not extract text: {e}")
+        self._checkin(worker)
+        if not ok:
+            raise PDFExtractionError(f"Could not extract text: {value}")
+        return value
+
+    def extract(self, data: bytes) -> str:
+        """Extract the text of a PDF given as bytes.
+
+        Raises:
+            PDFExtractionError: if the PDF is invalid, has more than
+                ``max_pages`` pages, or is not extracted within ``timeout``.
+        """
+        deadline = time.monotonic() + self.timeout
+        with PDF_EXTRACTIONS.track('first_range'):
+            worker = self._checkout(deadline)
+            self._send(worker, data, 0)
+            page_count, pages = self._result(worker, deadline)
+        if page_count > self.max_pages:
+            raise PDFExtractionError(
+                f"PDF has {page_count} pages; at most {self.max_pages} are allowed"
+            )
+        PDF_PAGES.inc(page_count)
+
+        if page_count > self.pages_per_task:
+            with PDF_EXTRACTIONS.track('remaining_ranges'):
+                pages += self._extract_ranges(data, page_count, deadline)
+        return '\n'.join(pages).strip()
+
+    def _extract_ranges(self, data: bytes, page_count: int, deadline: float) -> List[str]:
+        """Texts of the pages after the first range, in order."""
+        starts = deque(range(self.pages_per_task, page_count, self.pages_per_task))
+        # Workers running this document's ranges, oldest range first
+        running = deque()
+        pages = []
+        try:
+            while starts or running:
+                # Only wait for a worker while holding none, so documents
+                # never wait on each other's workers
+                worker = self._checkout(deadline, block=not running) if starts else None
+                if worker is not None:
+                    self._send(worker, data, starts.popleft())
+                    running.append(worker)
+                else:
+                    pages += self._result(running.popleft(), deadline)[1]
+        finally:
+            # After a failure the other ranges' answers are never read
+            for worker in running:
+                self._discard(worker)
+        return pages
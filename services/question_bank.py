@@ -0,0 +1,143 @@
+import queue
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+from config import Config
+from database.db_manager import DatabaseManager
+from services.openai_service import OpenAIService
+from services.request_scheduler import BATCH
+
+class QuestionBank:
+    """Pre-generated interview questions so interviews start without an LLM call.
+
+    Questions are kept in buckets keyed by (difficulty, topic). ``draw`` takes
+    unseen questions straight from the database and only falls back to live
+    generation when a bucket cannot cover the request. A background worker
+    tops buckets back up to ``depth`` questions.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, openai_service: OpenAIService,
+                 depth: Optional[int] = None, batch_size: Optional[int] = None,
+                 refill_interval: Optional[float] = None):
+        self.db = db_manager
+        self.openai_service = openai_service
+        self.depth = depth or Config.QUESTION_BANK_DEPTH
+        self.batch_size = batch_size or Config.QUESTION_BANK_BATCH_SIZE
+        self.refill_interval = refill_interval or Config.QUESTION_BANK_REFILL_INTERVAL
+        self._requests = queue.Queue()
+        self._worker = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self.bank_hits = 0
+        self.live_fallbacks = 0
+        self.generated = 0
+        self.refill_errors = 0
+
+    @staticmethod
+    def buckets() -> List[Tuple[str, str]]:
+        """All configured (difficulty, topic) buckets; '' is the general topic."""
+        topics = [''] + Config.QUESTION_BANK_TOPICS
+        return [(difficulty, topic) for difficulty in Config.DIFFICULTY_LEVELS for topic in topics]
+
+    def draw(self, user_id: int, num_questions: int, difficulty: str,
+             topic: Optional[str] = None) -> List[str]:
+        """Return ``num_questions`` questions the user has not been asked before."""
+        topic = topic or ''
+        questions = self.db.draw_bank_questions(user_id, difficulty, topic, num_questions)
+
+        if len(questions) < num_questions:
+            with self._lock:
+                self.live_fallbacks += 1
+            live = self.openai_service.generate_interview_questions(
+                num_questions - len(questions), difficulty, topic or None, use_cache=False
+            )
+            self.db.mark_questions_seen(user_id, live)
+            questions += live
+        else:
+            with self._lock:
+                self.bank_hits += 1
+
+        self.request_refill(difficulty, topic)
+        return questions
+
+    def refill(self, difficulty: str, topic: str) -> int:
+        """Generate questions until the bucket holds ``depth``; return how many were added."""
+        added = 0
+        while True:
+            missing = self.depth - self.db.count_bank_questions(difficulty, topic)
+            if missing <= 0:
+                break
+            questions = self.openai_service.generate_interview_questions(
+                min(missing, self.batch_size), difficulty, topic or None,
+                use_cache=False, priority=BATCH
+            )
+            inserted = self.db.add_bank_questions(difficulty, topic, questions)
+            with self._lock:
+                self.generated += inserted
+            added += inserted
+            if inserted == 0:
+                # Only duplicates came back; try again on the next pass.
+                break
+        return added
+
+    def request_refill(self, difficulty: str, topic: str = ''):
+        """Ask the background worker to top up a bucket."""
+        self._requests.put((difficulty, topic))
+
+    def start(self):
+        """Start the background refill worker (idempotent)."""
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._stop_event.clear()
+            self._worker = threading.Thread(target=self._run, name="question-bank-refill", daemon=True)
+            self._worker.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._requests.put(None)
+
+    def _run(self):
+        # Fill every bucket once at start-up, then serve refill requests and
+        # sweep all buckets periodically.
+        pending = set(self.buckets())
+        while not self._stop_event.is_set():
+            for difficulty, topic in sorted(pending):
+                if self._stop_event.is_set():
+                    return
+                try:
+                    self.refill(difficulty, topic)
+                except Exception:
+                    with self._lock:
+                        self.refill_errors += 1
+            pending = set()
+
+            try:
+                bucket = self._requests.get(timeout=self.refill_interval)
+            except queue.Empty:
+                pending = set(self.buckets())
+                continue
+            if bucket is not None:
+                pending.add(bucket)
+            # Coalesce any other requests that queued up meanwhile
+            while True:
+                try:
+                    bucket = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if bucket is not None:
+                    pending.add(bucket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return bank hit/fallback counters and bucket fill levels."""
+        with self._lock:
+            stats = {
+                'bank_hits': self.bank_hits,
+                'live_fallbacks': self.live_fallbacks,
+                'generated': self.generated,
+                'refill_errors': self.refill_errors,
+            }
+        stats['buckets'] = {
+            f"{difficulty}/{topic or 'general'}": self.db.count_bank_questions(difficulty, topic)
+            for difficulty, topic in self.buckets()
+        }
+        return stats
@@ -0,0 +1,207 @@
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from config import Config
+from utils.metrics import REGISTRY
+
+# Request priorities; lower values are served first.
+INTERACTIVE = 0  # a user is waiting on the result (question generation, CV analysis)
+BATCH = 1        # background grading and other bulk work
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BATCH: 'batch'}
+
+
+QUEUE_DEPTH = REGISTRY.gauge('openai_scheduler_queue_depth',
+                             'Requests waiting for rate-limit capacity.', ('priority',))
+SCHEDULER_WAITS = REGISTRY.histogram('openai_scheduler_wait_seconds',
+                                     'Time requests waited for rate-limit capacity.', ('priority',))
+SCHEDULER_TIMEOUTS = REGISTRY.counter('openai_scheduler_timeouts_total',
+                                      'Requests that gave up waiting for capacity.', ('priority',))
+
+
+class SchedulerTimeoutError(Exception):
+    """Raised when a request waited longer than allowed for rate-limit capacity."""
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` units per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.available = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self.available = min(self.capacity, self.available + elapsed * self.rate)
+            self._updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available (0 if they are now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def consume(self, amount: float):
+        # Requests larger than the bucket are let through when it is full
+        # and leave it in debt instead of blocking forever.
+        self.available -= amount
+
+    def refund(self, amount: float):
+        self.available = min(self.capacity, self.available + amount)
+
+
+class Ticket:
+    """A granted request slot; set ``actual_tokens`` once usage is known."""
+
+    def __init__(self, priority: int, estimated_tokens: int, waited: float):
+        self.priority = priority
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens = None
+        self.waited = waited
+
+
+class RequestScheduler:
+    """Shared client-side rate limiter for all OpenAI traffic.
+
+    Requests wait in a priority queue until both the requests-per-minute and
+    the tokens-per-minute buckets have capacity, so bursts queue up instead
+    of failing on provider rate limits. Interactive requests always go ahead
+    of batch work. ``burst_seconds`` sets how much unused capacity may be
+    saved up (a full minute's worth by default).
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float,
+                 max_wait: Optional[float] = None, burst_seconds: float = 60.0):
+        self.requests = TokenBucket(requests_per_minute * burst_seconds / 60.0,
+                                    requests_per_minute / 60.0)
+        self.tokens = TokenBucket(tokens_per_minute * burst_seconds / 60.0,
+                                  tokens_per_minute / 60.0)
+        self.max_wait = max_wait
+        self._condition = threading.Condition()
+        self._queue = []
+        self._sequence = itertools.count()
+        self._stats = {
+            name: {'granted': 0, 'timeouts': 0, 'total_wait': 0.0, 'max_wait': 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self._max_queue_depth = 0
+
+    @classmethod
+    def shared(cls) -> 'RequestScheduler':
+        """Return the process-wide scheduler configured from Config."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(
+                    Config.OPENAI_REQUESTS_PER_MINUTE,
+                    Config.OPENAI_TOKENS_PER_MINUTE,
+                    Config.OPENAI_SCHEDULER_MAX_WAIT
+                )
+            return cls._shared
+
+    def acquire(self, estimated_tokens: int, priority: int = INTERACTIVE,
+                timeout: Optional[float] = None) -> Ticket:
+        """Block until the request may be sent and return its ticket.
+
+        Raises:
+            SchedulerTimeoutError: if no capacity became available within
+                ``timeout`` (or the scheduler's ``max_wait``).
+        """
+        timeout = self.max_wait if timeout is None else timeout
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        entry = (priority, next(self._sequence))
+        name = PRIORITY_NAMES[priority]
+        stats = self._stats[name]
+
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            QUEUE_DEPTH.inc(priority=name)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._queue))
+            while True:
+                now = time.monotonic()
+                if self._queue[0] == entry:
+                    delay = max(self.requests.wait_time(1, now),
+                                self.tokens.wait_time(estimated_tokens, now))
+                    if delay == 0:
+                        heapq.heappop(self._queue)
+                        QUEUE_DEPTH.dec(priority=name)
+                        self.requests.consume(1)
+                        self.tokens.consume(estimated_tokens)
+                        self._condition.notify_all()
+                        break
+                else:
+                    delay = None
+                if deadline is not None:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._queue.remove(entry)
+                        heapq.heapify(self._queue)
+                        QUEUE_DEPTH.dec(priority=name)
+                        stats['timeouts'] += 1
+                        SCHEDULER_TIMEOUTS.inc(priority=name)
+                        self._condition.notify_all()
+                        raise SchedulerTimeoutError(
+                            f"Waited more than {timeout}s for OpenAI rate-limit capacity"
+                        )
+                    delay = remaining if delay is None else min(delay, remaining)
+                self._condition.wait(delay)
+
+            waited = time.monotonic() - started
+            stats['granted'] += 1
+            stats['total_wait'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+        SCHEDULER_WAITS.observe(waited, priority=name)
+        return Ticket(priority, estimated_tokens, waited)
+
+    def settle(self, ticket: Ticket):
+        """Correct the token bucket once a request's real token usage is known."""
+        if ticket.actual_tokens is None:
+            return
+        difference = ticket.estimated_tokens - ticket.actual_tokens
+        with self._condition:
+            if difference > 0:
+                self.tokens.refund(difference)
+                self._condition.notify_all()
+            elif difference < 0:
+                self.tokens.consume(-difference)
+
+    @contextmanager
+    def slot(self, estimated_tokens: int, priority: int = INTERACTIVE,
+             timeout: Optional[float] = None):
+        """Context manager around :meth:`acquire` and :meth:`settle`."""
+        ticket = self.acquire(estimated_tokens, priority, timeout)
+        try:
+            yield ticket
+        finally:
+            self.settle(ticket)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, wait times and bucket levels."""
+        with self._condition:
+            now = time.monotonic()
+            self.requests._refill(now)
+            self.tokens._refill(now)
+            by_priority = {}
+            for name, stats in self._stats.items():
+                by_priority[name] = dict(stats)
+                by_priority[name]['avg_wait'] = (
+                    stats['total_wait'] / stats['granted'] if stats['granted'] else 0.0
+                )
+            return {
+                'queue_depth': len(self._queue),
+                'max_queue_depth': self._max_queue_depth,
+                'available_requests': self.requests.available,
+                'available_tokens': self.tokens.available,
+                'priorities': by_priority,
+            }
@@ -0,0 +1,329 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+import openai
+
+from config import Config
+from services.request_scheduler import SchedulerTimeoutError
+from utils.metrics import REGISTRY
+
+# HTTP statuses worth retrying: timeouts, conflicts, rate limits, server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+BREAKER_STATES = REGISTRY.collector(
+    'openai_circuit_breakers', 'Circuit breakers in each state.', ('state',),
+    lambda breaker: {(state,): float(breaker.state == state) for state in CircuitBreaker.STATES}
+)
+BREAKER_OPENED = REGISTRY.counter('openai_circuit_breaker_opened_total',
+                                  'Times a circuit breaker opened.')
+BREAKER_REJECTED = REGISTRY.counter('openai_circuit_breaker_rejected_total',
+                                    'Calls rejected by an open circuit breaker.')
+
+
+class OpenAIServiceError(Exception):
+    """A completion request failed; ``retryable`` tells whether trying again may help."""
+
+    def __init__(self, message: str, retryable: bool = False, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class UpstreamUnavailableError(OpenAIServiceError):
+    """Raised without calling the API while the circuit breaker is open."""
+
+
+class DeadlineExceededError(OpenAIServiceError):
+    """The call did not finish before its deadline."""
+
+
+def classify_error(error: Exception) -> OpenAIServiceError:
+    """Wrap an exception from the OpenAI client as an OpenAIServiceError."""
+    if isinstance(error, OpenAIServiceError):
+        return error
+    message = f"OpenAI API error: {error}"
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+        return OpenAIServiceError(message, retryable=True)
+    if isinstance(error, openai.APIStatusError):
+        retry_after = None
+        try:
+            retry_after = float(error.response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+        return OpenAIServiceError(
+            message, retryable=error.status_code in RETRYABLE_STATUS_CODES, retry_after=retry_after
+        )
+    if isinstance(error, SchedulerTimeoutError):
+        # Already waited for capacity; retrying would only queue again
+        return OpenAIServiceError(message, retryable=False)
+    # Bad requests, auth errors, malformed responses
+    return OpenAIServiceError(message, retryable=False)
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def counts_against_upstream(error: OpenAIServiceError) -> bool:
+    """Whether a failure says something about upstream health."""
+    return error.retryable or isinstance(error, DeadlineExceededError)
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedging delay."""
+
+    def __init__(self, window: int = 200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    rejects calls for ``recovery_timeout`` seconds. It then lets a single
+    trial call through (half-open); success closes it again, failure
+    re-opens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    STATES = (CLOSED, OPEN, HALF_OPEN)
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+        BREAKER_STATES.add(self)
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    BREAKER_REJECTED.inc()
+                    return False
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    self.rejected += 1
+                    BREAKER_REJECTED.inc()
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.opened += 1
+                    BREAKER_OPENED.inc()
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def record_ignored(self):
+        """A call finished without telling anything about upstream health."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self._failures,
+                'opened': self.opened,
+                'rejected': self.rejected,
+            }
+
+
+class ResiliencePolicy:
+    """Retries, deadlines, hedging and circuit breaking for completion calls.
+
+    ``call`` runs ``attempt(timeout)`` until it succeeds, fails with a
+    non-retryable error, runs out of retries or hits the deadline. Retries
+    back off exponentially with full jitter (or honour Retry-After). With
+    hedging enabled, an attempt still running after the observed p95
+    latency gets a duplicate request and the first answer wins.
+    """
+
+    def __init__(self, max_retries: Optional[int] = None,
+                 base_delay: Optional[float] = None,
+                 max_delay: Optional[float] = None,
+                 deadline: Optional[float] = None,
+                 hedge: Optional[bool] = None,
+                 hedge_percentile: float = 0.95,
+                 hedge_min_samples: int = 20,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.max_retries = Config.OPENAI_MAX_RETRIES if max_retries is None else max_retries
+        self.base_delay = base_delay or Config.OPENAI_RETRY_BASE_DELAY
+        self.max_delay = max_delay or Config.OPENAI_RETRY_MAX_DELAY
+        self.deadline = deadline or Config.OPENAI_REQUEST_TIMEOUT
+        self.hedge = Config.OPENAI_HEDGE_REQUESTS if hedge is None else hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker(
+            Config.OPENAI_BREAKER_FAILURE_THRESHOLD, Config.OPENAI_BREAKER_RECOVERY_TIME
+        )
+        self.latency = LatencyTracker()
+        self._executor = None
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before sending a duplicate request, or None."""
+        if not self.hedge or len(self.latency) < self.hedge_min_samples:
+            return None
+        return self.latency.percentile(self.hedge_percentile)
+
+    def _retry_delay(self, error: OpenAIServiceError, retry: int) -> float:
+        if error.retry_after is not None:
+            return min(error.retry_after, self.max_delay)
+        return backoff_delay(retry, self.base_delay, self.max_delay)
+
+    def _finish(self, error: Optional[OpenAIServiceError]):
+        if error is None:
+            self.breaker.record_success()
+        elif counts_against_upstream(error):
+            self.breaker.record_failure()
+            self._count('failures')
+        else:
+            self.breaker.record_ignored()
+            self._count('failures')
+
+    def call(self, attempt: Callable[[float], Any], deadline: Optional[float] = None,
+             hedge: bool = True) -> Any:
+        """Run ``attempt(timeout)`` with retries, hedging and the circuit breaker.
+
+        Raises:
+            UpstreamUnavailableError: if the breaker is open.
+            DeadlineExceededError: if no attempt succeeded within ``deadline``.
+            OpenAIServiceError: for non-retryable failures or exhausted retries.
+        """
+        if not self.breaker.allow_request():
+            raise UpstreamUnavailableError("OpenAI API is unavailable, try again shortly")
+        self._count('calls')
+        deadline_at = time.monotonic() + (deadline or self.deadline)
+        retry = 0
+        while True:
+            remaining = deadline_at - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise DeadlineExceededError(f"No response within {deadline or self.deadline}s")
+                result = self._attempt(attempt, remaining, hedge)
+                self._finish(None)
+                return result
+            except Exception as e:
+                error = classify_error(e)
+                if isinstance(error, DeadlineExceededError) or not error.retryable \
+                        or retry >= self.max_retries:
+                    self._finish(error)
+                    raise error from e
+                delay = self._retry_delay(error, retry)
+                if time.monotonic() + delay >= deadline_at:
+                    self._finish(error)
+                    raise error from e
+                retry += 1
+                self._count('retries')
+                time.sleep(delay)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="openai-hedge")
+            return self._executor
+
+    def _attempt(self, attempt: Callable[[float], Any], timeout: float, hedge: bool) -> Any:
+        hedge_after = self.hedge_delay() if hedge else None
+        started = time.monotonic()
+        if hedge_after is None or hedge_after >= timeout:
+            result = attempt(timeout)
+            self.latency.record(time.monotonic() - started)
+            return result
+
+        executor = self._get_executor()
+        primary = executor.submit(attempt, timeout)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done:
+            result = primary.result()
+            self.latency.record(time.monotonic() - started)
+            return result
+
+        self._count('hedges')
+        backup = executor.submit(attempt, max(0.0, timeout - hedge_after))
+        pending = {primary, backup}
+        error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, started + timeout - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                if future.exception() is None:
+                    if future is backup:
+                        self._count('hedge_wins')
+                    # The losing request cannot be cancelled mid-flight; its
+                    # result is simply discarded.
+                    self.latency.record(time.monotonic() - started)
+                    return future.result()
+                error = future.exception()
+        if error is not None:
+            raise error
+        raise DeadlineExceededError(f"No response within {timeout:.1f}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return retry/hedge counters, latency percentiles and breaker state."""
+        with self._lock:
+            stats = {
+                'calls': self.calls,
+                'retries': self.retries,
+                'hedges': self.hedges,
+                'hedge_wins': self.hedge_wins,
+                'failures': self.failures,
+            }
+        stats['p50_latency'] = self.latency.percentile(0.5)
+        stats['p95_latency'] = self.latency.percentile(0.95)
+        stats['breaker'] = self.breaker.stats()
+        return stats
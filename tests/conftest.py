@@ -0,0 +1,16 @@
+import pytest
+
+from database.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def db(tmp_path):
+    """A DatabaseManager on a fresh database file, closed after the test."""
+    manager = DatabaseManager(str(tmp_path / 'test.db'))
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def user_id(db):
+    return db.create_user('candidate', 'candidate@example.com', 'hash')
@@ -0,0 +1,88 @@
+import pytest
+
+from services.answer_buffer import AnswerBuffer
+
+
+@pytest.fixture
+def questions(db, user_id):
+    """Two interviews with two questions each: {interview_id: [question_id, ...]}."""
+    interviews = {}
+    for _ in range(2):
+        interview_id = db.create_interview(user_id, None, None, 2, 'medium')
+        interviews[interview_id] = [db.add_question(interview_id, f"Question {i}?", i)
+                                    for i in (1, 2)]
+    return interviews
+
+
+def stored(db, interview_id):
+    return [q['answer_text'] for q in db.get_interview_questions(interview_id)]
+
+
+def test_answers_wait_in_memory_until_flushed(db, questions):
+    buffer = AnswerBuffer(db, max_pending=100)
+    interview_id, (first, second) = next(iter(questions.items()))
+    buffer.put(first, "Draft", interview_id)
+    buffer.put(first, "Final", interview_id)
+    buffer.put(second, "Second", interview_id)
+    assert buffer.pending(first) == "Final"
+    assert stored(db, interview_id) == [None, None]
+
+    assert buffer.flush() == 2
+    assert stored(db, interview_id) == ["Final", "Second"]
+    stats = buffer.stats()
+    assert stats['coalesced'] == 1
+    assert stats['flushes'] == 1
+    assert stats['pending'] == 0
+
+
+def test_flush_interview_writes_only_that_interview(db, questions):
+    buffer = AnswerBuffer(db, max_pending=100)
+    (one, one_ids), (other, other_ids) = questions.items()
+    for question_id in one_ids:
+        buffer.put(question_id, "One", one)
+    for question_id in other_ids:
+        buffer.put(question_id, "Other", other)
+
+    assert buffer.flush_interview(one) == 2
+    assert stored(db, one) == ["One", "One"]
+    assert stored(db, other) == [None, None]
+    assert buffer.flush_interview(one) == 0
+    assert buffer.stats()['pending'] == 2
+
+
+def test_full_buffer_flushes_on_put(db, questions):
+    buffer = AnswerBuffer(db, max_pending=2)
+    interview_id, (first, second) = next(iter(questions.items()))
+    buffer.put(first, "First", interview_id)
+    assert stored(db, interview_id) == [None, None]
+    buffer.put(second, "Second", interview_id)
+    assert stored(db, interview_id) == ["First", "Second"]
+
+
+def test_failed_flush_keeps_the_answers(db, questions, monkeypatch):
+    buffer = AnswerBuffer(db, max_pending=100)
+    interview_id, (first, _) = next(iter(questions.items()))
+    buffer.put(first, "Kept", interview_id)
+
+    def fail(updates):
+        list(updates)
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(db, 'update_question_answers', fail)
+    with pytest.raises(RuntimeError):
+        buffer.flush_interview(interview_id)
+    assert buffer.pending(first) == "Kept"
+    assert buffer.stats()['failed_flushes'] == 1
+
+    monkeypatch.undo()
+    assert buffer.flush_interview(interview_id) == 1
+    assert stored(db, interview_id)[0] == "Kept"
+
+
+def test_background_flusher_and_close_write_everything(db, questions):
+    buffer = AnswerBuffer(db, flush_interval=0.05)
+    buffer.start()
+    interview_id, (first, second) = next(iter(questions.items()))
+    buffer.put(first, "First", interview_id)
+    buffer.put(second, "Second", interview_id)
+    buffer.close(timeout=5)
+    assert stored(db, interview_id) == ["First", "Second"]
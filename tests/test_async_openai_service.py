@@ -0,0 +1,110 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from services.async_openai_service import AsyncOpenAIService
+from services.openai_service import OpenAIService
+from services.request_scheduler import RequestScheduler
+from services.resilience import ResiliencePolicy
+
+LATENCY = 0.3
+
+
+@pytest.fixture
+def server():
+    server = FakeOpenAIServer(latency=LATENCY).start()
+    yield server
+    server.shutdown()
+
+
+def make_service(server, max_concurrency=5):
+    service = OpenAIService(api_key='test', base_url=server.base_url,
+                            scheduler=RequestScheduler(10_000, 10_000_000),
+                            resilience=ResiliencePolicy(max_retries=0, hedge=False))
+    return AsyncOpenAIService(service, max_concurrency=max_concurrency, timeout=10)
+
+
+def transcript(n):
+    return [{'question': f"Question {i}?", 'answer': f"Answer {i}."} for i in range(n)]
+
+
+def test_concurrent_grading_takes_about_as_long_as_the_slowest_call(server):
+    service = make_service(server)
+    started = time.perf_counter()
+    results = service.evaluate_answers(transcript(5))
+    elapsed = time.perf_counter() - started
+    assert all(result['success'] for result in results)
+    assert server.requests == 5
+    # Sequential grading would take 5 * LATENCY
+    assert elapsed < 2 * LATENCY
+
+
+def test_max_concurrency_bounds_requests_in_flight(server):
+    service = make_service(server, max_concurrency=2)
+    started = time.perf_counter()
+    service.evaluate_answers(transcript(4))
+    elapsed = time.perf_counter() - started
+    assert 2 * LATENCY <= elapsed < 3 * LATENCY
+
+
+def test_results_keep_the_transcript_order(server):
+    service = make_service(server)
+    questions = transcript(6)
+    results = service.evaluate_answers(questions)
+    # The fake server's reply depends only on the prompt
+    expected = [service.service.evaluate_answer(qa['question'], qa['answer'])['score']
+                for qa in questions]
+    assert [result['score'] for result in results] == expected
+    assert len(set(expected)) > 1
+
+
+def test_failed_call_is_reported_not_raised():
+    # Nothing listens on this port
+    service = OpenAIService(api_key='test', base_url='http://127.0.0.1:9/v1',
+                            scheduler=RequestScheduler(10_000, 10_000_000),
+                            resilience=ResiliencePolicy(max_retries=0, hedge=False))
+    results = AsyncOpenAIService(service, timeout=2).evaluate_answers(transcript(2))
+    assert [result['success'] for result in results] == [False, False]
+    assert all(result['score'] is None for result in results)
+
+
+class SlowStream:
+    """Stands in for OpenAIService: its stream blocks between chunks."""
+
+    def __init__(self):
+        self.closed = threading.Event()
+
+    def stream_completion(self, prompt, **kwargs):
+        try:
+            yield "first"
+            time.sleep(LATENCY)
+            yield "second"
+        finally:
+            self.closed.set()
+
+
+def test_cancelled_stream_is_closed_once_the_worker_is_done():
+    service = SlowStream()
+    streamer = AsyncOpenAIService(service, max_concurrency=1, timeout=10)
+    received = []
+
+    async def consume():
+        async for chunk in streamer.stream_completion("prompt"):
+            received.append(chunk)
+
+    async def main():
+        task = asyncio.create_task(consume())
+        while not received:
+            await asyncio.sleep(0.01)
+        # The worker thread is now blocked inside next() on the stream
+        await asyncio.sleep(LATENCY / 3)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+    assert received == ["first"]
+    assert service.closed.wait(5)
@@ -0,0 +1,88 @@
+import hashlib
+
+import pytest
+
+from services.auth_service import AuthService, hash_rounds, is_legacy_hash
+
+PASSWORD = "correct horse"
+
+
+@pytest.fixture
+def auth(db):
+    # The lowest cost bcrypt allows, to keep the tests fast
+    return AuthService(db, rounds=4)
+
+
+def legacy_hash(password, salt='f00d'):
+    return f"{salt}${hashlib.sha256((password + salt).encode()).hexdigest()}"
+
+
+def stored_hash(db, username='candidate'):
+    return db.get_user_by_username(username)['password_hash']
+
+
+def test_bcrypt_hash_verifies(auth):
+    hashed = auth.hash_password(PASSWORD)
+    assert hashed.startswith('$2') and hash_rounds(hashed) == 4
+    assert auth.verify_password(PASSWORD, hashed)
+    assert not auth.verify_password("wrong password", hashed)
+
+
+def test_long_passwords_are_cut_to_what_bcrypt_reads(auth):
+    hashed = auth.hash_password("x" * 100)
+    assert auth.verify_password("x" * 72 + "ignored", hashed)
+
+
+def test_malformed_hash_does_not_verify(auth):
+    assert not auth.verify_password(PASSWORD, "$2b$04$not-a-real-hash")
+    assert not auth.verify_password(PASSWORD, "no-separator")
+
+
+def test_register_and_login(auth, db):
+    assert auth.register_user('candidate', 'candidate@example.com', PASSWORD)[0]
+    success, user, _ = auth.login_user('candidate', PASSWORD)
+    assert success
+    assert user['username'] == 'candidate' and 'password_hash' not in user
+    assert auth.rehashed == 0
+
+
+def test_wrong_password_and_unknown_user_are_rejected(auth, db):
+    auth.register_user('candidate', 'candidate@example.com', PASSWORD)
+    hashed = stored_hash(db)
+    assert auth.login_user('candidate', "wrong password") == (
+        False, None, "Invalid username or password")
+    assert auth.login_user('nobody', PASSWORD) == (
+        False, None, "Invalid username or password")
+    # A failed login never rewrites the stored hash
+    assert stored_hash(db) == hashed
+
+
+def test_legacy_hash_is_upgraded_on_login(auth, db):
+    db.create_user('candidate', 'candidate@example.com', legacy_hash(PASSWORD))
+    assert is_legacy_hash(stored_hash(db))
+    assert auth.login_user('candidate', PASSWORD)[0]
+    upgraded = stored_hash(db)
+    assert not is_legacy_hash(upgraded) and hash_rounds(upgraded) == 4
+    assert auth.rehashed == 1
+    # The upgraded hash keeps working and is not rehashed again
+    assert auth.login_user('candidate', PASSWORD)[0]
+    assert stored_hash(db) == upgraded and auth.rehashed == 1
+
+
+def test_legacy_hash_with_wrong_password(auth, db):
+    db.create_user('candidate', 'candidate@example.com', legacy_hash(PASSWORD))
+    assert not auth.login_user('candidate', "wrong password")[0]
+    assert is_legacy_hash(stored_hash(db))
+    assert auth.rehashed == 0
+
+
+def test_rehash_when_the_cost_changes(auth, db):
+    auth.register_user('candidate', 'candidate@example.com', PASSWORD)
+    stronger = AuthService(db, rounds=5)
+    assert stronger.needs_rehash(stored_hash(db))
+    assert stronger.login_user('candidate', PASSWORD)[0]
+    assert hash_rounds(stored_hash(db)) == 5 and stronger.rehashed == 1
+    assert not stronger.needs_rehash(stored_hash(db))
+    # Logging in at the old cost again moves the hash back
+    assert auth.login_user('candidate', PASSWORD)[0]
+    assert hash_rounds(stored_hash(db)) == 4
@@ -0,0 +1,119 @@
+import json
+import re
+
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from services.openai_service import OpenAIService
+from services.request_scheduler import RequestScheduler
+from services.resilience import ResiliencePolicy
+from utils.tokens import count_tokens
+
+
+def transcript(n, words=1):
+    return [{'question': f"Question {i}? " + "detail " * words,
+             'answer': f"Answer {i}. " + "word " * words} for i in range(n)]
+
+
+def qa_tokens(qa):
+    return count_tokens(qa['question']) + count_tokens(qa['answer']) + 8
+
+
+def chunk_reply(body):
+    """Grade each question with its number; chunks starting at Q1 score 60, later ones 90."""
+    prompt = body['messages'][-1]['content']
+    indices = [int(n) for n in re.findall(r'^Q(\d+):', prompt, re.M)]
+    return json.dumps({
+        'answers': [{'index': i, 'score': i, 'feedback': f"Answer {i} feedback"} for i in indices],
+        'overall_score': 60 if indices[0] == 1 else 90,
+        'summary': f"Chunk from Q{indices[0]}",
+    })
+
+
+@pytest.fixture
+def server():
+    server = FakeOpenAIServer(reply=chunk_reply).start()
+    yield server
+    server.shutdown()
+
+
+def make_service(server):
+    return OpenAIService(api_key='test', base_url=server.base_url,
+                         scheduler=RequestScheduler(10_000, 10_000_000),
+                         resilience=ResiliencePolicy(max_retries=0, hedge=False))
+
+
+def test_chunks_stay_within_the_budget():
+    qas = transcript(10, words=20)
+    budget = 3 * qa_tokens(qas[0])
+    chunks = OpenAIService.chunk_transcript(qas, budget)
+    assert [qa for chunk in chunks for qa in chunk] == qas
+    assert [len(chunk) for chunk in chunks] == [3, 3, 3, 1]
+    assert all(sum(qa_tokens(qa) for qa in chunk) <= budget for chunk in chunks)
+
+
+def test_transcript_within_the_budget_is_one_chunk():
+    qas = transcript(5)
+    assert OpenAIService.chunk_transcript(qas, 10_000) == [qas]
+
+
+def test_oversized_answer_gets_its_own_chunk():
+    qas = transcript(3)
+    qas[1]['answer'] = "word " * 500
+    chunks = OpenAIService.chunk_transcript(qas, 100)
+    assert chunks == [[qas[0]], [qas[1]], [qas[2]]]
+
+
+def test_single_chunk_is_graded_in_one_call(server):
+    result = make_service(server).evaluate_interview_batch(transcript(4), context_budget=10_000)
+    assert result['success']
+    assert result['calls'] == 1 and server.requests == 1
+    assert [a['score'] for a in result['answers']] == [1, 2, 3, 4]
+    assert result['overall_score'] == 60
+
+
+def test_chunk_results_are_merged(server):
+    qas = transcript(4, words=20)
+    result = make_service(server).evaluate_interview_batch(
+        qas, context_budget=3 * qa_tokens(qas[0]))
+    assert result['success']
+    assert result['calls'] == 2 and server.requests == 2
+    # Answers keep their interview-wide numbering across chunks
+    assert [a['score'] for a in result['answers']] == [1, 2, 3, 4]
+    assert [a['feedback'] for a in result['answers']] == [f"Answer {i} feedback" for i in range(1, 5)]
+    # Chunk scores are weighted by their question count: (60 * 3 + 90 * 1) / 4
+    assert result['overall_score'] == pytest.approx(67.5)
+    assert result['summary'] == "Chunk from Q1\n\nChunk from Q4"
+    assert result['feedback'] == result['summary']
+
+
+def test_merged_result_is_rendered(server):
+    qas = transcript(4, words=20)
+    result = make_service(server).evaluate_interview_batch(
+        qas, context_budget=3 * qa_tokens(qas[0]))
+    text = result['evaluation_text']
+    assert text.startswith("Overall Score: 68/100")
+    assert "Summary:\nChunk from Q1\n\nChunk from Q4" in text
+    assert f"Q4: {qas[3]['question']}\nScore: 4.0/10\nAnswer 4 feedback" in text
+    assert "Strengths:" not in text
+
+
+def test_render_marks_ungraded_answers():
+    qas = transcript(2)
+    result = {'overall_score': 70, 'summary': '', 'answers': [
+        {'score': 6, 'strengths': '', 'improvements': '', 'feedback': ''},
+        {'score': None, 'strengths': '', 'improvements': '', 'feedback': ''},
+    ]}
+    text = OpenAIService.render_batch_evaluation(result, qas)
+    assert "Score: 6.0/10" in text
+    assert f"Q2: {qas[1]['question']}\nScore: not graded" in text
+
+
+def test_unusable_response_fails_the_evaluation():
+    server = FakeOpenAIServer(reply='{"answers": [').start()
+    try:
+        result = make_service(server).evaluate_interview_batch(transcript(2))
+    finally:
+        server.shutdown()
+    assert not result['success']
+    assert result['answers'] == []
@@ -0,0 +1,120 @@
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from services.completion_cache import (
+    CompletionCache, MemoryCompletionCache, SQLiteCompletionCache, TieredCompletionCache,
+    make_cache_key
+)
+from services.openai_service import OpenAIService
+from services.request_scheduler import RequestScheduler
+from services.resilience import ResiliencePolicy
+
+
+def test_cache_key_covers_every_input():
+    key = make_cache_key('model', 'system', 'prompt', 100, 0.7)
+    assert key == make_cache_key('model', 'system', 'prompt', 100, 0.7)
+    assert key != make_cache_key('model', 'system', 'prompt', 100, 0.2)
+    assert key != make_cache_key('model', 'system', 'other prompt', 100, 0.7)
+    assert key != make_cache_key('model', 'system', 'prompt', 100, 0.7, {'type': 'json_object'})
+
+
+def test_interface_cannot_be_instantiated():
+    with pytest.raises(TypeError):
+        CompletionCache()
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCompletionCache(max_entries=2)
+    cache.set('a', 'A')
+    cache.set('b', 'B')
+    assert cache.get('a') == 'A'
+    cache.set('c', 'C')
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+    assert cache.stats() == {'hits': 3, 'misses': 1, 'evictions': 1, 'entries': 2}
+
+
+def test_memory_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.completion_cache.time.time', lambda: now[0])
+    cache = MemoryCompletionCache(ttl=10)
+    cache.set('a', 'A')
+    now[0] += 9
+    assert cache.get('a') == 'A'
+    now[0] += 2
+    assert cache.get('a') is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_sqlite_cache_persists_and_expires(db, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.completion_cache.time.time', lambda: now[0])
+    SQLiteCompletionCache(db, ttl=10).set('a', 'A')
+    cache = SQLiteCompletionCache(db, ttl=10)
+    assert cache.get('a') == 'A'
+    now[0] += 11
+    assert cache.get('a') is None
+    assert db.get_cached_completion('a') is None
+
+
+def test_tiered_cache_promotes_with_the_remaining_ttl(db, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.completion_cache.time.time', lambda: now[0])
+    SQLiteCompletionCache(db, ttl=10).set('a', 'A')
+    now[0] += 5
+    memory = MemoryCompletionCache(ttl=10)
+    cache = TieredCompletionCache(memory, SQLiteCompletionCache(db, ttl=10))
+    assert cache.get('a') == 'A'
+    assert memory.get('a') == 'A'
+    # Promoted entries keep the persistent expiry, not a fresh TTL
+    now[0] += 6
+    assert memory.get('a') is None
+    assert cache.get('a') is None
+
+
+def cached_keys(db):
+    with db.connection() as conn:
+        return {row[0] for row in conn.execute('SELECT cache_key FROM completion_cache')}
+
+
+def test_sqlite_cache_purges_expired_rows_on_a_schedule(db, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.completion_cache.time.time', lambda: now[0])
+    cache = SQLiteCompletionCache(db, ttl=10, purge_interval=100)
+    cache.set('a', 'A')
+    now[0] += 50
+    cache.set('b', 'B')
+    # 'a' has expired, but the next purge is not due yet
+    assert cached_keys(db) == {'a', 'b'}
+    now[0] += 60
+    cache.set('c', 'C')
+    assert cached_keys(db) == {'c'}
+    assert cache.stats()['evictions'] == 2
+
+
+def test_sqlite_cache_keeps_the_newest_rows_up_to_its_cap(db, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('services.completion_cache.time.time', lambda: now[0])
+    cache = SQLiteCompletionCache(db, max_rows=3, purge_interval=0)
+    for key in 'abcde':
+        now[0] += 1
+        cache.set(key, key.upper())
+    assert cached_keys(db) == {'c', 'd', 'e'}
+
+
+def test_fresh_responses_are_not_stored():
+    server = FakeOpenAIServer().start()
+    try:
+        cache = MemoryCompletionCache()
+        service = OpenAIService(api_key='test', base_url=server.base_url, cache=cache,
+                                scheduler=RequestScheduler(10_000, 10_000_000),
+                                resilience=ResiliencePolicy(max_retries=0, hedge=False))
+        service.generate_completion("Ask me something new", use_cache=False)
+        assert cache.stats()['entries'] == 0
+        service.generate_completion("Ask me the usual")
+        service.generate_completion("Ask me the usual")
+    finally:
+        server.shutdown()
+    assert cache.stats()['entries'] == 1
+    assert server.requests == 2
@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+
+import pytest
+
+from database.connection_pool import ConnectionPool, PoolTimeoutError
+from database.db_manager import DatabaseManager
+
+
+def make_pool(tmp_path, size=2, timeout=0.2):
+    path = str(tmp_path / 'pool.db')
+    return ConnectionPool(path, lambda: sqlite3.connect(path, check_same_thread=False),
+                          size=size, timeout=timeout)
+
+
+def test_connections_are_reused(tmp_path):
+    pool = make_pool(tmp_path)
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        pass
+    assert first is second
+    assert pool.stats()['connections'] == 1
+    assert pool.stats()['checkouts'] == 2
+
+
+def test_never_creates_more_than_size_and_times_out(tmp_path):
+    pool = make_pool(tmp_path, size=2)
+    with pool.connection(), pool.connection():
+        with pytest.raises(PoolTimeoutError):
+            with pool.connection():
+                pass
+    stats = pool.stats()
+    assert stats['connections'] == 2
+    assert stats['in_use'] == 0
+    assert stats['waits'] == 1
+
+
+def test_waiter_gets_released_connection(tmp_path):
+    pool = make_pool(tmp_path, size=1, timeout=5)
+    got = []
+    with pool.connection() as held:
+        waiter = threading.Thread(target=lambda: got.append(pool._acquire()))
+        waiter.start()
+        waiter.join(0.1)
+        assert not got
+    waiter.join(5)
+    assert got == [held]
+    pool._release(got[0])
+
+
+def test_open_transaction_is_rolled_back_on_release(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+    with pool.connection() as conn:
+        conn.execute('CREATE TABLE t (x)')
+        conn.commit()
+    with pytest.raises(RuntimeError):
+        with pool.connection() as conn:
+            conn.execute('INSERT INTO t VALUES (1)')
+            raise RuntimeError
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+
+def test_broken_connection_is_replaced(tmp_path):
+    pool = make_pool(tmp_path, size=1)
+    with pool.connection() as conn:
+        pass
+    conn.close()
+    with pool.connection() as replacement:
+        assert replacement is not conn
+        replacement.execute('SELECT 1')
+    assert pool.stats()['replaced'] == 1
+
+
+def test_for_path_shares_per_path_and_profile(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    connect = lambda: sqlite3.connect(path, check_same_thread=False)
+    first = ConnectionPool.for_path(path, connect, size=2, profile='concurrent')
+    second = ConnectionPool.for_path(path, connect, size=4, profile='concurrent')
+    other = ConnectionPool.for_path(path, connect, profile='durable')
+    try:
+        assert first is second
+        assert first.size == 4
+        assert other is not first
+    finally:
+        assert first.release() is False
+        assert second.release() is True
+        other.release()
+
+
+def test_closing_one_manager_leaves_others_working(tmp_path):
+    path = str(tmp_path / 'app.db')
+    first = DatabaseManager(path)
+    second = DatabaseManager(path)
+    assert first.pool is second.pool
+    first.close()
+    first.close()
+    assert second.create_user('still', 'still@example.com', 'hash')
+    second.close()
+    with pytest.raises(PoolTimeoutError):
+        with second.connection():
+            pass
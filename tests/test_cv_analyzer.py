@@ -0,0 +1,88 @@
+import hashlib
+import random
+
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.synthetic import synthetic_cv_text, text_pdf
+from services.cv_analyzer import CVAnalyzer
+from services.openai_service import OpenAIService
+from services.request_scheduler import RequestScheduler
+from services.resilience import ResiliencePolicy
+
+
+@pytest.fixture
+def server():
+    server = FakeOpenAIServer().start()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def analyzer(db, server):
+    service = OpenAIService(api_key='test', base_url=server.base_url,
+                            scheduler=RequestScheduler(10_000, 10_000_000),
+                            resilience=ResiliencePolicy(max_retries=0, hedge=False))
+    return CVAnalyzer(service, db)
+
+
+@pytest.fixture
+def cv_pdf():
+    return text_pdf(synthetic_cv_text(random.Random(3)).splitlines())
+
+
+def document_count(db):
+    with db.connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM cv_documents').fetchone()[0]
+
+
+def test_same_file_reuses_the_document_and_its_analysis(db, analyzer, server, cv_pdf):
+    first = analyzer.analyze_cv_bytes(cv_pdf)
+    assert first['success'] and not first['cached']
+    requests = server.requests
+
+    second = analyzer.analyze_cv_bytes(cv_pdf)
+    assert second['cached']
+    assert second['cv_document_id'] == first['cv_document_id']
+    assert second['analysis'] == first['analysis']
+    assert server.requests == requests
+    assert document_count(db) == 1
+
+
+def test_different_files_get_their_own_documents(db, analyzer, cv_pdf):
+    other = text_pdf(synthetic_cv_text(random.Random(4)).splitlines())
+    first = analyzer.analyze_cv_bytes(cv_pdf)
+    second = analyzer.analyze_cv_bytes(other)
+    assert first['cv_document_id'] != second['cv_document_id']
+    assert document_count(db) == 2
+
+
+def test_failed_analysis_keeps_the_text_for_the_retry(db, analyzer, cv_pdf, monkeypatch):
+    monkeypatch.setattr(analyzer, 'analyze_cv', lambda text: {
+        'raw_text': text, 'analysis': None, 'success': False, 'error': 'upstream down'
+    })
+    failed = analyzer.analyze_cv_bytes(cv_pdf)
+    assert not failed['success']
+    document = db.get_cv_document(failed['cv_document_id'])
+    assert document['extracted_text'] and document['analysis'] is None
+
+    monkeypatch.undo()
+    # The retry analyzes the stored text without extracting the PDF again
+    monkeypatch.setattr(analyzer, 'extract_text_from_bytes', pytest.fail)
+    retried = analyzer.analyze_cv_bytes(cv_pdf)
+    assert retried['success'] and not retried['cached']
+    assert retried['cv_document_id'] == failed['cv_document_id']
+
+
+def test_queued_upload_and_direct_upload_share_a_document(db, analyzer, cv_pdf):
+    content_hash = hashlib.sha256(cv_pdf).hexdigest()
+    document_id = db.save_cv_upload(content_hash, cv_pdf)
+    stored = analyzer.analyze_stored_cv(content_hash)
+    assert stored['cv_document_id'] == document_id
+
+    direct = analyzer.analyze_cv_bytes(cv_pdf)
+    assert direct['cached']
+    assert direct['cv_document_id'] == document_id
+    # Uploading again after the analysis does not store the bytes again
+    assert db.save_cv_upload(content_hash, cv_pdf) == document_id
+    assert db.get_cv_document(document_id)['file_data'] is None
@@ -0,0 +1,68 @@
+import random
+
+from benchmarks.synthetic import synthetic_cv_text
+from services.cv_compactor import CVCompactor
+from utils.tokens import count_tokens
+
+
+def long_line(prefix, sentences):
+    return prefix + ' '.join(f"Built distributed caching service number {i} in Go."
+                             for i in range(sentences))
+
+
+def test_result_fits_the_budget():
+    text = synthetic_cv_text(random.Random(1), jobs=12, pages=3, noisy=True)
+    result = CVCompactor().compact(text, 500)
+    assert result['compacted_tokens'] <= 500
+    assert result['saved_tokens'] == result['original_tokens'] - result['compacted_tokens']
+
+
+def test_short_cv_is_only_cleaned():
+    text = "Jane Doe\nPage 1 of 2\nSkills: Python, SQL\nReferences available upon request"
+    result = CVCompactor().compact(text, 1000)
+    assert result['text'] == "Jane Doe\n\nSkills: Python, SQL"
+    assert result['dropped_sections'] == []
+
+
+def test_repeated_lines_are_dropped():
+    header = "Jane Doe - Senior Backend Engineer - Istanbul"
+    text = f"{header}\nSkills: Python\n{header}\nEducation: BSc Computer Engineering"
+    assert CVCompactor().compact(text, 1000)['text'].count(header) == 1
+
+
+def test_sections_are_filled_in_priority_order():
+    experience = '\n'.join(f"Built distributed caching service number {i} in Go."
+                           for i in range(100))
+    text = ("Jane Doe\nInterests: chess, hiking, photography\nExperience:\n" + experience +
+            "\nSkills: Python, Go")
+    result = CVCompactor(max_section_share=1.0).compact(text, 300)
+    assert result['text'].startswith('Jane Doe\n\nExperience:')
+    assert result['dropped_sections'] == ['interests', 'skills']
+
+
+def test_cv_extracted_as_a_single_line_is_truncated_not_emptied():
+    text = long_line("Jane Doe Senior Engineer ", 200)
+    assert count_tokens(text) > 1500
+    result = CVCompactor().compact(text, 1500)
+    assert 1400 <= result['compacted_tokens'] <= 1500
+    assert text.startswith(result['text'])
+
+
+def test_section_of_one_oversized_line_is_cut_at_the_section_cap():
+    text = ("Jane Doe\n" + long_line("Experience: ", 300) +
+            "\nSkills: Python, Go, SQL\nEducation: BSc Computer Engineering")
+    result = CVCompactor(max_section_share=0.5).compact(text, 1000)
+    assert result['dropped_sections'] == []
+    assert 'Experience: Built distributed caching' in result['text']
+    assert 'Skills: Python, Go, SQL' in result['text']
+    assert 'Education: BSc Computer Engineering' in result['text']
+    assert result['compacted_tokens'] <= 1000
+
+
+def test_fit_words_respects_the_allowance():
+    line = long_line('', 20)
+    words, cost = CVCompactor.fit_words(line, 50)
+    kept = ' '.join(line.split(' ')[:words])
+    assert cost == count_tokens(kept) + 1 <= 50
+    assert count_tokens(' '.join(line.split(' ')[:words + 1])) + 1 > 50
+    assert CVCompactor.fit_words(line, 0) == (0, 0)
@@ -0,0 +1,57 @@
+import sqlite3
+
+import pytest
+
+
+def question_count(db):
+    with db.connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM questions').fetchone()[0]
+
+
+def test_create_interview_with_questions_stores_them_in_order(db, user_id):
+    created = db.create_interview_with_questions(
+        user_id, None, None, 'medium', ["First?", "Second?", "Third?"]
+    )
+    questions = db.get_interview_questions(created['interview_id'])
+    assert [q['id'] for q in questions] == created['question_ids']
+    assert [q['question_text'] for q in questions] == ["First?", "Second?", "Third?"]
+    assert db.get_interview(created['interview_id'])['question_count'] == 3
+    assert db.get_user_stats(user_id)['total_interviews'] == 1
+
+
+def test_question_count_can_exceed_the_stored_questions(db, user_id):
+    created = db.create_interview_with_questions(
+        user_id, None, None, 'medium', ["First?"], question_count=5
+    )
+    assert db.get_interview(created['interview_id'])['question_count'] == 5
+    assert len(created['question_ids']) == 1
+
+
+def test_transaction_rolls_back_every_statement_on_error(db, user_id):
+    interview_id = db.create_interview(user_id, None, None, 2, 'medium')
+    with pytest.raises(sqlite3.IntegrityError):
+        with db.transaction() as conn:
+            db.bulk_insert('questions', ('interview_id', 'question_text', 'question_order'),
+                           [(interview_id, "Kept?", 1)], conn=conn)
+            # question_text is NOT NULL
+            db.bulk_insert('questions', ('interview_id', 'question_text', 'question_order'),
+                           [(interview_id, None, 2)], conn=conn)
+    assert question_count(db) == 0
+
+
+def test_failed_interview_creation_leaves_nothing_behind(db, user_id):
+    with pytest.raises(sqlite3.IntegrityError):
+        db.create_interview_with_questions(user_id, None, None, 'medium', ["Fine?", None])
+    with db.connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM interviews').fetchone()[0] == 0
+    assert question_count(db) == 0
+    assert db.get_user_stats(user_id)['total_interviews'] == 0
+
+
+def test_bulk_insert_commits_on_its_own_and_checks_identifiers(db, user_id):
+    interview_id = db.create_interview(user_id, None, None, 2, 'medium')
+    assert db.bulk_insert('questions', ('interview_id', 'question_text', 'question_order'),
+                          [(interview_id, "One?", 1), (interview_id, "Two?", 2)]) == 2
+    assert question_count(db) == 2
+    with pytest.raises(ValueError):
+        db.bulk_insert('questions; DROP TABLE users', ('id',), [(1,)])
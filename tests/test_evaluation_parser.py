@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from services.evaluation_parser import (extract_json, parse_answer_evaluation,
+                                        parse_batch_evaluation, parse_interview_evaluation,
+                                        parse_score)
+
+
+@pytest.mark.parametrize('text, scale, expected', [
+    ("85/100", 100, 85),
+    ("8/10", 100, 80),
+    ("90%", 10, 9),
+    ("8.5 / 10", 10, 8.5),
+    ("Score: 7", 10, 7),
+    (7, 10, 7),
+    ("150", 100, 100),
+    ("-3", 10, 0),
+])
+def test_scores_are_read_on_the_requested_scale(text, scale, expected):
+    assert parse_score(text, scale) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('text', [None, True, "", "not graded"])
+def test_missing_scores(text):
+    assert parse_score(text, 10) is None
+
+
+def test_answer_evaluation_with_markdown_headings():
+    result = parse_answer_evaluation(
+        "**Score:** 8/10\n"
+        "### Strengths\n"
+        "- Clear structure\n"
+        "- Good example\n"
+        "2. Areas for Improvement: more depth\n"
+        "**Overall Feedback:**\n"
+        "A solid answer."
+    )
+    assert result['success']
+    assert result['score'] == 8
+    assert result['strengths'] == "- Clear structure\n- Good example"
+    assert result['improvements'] == "more depth"
+    assert result['feedback'] == "A solid answer."
+
+
+def test_answer_evaluation_without_score():
+    result = parse_answer_evaluation("Strengths: clear\nFeedback: fine")
+    assert not result['success']
+    assert result['score'] is None
+    assert result['strengths'] == "clear"
+
+
+def test_interview_evaluation_with_numbered_headings():
+    result = parse_interview_evaluation(
+        "1. Overall Score (0-100): 72\n"
+        "2. Strengths Demonstrated: communication\n"
+        "## Summary Feedback\n"
+        "Solid interview."
+    )
+    assert result['success']
+    assert result['overall_score'] == 72
+    assert result['feedback'] == "Solid interview."
+
+
+def test_interview_evaluation_in_percent():
+    assert parse_interview_evaluation("Overall Score: 90%")['overall_score'] == 90
+
+
+def test_interview_evaluation_without_score_fails():
+    result = parse_interview_evaluation("Summary: no numbers here")
+    assert not result['success']
+    assert result['overall_score'] is None
+    assert result['feedback'] == "no numbers here"
+
+
+def test_json_in_code_fence_or_chatter():
+    assert extract_json('```json\n{"a": 1}\n```') == {'a': 1}
+    assert extract_json('Here is the result: {"a": 1} Hope it helps.') == {'a': 1}
+
+
+@pytest.mark.parametrize('response', [
+    'no json here',
+    '{"answers": [{"index": 1, "score": 8}',
+    '{"answers": [}',
+    '[1, 2]',
+])
+def test_malformed_or_partial_json(response):
+    with pytest.raises(ValueError):
+        extract_json(response)
+
+
+def test_batch_without_answers_list():
+    with pytest.raises(ValueError, match="answers"):
+        parse_batch_evaluation('{"overall_score": 80}', 1, 2)
+
+
+def batch(answers, **session):
+    return json.dumps(dict({'answers': answers, 'overall_score': 80}, **session))
+
+
+def test_batch_scores_are_normalised():
+    result = parse_batch_evaluation(
+        batch([{'index': 1, 'score': "85/100"}, {'index': 2, 'score': "90%"}],
+              overall_score="8/10"),
+        1, 2
+    )
+    assert [a['score'] for a in result['answers']] == [8.5, 9]
+    assert result['overall_score'] == 80
+
+
+def test_batch_ignores_out_of_range_indices():
+    result = parse_batch_evaluation(
+        batch([{'index': 4, 'score': 6}, {'index': 99, 'score': 10}, {'index': 0, 'score': 1}]),
+        4, 2
+    )
+    assert [a['score'] for a in result['answers']] == [6, None]
+    assert [a['success'] for a in result['answers']] == [True, False]
+
+
+def test_batch_falls_back_to_position():
+    result = parse_batch_evaluation(
+        batch([{'score': 5}, "not an object", {'index': "3", 'score': 7}, {'index': 3, 'score': 2}]),
+        1, 3
+    )
+    # The unnumbered entries take the index of their position; the first
+    # entry for an index wins
+    assert [a['score'] for a in result['answers']] == [5, None, 7]
+
+
+def test_batch_list_sections_become_text():
+    result = parse_batch_evaluation(
+        batch([{'index': 1, 'score': 7, 'strengths': ["Clear", "Concise"]}],
+              recommendations=["Practise", None, "Read more"]),
+        1, 1
+    )
+    assert result['answers'][0]['strengths'] == "- Clear\n- Concise"
+    assert result['recommendations'] == "- Practise\n- Read more"
@@ -0,0 +1,98 @@
+import pytest
+
+from database.db_manager import search_expression
+
+
+def interview(db, user_id, questions):
+    interview_id = db.create_interview(user_id, None, None, len(questions), 'medium')
+    ids = [db.add_question(interview_id, question, order + 1)
+           for order, question in enumerate(questions)]
+    return interview_id, ids
+
+
+def found(db, user_id, text, limit=20):
+    return [(r['kind'], r['interview_id'], r['question_id'])
+            for r in db.search_history(user_id, text, limit)['results']]
+
+
+def test_search_is_scoped_to_the_user(db, user_id):
+    other = db.create_user('other', 'other@example.com', 'hash')
+    mine, (question_id,) = interview(db, user_id, ["How do you design a cache?"])
+    theirs, _ = interview(db, other, ["How do you invalidate a cache?"])
+    assert found(db, user_id, "cache") == [('question', mine, question_id)]
+    assert [r[1] for r in found(db, other, "cache")] == [theirs]
+    # Another user's owner token typed as a search term matches nothing
+    assert found(db, user_id, f"user{other}") == []
+
+
+def test_new_and_changed_answers_are_indexed(db, user_id):
+    interview_id, (question_id,) = interview(db, user_id, ["Describe a hard bug."])
+    assert found(db, user_id, "deadlock") == []
+    db.update_question_answer(question_id, "A deadlock between two workers.")
+    assert found(db, user_id, "deadlock") == [('question', interview_id, question_id)]
+    db.update_question_answers([("A memory leak in the parser.", question_id)])
+    assert found(db, user_id, "deadlock") == []
+    assert found(db, user_id, "leak") == [('question', interview_id, question_id)]
+
+
+def test_evaluations_are_indexed(db, user_id):
+    interview_id, _ = interview(db, user_id, ["Describe a hard bug."])
+    db.create_evaluation(interview_id, "Overall Score: 70/100", 70, "Explain trade-offs more.")
+    assert found(db, user_id, "trade-offs") == [('evaluation', interview_id, None)]
+    result = db.search_history(user_id, "trade-offs", 5)['results'][0]
+    assert "**trade**" in result['snippet']
+    assert result['difficulty_level'] == 'medium' and result['created_at']
+
+
+def test_deleted_questions_leave_the_index(db, user_id):
+    interview_id, (question_id,) = interview(db, user_id, ["Explain sharding."])
+    with db.connection() as conn:
+        conn.execute('DELETE FROM questions WHERE id = ?', (question_id,))
+        conn.commit()
+    assert found(db, user_id, "sharding") == []
+
+
+def test_question_text_ranks_above_answers(db, user_id):
+    interview_id, (in_answer, in_question) = interview(
+        db, user_id, ["Tell me about your last project.", "How would you scale Postgres?"])
+    db.update_question_answer(in_answer, "We moved to Postgres last year.")
+    assert [r[2] for r in found(db, user_id, "postgres")] == [in_question, in_answer]
+
+
+@pytest.mark.parametrize('text', [
+    'cache"', '"cache', 'cache*', 'cache OR', 'NOT cache', 'cache AND', 'NEAR(cache',
+    '-cache', 'owner:cache', '{question_text}: cache', '^cache', 'cache)', 'cache + ',
+])
+def test_query_syntax_is_treated_as_words(db, user_id, text):
+    # Holds every operator word above, so each search is an ordinary match
+    interview_id, (question_id,) = interview(
+        db, user_id, ["Should the owner keep a cache near the data or not? See question_text."])
+    assert found(db, user_id, text) == [('question', interview_id, question_id)]
+
+
+def test_search_expression():
+    assert search_expression('NEAR("cache" OR owner:user1*)') == '"near" "cache" "owner" "user1"'
+    # Stopwords are dropped unless nothing else is left
+    assert search_expression("how to design the cache") == '"design" "cache"'
+    assert search_expression("what is it") == '"what" "is" "it"'
+    assert search_expression(' "*: ') is None
+
+
+def test_nothing_to_search_for(db, user_id):
+    interview(db, user_id, ["How do you design a cache?"])
+    assert db.search_history(user_id, "  ()* ", 5) == {'results': [], 'next_cursor': None}
+
+
+def test_pages_follow_the_cursor(db, user_id):
+    interview(db, user_id, [f"Question {i} about caching" for i in range(5)])
+    pages, cursor = [], 0
+    while cursor is not None:
+        page = db.search_history(user_id, "caching", 2, offset=cursor)
+        pages.append([r['question_id'] for r in page['results']])
+        cursor = page['next_cursor']
+    assert [len(page) for page in pages] == [2, 2, 1]
+    every = [r[2] for r in found(db, user_id, "caching")]
+    assert [i for page in pages for i in page] == every
+    assert len(set(every)) == 5
+    # A page that ends exactly at the last result offers no next page
+    assert db.search_history(user_id, "caching", 5)['next_cursor'] is None
@@ -0,0 +1,38 @@
+def new_interview(db, user_id, created_at):
+    interview_id = db.create_interview(user_id, None, None, 3, 'medium')
+    with db.connection() as conn:
+        conn.execute('UPDATE interviews SET created_at = ? WHERE id = ?', (created_at, interview_id))
+        conn.commit()
+    return interview_id
+
+
+def all_pages(db, user_id, limit):
+    pages, before = [], None
+    while True:
+        page = db.get_user_interviews_page(user_id, limit, before)
+        pages.append([interview['id'] for interview in page['interviews']])
+        before = page['next_cursor']
+        if before is None:
+            return pages
+
+
+def test_pages_cover_interviews_with_the_same_created_at(db, user_id):
+    other = db.create_user('other', 'other@example.com', 'hash')
+    # Pages of two split each group of identical timestamps
+    times = ['2024-01-01 10:00:00'] * 3 + ['2024-01-02 10:00:00'] * 3 + ['2024-01-03 10:00:00']
+    created = {new_interview(db, user_id, created_at): created_at for created_at in times}
+    new_interview(db, other, '2024-01-02 10:00:00')
+
+    pages = all_pages(db, user_id, 2)
+    expected = sorted(created, key=lambda i: (created[i], i), reverse=True)
+    assert [len(page) for page in pages] == [2, 2, 2, 1]
+    assert [i for page in pages for i in page] == expected
+
+
+def test_exact_page_has_no_cursor(db, user_id):
+    ids = [new_interview(db, user_id, f'2024-01-0{day} 10:00:00') for day in range(1, 5)]
+    assert all_pages(db, user_id, 2) == [ids[:1:-1], ids[1::-1]]
+    # A page that ends exactly at the last interview does not offer another
+    page = db.get_user_interviews_page(user_id, 4)
+    assert page['next_cursor'] is None
+    assert [interview['id'] for interview in page['interviews']] == ids[::-1]
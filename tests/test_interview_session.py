@@ -0,0 +1,102 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.answer_buffer import AnswerBuffer
+from services.interview_session import InterviewSession
+
+WEAK, STRONG = "I am not sure.", "A thorough answer."
+
+
+class FakeService:
+    """Just the OpenAIService calls a session makes, counted."""
+
+    def __init__(self):
+        self.calls = Counter()
+
+    def evaluate_answer(self, question, answer):
+        self.calls['evaluate_answer'] += 1
+        return {'score': 2.0 if answer == WEAK else 9.0, 'feedback': '', 'success': True}
+
+    def generate_follow_up_question(self, question, answer, difficulty):
+        self.calls['generate_follow_up_question'] += 1
+        return f"Follow-up on: {question}"
+
+    def generate_next_question(self, asked, difficulty, topic, cv_analysis):
+        self.calls['generate_next_question'] += 1
+        return f"Generated question {len(asked) + 1}"
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+class SlowGradingService(FakeService):
+    def evaluate_answer(self, question, answer):
+        time.sleep(0.05)
+        return super().evaluate_answer(question, answer)
+
+
+def run_interview(db, user_id, executor, answers, max_follow_ups=2, service=None):
+    service = service or FakeService()
+    session = InterviewSession(
+        db, service, user_id, 'medium', len(answers),
+        planned=[f"Planned question {i + 1}" for i in range(len(answers))],
+        max_follow_ups=max_follow_ups, executor=executor, answer_buffer=AnswerBuffer(db)
+    )
+    for answer in answers:
+        if session._follow_up is not None:
+            # Let the background work finish, as a user's typing would
+            session._follow_up.result(5)
+        session.submit_answer(answer)
+    session.close()
+    return session, service
+
+
+def test_weak_answer_gets_a_follow_up_in_place_of_the_last_planned_question(db, user_id, executor):
+    session, service = run_interview(db, user_id, executor, [WEAK, STRONG, STRONG, STRONG])
+    assert [turn['kind'] for turn in session.turns] == ['planned', 'planned', 'follow_up', 'planned']
+    assert session.turns[2]['question'] == "Follow-up on: Planned question 1"
+    assert "Planned question 4" not in [turn['question'] for turn in session.turns]
+    assert session.follow_ups_asked == 1
+
+
+def test_strong_answers_are_graded_but_get_no_follow_up(db, user_id, executor):
+    session, service = run_interview(db, user_id, executor, [STRONG] * 4)
+    assert session.follow_ups_asked == 0
+    # The last two answers cannot lead to a follow-up, so are not graded
+    assert service.calls == Counter(evaluate_answer=2)
+
+
+def test_no_background_calls_once_follow_ups_are_used_up(db, user_id, executor):
+    session, service = run_interview(db, user_id, executor, [WEAK] * 6, max_follow_ups=1)
+    assert session.follow_ups_asked == 1
+    assert service.calls == Counter(evaluate_answer=1, generate_follow_up_question=1)
+
+
+def test_no_background_calls_without_follow_ups(db, user_id, executor):
+    session, service = run_interview(db, user_id, executor, [WEAK] * 4, max_follow_ups=0)
+    assert service.calls == Counter()
+    assert all(grade is None for grade in session.grades())
+
+
+def test_answers_are_stored_when_the_interview_ends(db, user_id, executor):
+    session, _ = run_interview(db, user_id, executor, [STRONG, WEAK, STRONG])
+    stored = [q['answer_text'] for q in db.get_interview_questions(session.interview_id)]
+    assert stored == [STRONG, WEAK, STRONG]
+
+
+def test_background_grading_is_not_counted_as_waiting_saved(db, user_id, executor):
+    session, service = run_interview(db, user_id, executor, [STRONG] * 4,
+                                     service=SlowGradingService())
+    stats = session.stats()
+    # Planned questions need no generation, so no waiting was saved
+    assert stats['total_saved'] == 0
+    assert [turn['saved'] for turn in stats['turns']] == [0, 0, 0, 0]
+    assert stats['total_grade_time'] >= 2 * 0.05
+    assert [turn['grade_time'] > 0 for turn in stats['turns']] == [True, True, False, False]
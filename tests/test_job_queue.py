@@ -0,0 +1,133 @@
+import hashlib
+import random
+
+import pytest
+
+from benchmarks.fake_openai_server import FakeOpenAIServer
+from benchmarks.synthetic import synthetic_cv_text, text_pdf
+from services.cv_analyzer import CVAnalyzer
+from services.job_queue import (
+    ANALYZE_CV, FAILED, QUEUED, RUNNING, SUCCEEDED, JobError, JobQueue, analyze_cv_handler
+)
+from services.openai_service import OpenAIService
+from services.request_scheduler import RequestScheduler
+from services.resilience import ResiliencePolicy
+
+WORKER = 'worker-1'
+
+
+@pytest.fixture
+def queue(db):
+    return JobQueue(db, workers=1, lease_seconds=30, max_attempts=3, retry_delay=0)
+
+
+def test_same_idempotency_key_returns_the_existing_job(queue):
+    first = queue.enqueue('echo', {'n': 1}, idempotency_key='echo:1')
+    assert queue.enqueue('echo', {'n': 1}, idempotency_key='echo:1') == first
+    assert queue.enqueue('echo', {'n': 1}) != first
+
+
+def test_handler_result_is_stored(queue):
+    queue.register('echo', lambda payload: {'n': payload['n'] * 2})
+    job_id = queue.enqueue('echo', {'n': 21})
+    assert queue.run_once(WORKER)
+    job = queue.get(job_id)
+    assert job['status'] == SUCCEEDED
+    assert job['result'] == {'n': 42}
+    assert not queue.run_once(WORKER)
+
+
+def test_failed_attempts_are_retried_until_max_attempts(queue):
+    def fail(payload):
+        raise RuntimeError("upstream down")
+    queue.register('flaky', fail)
+    job_id = queue.enqueue('flaky', {})
+    for _ in range(3):
+        assert queue.run_once(WORKER)
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 3
+    assert queue.stats()['retried'] == 2
+
+
+def test_job_errors_are_not_retried(queue):
+    def reject(payload):
+        raise JobError("bad input")
+    queue.register('strict', reject)
+    job_id = queue.enqueue('strict', {})
+    queue.run_once(WORKER)
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 1
+
+
+def test_expired_lease_is_claimed_again(db):
+    job_id = JobQueue(db).enqueue('echo', {})
+    assert db.claim_job('dead-worker', ['echo'], 30, now=1e12)['id'] == job_id
+    # Still leased
+    assert db.claim_job(WORKER, ['echo'], 30, now=1e12 + 10) is None
+    job = db.claim_job(WORKER, ['echo'], 30, now=1e12 + 31)
+    assert job['id'] == job_id
+    assert job['attempts'] == 2
+    assert job['status'] == RUNNING
+    # The dead worker's late result is rejected
+    assert not db.complete_job(job_id, 'dead-worker', '{}', now=1e12 + 32)
+    assert db.complete_job(job_id, WORKER, '{}', now=1e12 + 32)
+
+
+def test_expired_lease_on_the_last_attempt_fails_the_job(db):
+    job_id = JobQueue(db, max_attempts=2).enqueue('echo', {})
+    now = 1e12
+    for _ in range(2):
+        assert db.claim_job('dead-worker', ['echo'], 30, now)['id'] == job_id
+        now += 31
+    assert db.claim_job(WORKER, ['echo'], 30, now) is None
+    job = db.get_job(job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 2
+    assert 'lease expired' in job['last_error']
+
+
+def test_failed_job_can_be_queued_again(queue):
+    def reject(payload):
+        raise JobError("bad input")
+    queue.register('strict', reject)
+    job_id = queue.enqueue('strict', {}, idempotency_key='strict:1')
+    queue.run_once(WORKER)
+    assert queue.enqueue('strict', {}, idempotency_key='strict:1') == job_id
+    job = queue.get(job_id)
+    assert job['status'] == QUEUED
+    assert job['attempts'] == 0
+
+
+def test_cv_analysis_job_reads_the_upload_from_the_database(db, queue):
+    server = FakeOpenAIServer().start()
+    try:
+        service = OpenAIService(api_key='test', base_url=server.base_url,
+                                scheduler=RequestScheduler(10_000, 10_000_000),
+                                resilience=ResiliencePolicy(max_retries=0, hedge=False))
+        queue.register(ANALYZE_CV, analyze_cv_handler(CVAnalyzer(service, db)))
+        data = text_pdf(synthetic_cv_text(random.Random(1)).splitlines())
+        content_hash = hashlib.sha256(data).hexdigest()
+        document_id = db.save_cv_upload(content_hash, data)
+
+        job_id = queue.enqueue(ANALYZE_CV, {'content_hash': content_hash})
+        assert queue.run_once(WORKER)
+    finally:
+        server.shutdown()
+    job = queue.get(job_id)
+    assert job['status'] == SUCCEEDED
+    assert job['result']['cv_document_id'] == document_id
+    document = db.get_cv_document(document_id)
+    assert document['analysis']
+    # The bytes are dropped once the text is stored
+    assert document['file_data'] is None
+
+
+def test_cv_analysis_job_fails_for_an_unknown_upload(queue):
+    queue.register(ANALYZE_CV, analyze_cv_handler(CVAnalyzer(None, queue.db)))
+    job_id = queue.enqueue(ANALYZE_CV, {'content_hash': '0' * 64})
+    queue.run_once(WORKER)
+    job = queue.get(job_id)
+    assert job['status'] == FAILED
+    assert job['attempts'] == 1
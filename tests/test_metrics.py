@@ -0,0 +1,83 @@
+import gc
+import sqlite3
+import urllib.request
+
+import pytest
+
+from database.connection_pool import ConnectionPool
+from services.completion_cache import MemoryCompletionCache
+from services.openai_service import StreamStats
+from services.request_scheduler import RequestScheduler, SchedulerTimeoutError
+from services.resilience import CircuitBreaker
+from utils.metrics import REGISTRY, Metric, Registry, start_metrics_server
+
+
+def sample(text, line_start):
+    """Value of the first sample line starting with ``line_start``."""
+    for line in text.splitlines():
+        if line.startswith(line_start + ' '):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_metric_subclasses_must_provide_samples():
+    class Incomplete(Metric):
+        kind = 'gauge'
+
+    with pytest.raises(TypeError):
+        Incomplete('incomplete', 'Has no samples')
+
+
+def test_collector_reads_live_objects_and_forgets_dead_ones():
+    class Source:
+        def __init__(self, value):
+            self.value = value
+
+    registry = Registry()
+    collector = registry.collector('things', 'Things.', ('kind',),
+                                   lambda source: {('a',): source.value})
+    first, second = Source(2), Source(3)
+    collector.add(first)
+    collector.add(second)
+    assert sample(registry.render(), 'things{kind="a"}') == 5
+    first.value = 10
+    del second
+    gc.collect()
+    assert sample(registry.render(), 'things{kind="a"}') == 10
+
+
+def test_metrics_endpoint_exports_component_stats(tmp_path):
+    path = str(tmp_path / 'metrics.db')
+    pool = ConnectionPool.for_path(path, lambda: sqlite3.connect(path, check_same_thread=False))
+    with pool.connection():
+        pass
+    cache = MemoryCompletionCache()
+    cache.get('missing')
+    StreamStats().record_ttfb(0.2)
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    breaker.record_failure()
+    scheduler = RequestScheduler(60, 1_000_000, burst_seconds=1)
+    scheduler.acquire(1)
+    with pytest.raises(SchedulerTimeoutError):
+        scheduler.acquire(1, timeout=0.05)
+
+    server = start_metrics_server('127.0.0.1', 0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        text = urllib.request.urlopen(url, timeout=5).read().decode()
+    finally:
+        server.shutdown()
+        pool.release()
+
+    database = f'database="{path}"'
+    assert sample(text, f'db_pool_connections{{{database},state="idle"}}') == 1
+    assert sample(text, f'db_pool_checkouts_total{{{database}}}') == 1
+    assert sample(text, 'completion_cache_events_total{cache="memory",event="misses"}') >= 1
+    assert sample(text, 'openai_stream_ttfb_seconds_count') >= 1
+    assert sample(text, 'openai_circuit_breakers{state="open"}') >= 1
+    assert sample(text, 'openai_circuit_breaker_opened_total') >= 1
+    assert sample(text, 'openai_scheduler_wait_seconds_count{priority="interactive"}') >= 1
+    assert sample(text, 'openai_scheduler_timeouts_total{priority="interactive"}') >= 1
+    assert sample(text, 'openai_scheduler_queue_depth{priority="interactive"}') == 0
+    # Closed pools drop out
+    assert f'db_pool_connections{{{database}' not in REGISTRY.render()
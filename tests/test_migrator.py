@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+
+from database.migrator import (
+    apply_migrations, get_schema_version, load_migrations, split_statements
+)
+
+TRIGGER_MIGRATION = """
+-- Counts notes; the trigger body has its own statements
+CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT);
+CREATE TABLE note_count (n INTEGER);
+INSERT INTO note_count VALUES (0);
+
+CREATE TRIGGER notes_insert AFTER INSERT ON notes BEGIN
+    UPDATE note_count SET n = n + 1;
+    UPDATE note_count SET n = n + 0; -- a ';' inside a comment
+END;
+"""
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'migrations.db'))
+    conn.execute('''CREATE TABLE schema_migrations (
+                        version INTEGER PRIMARY KEY, name VARCHAR(255) NOT NULL,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)''')
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def test_split_statements_keeps_trigger_bodies_whole():
+    statements = split_statements(TRIGGER_MIGRATION)
+    assert len(statements) == 4
+    assert statements[-1].startswith('CREATE TRIGGER')
+    assert statements[-1].endswith('END;')
+
+
+def test_split_statements_rejects_an_unfinished_statement():
+    with pytest.raises(ValueError):
+        split_statements("CREATE TABLE t (id INTEGER);\nINSERT INTO t VALUES (1)\n-- done")
+
+
+def test_migrations_apply_once(conn):
+    migrations = [(1, 'notes', TRIGGER_MIGRATION),
+                  (2, 'tags', 'CREATE TABLE tags (id INTEGER PRIMARY KEY);')]
+    assert apply_migrations(conn, migrations) == [1, 2]
+    assert apply_migrations(conn, migrations) == []
+    assert get_schema_version(conn) == 2
+
+    conn.execute("INSERT INTO notes (body) VALUES ('hello')")
+    assert conn.execute('SELECT n FROM note_count').fetchone()[0] == 1
+
+
+def test_failed_migration_rolls_back_the_whole_run(conn):
+    migrations = [(1, 'notes', TRIGGER_MIGRATION),
+                  (2, 'broken', 'CREATE TABLE tags (id INTEGER);\nINSERT INTO missing VALUES (1);')]
+    with pytest.raises(sqlite3.OperationalError):
+        apply_migrations(conn, migrations)
+    assert not conn.in_transaction
+    assert {'notes', 'tags'}.isdisjoint(tables(conn))
+    assert get_schema_version(conn) == 0
+
+    # Fixed, the run applies cleanly
+    migrations[1] = (2, 'tags', 'CREATE TABLE tags (id INTEGER);')
+    assert apply_migrations(conn, migrations) == [1, 2]
+
+
+def test_bundled_migrations_apply_to_the_schema(db):
+    versions = [version for version, _, _ in load_migrations()]
+    assert versions == sorted(set(versions))
+    assert db.schema_version == versions[-1]
+    with db.connection() as conn:
+        assert apply_migrations(conn) == []
@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from benchmarks.synthetic import text_pdf
+from services.pdf_extractor import PDFExtractionError, PDFTextExtractor
+
+
+@pytest.fixture(scope='module', autouse=True)
+def shared_workers():
+    yield
+    PDFTextExtractor.shutdown()
+
+
+def lines(text):
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def numbered_pdf(pages):
+    return text_pdf([f"Page {i} text" for i in range(pages)], lines_per_page=1)
+
+
+def dense_pdf():
+    # One page that takes tens of milliseconds to parse
+    return text_pdf([f"Line {i} text" for i in range(3000)], lines_per_page=3000)
+
+
+def test_short_document_is_extracted():
+    text = PDFTextExtractor(timeout=30).extract(numbered_pdf(2))
+    assert lines(text) == ["Page 0 text", "Page 1 text"]
+
+
+def test_long_document_keeps_page_order():
+    text = PDFTextExtractor(timeout=30, pages_per_task=3).extract(numbered_pdf(10))
+    assert lines(text) == [f"Page {i} text" for i in range(10)]
+
+
+def test_page_limit():
+    with pytest.raises(PDFExtractionError, match="at most 5"):
+        PDFTextExtractor(timeout=30, max_pages=5).extract(numbered_pdf(6))
+
+
+def test_invalid_pdf():
+    with pytest.raises(PDFExtractionError, match="Could not extract"):
+        PDFTextExtractor(timeout=30).extract(b"not a pdf")
+
+
+def test_time_limit_applies_to_single_task_documents():
+    extractor = PDFTextExtractor(timeout=30)
+    extractor.extract(numbered_pdf(1))
+    worker = PDFTextExtractor._idle[-1]
+    # A deadline no worker can meet, on a one-page document
+    with pytest.raises(PDFExtractionError, match="exceeded"):
+        PDFTextExtractor(timeout=1e-3).extract(dense_pdf())
+    # The stuck worker is killed and the next document gets a new one
+    assert not worker.process.is_alive()
+    assert worker not in PDFTextExtractor._idle
+    assert lines(extractor.extract(numbered_pdf(1))) == ["Page 0 text"]
+
+
+def test_time_limit_leaves_other_documents_running():
+    results = []
+    long_document = threading.Thread(target=lambda: results.append(
+        PDFTextExtractor(timeout=60, max_pages=200, pages_per_task=5)
+        .extract(numbered_pdf(200))))
+    long_document.start()
+    timeouts = 0
+    # Time out other documents for as long as the long one is being extracted
+    while long_document.is_alive() or not timeouts:
+        with pytest.raises(PDFExtractionError, match="exceeded"):
+            PDFTextExtractor(timeout=1e-3).extract(dense_pdf())
+        timeouts += 1
+    long_document.join()
+    assert lines(results[0]) == [f"Page {i} text" for i in range(200)]
@@ -0,0 +1,84 @@
+import itertools
+
+import pytest
+
+from services.question_bank import QuestionBank
+
+
+class FakeService:
+    """Generates numbered questions; ``repeat`` makes every batch the same."""
+
+    def __init__(self, repeat=False):
+        self.repeat = repeat
+        self.calls = []
+        self._numbers = itertools.count(1)
+
+    def generate_interview_questions(self, num_questions, difficulty, topic=None,
+                                     use_cache=True, priority=None):
+        self.calls.append((num_questions, difficulty, topic))
+        numbers = range(1, num_questions + 1) if self.repeat else \
+            [next(self._numbers) for _ in range(num_questions)]
+        return [f"{difficulty} {topic or 'general'} question {n}?" for n in numbers]
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+@pytest.fixture
+def bank(db, service):
+    return QuestionBank(db, service, depth=6, batch_size=4)
+
+
+def test_refill_tops_a_bucket_up_to_depth(db, bank, service):
+    assert bank.refill('medium', '') == 6
+    assert db.count_bank_questions('medium', '') == 6
+    assert [n for n, _, _ in service.calls] == [4, 2]
+    assert bank.refill('medium', '') == 0
+
+
+def test_draw_takes_questions_from_the_bank(db, bank, service, user_id):
+    bank.refill('medium', '')
+    service.calls.clear()
+    questions = bank.draw(user_id, 4, 'medium')
+    assert len(set(questions)) == 4
+    assert service.calls == []
+    assert db.count_bank_questions('medium', '') == 2
+    assert bank.stats()['bank_hits'] == 1
+
+
+def test_draw_generates_what_the_bank_cannot_cover(db, bank, service, user_id):
+    bank.refill('medium', 'python')
+    service.calls.clear()
+    questions = bank.draw(user_id, 8, 'medium', 'python')
+    assert len(set(questions)) == 8
+    assert service.calls == [(2, 'medium', 'python')]
+    assert bank.stats()['live_fallbacks'] == 1
+
+
+def test_questions_a_user_has_seen_are_not_drawn_again(db, user_id):
+    # Every batch has the same questions, so the bank refills with repeats
+    bank = QuestionBank(db, FakeService(repeat=True), depth=3, batch_size=3)
+    bank.refill('easy', '')
+    first = bank.draw(user_id, 3, 'easy')
+    bank.refill('easy', '')
+    assert db.draw_bank_questions(user_id, 'easy', '', 3) == []
+    # Another user still gets them
+    other = db.create_user('other', 'other@example.com', 'hash')
+    assert sorted(db.draw_bank_questions(other, 'easy', '', 3)) == sorted(first)
+
+
+def test_live_questions_are_recorded_as_seen(db, user_id):
+    bank = QuestionBank(db, FakeService(repeat=True), depth=3, batch_size=3)
+    live = bank.draw(user_id, 3, 'hard')
+    bank.refill('hard', '')
+    assert db.count_bank_questions('hard', '') == 3
+    assert db.draw_bank_questions(user_id, 'hard', '', 3) == []
+    assert len(live) == 3
+
+
+def test_refill_stops_when_only_duplicates_come_back(db, user_id):
+    bank = QuestionBank(db, FakeService(repeat=True), depth=6, batch_size=3)
+    assert bank.refill('medium', '') == 3
+    assert bank.refill('medium', '') == 0
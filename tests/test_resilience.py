@@ -0,0 +1,167 @@
+import threading
+import time
+
+import pytest
+
+from services.request_scheduler import SchedulerTimeoutError
+from services.resilience import (
+    CircuitBreaker, DeadlineExceededError, OpenAIServiceError, ResiliencePolicy,
+    UpstreamUnavailableError, classify_error
+)
+
+
+def flaky(failures, error=None):
+    """An attempt that fails ``failures`` times, then returns 'ok'."""
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) <= failures:
+            raise error or OpenAIServiceError("unavailable", retryable=True)
+        return 'ok'
+    return attempt, calls
+
+
+def policy(**kwargs):
+    kwargs.setdefault('base_delay', 0.001)
+    kwargs.setdefault('max_delay', 0.01)
+    kwargs.setdefault('deadline', 5)
+    kwargs.setdefault('hedge', False)
+    return ResiliencePolicy(**kwargs)
+
+
+def test_classify_error():
+    assert classify_error(SchedulerTimeoutError("queue full")).retryable is False
+    assert classify_error(ValueError("bad payload")).retryable is False
+    error = OpenAIServiceError("kept", retryable=True)
+    assert classify_error(error) is error
+
+
+def test_retries_until_success():
+    attempt, calls = flaky(2)
+    retrying = policy(max_retries=3)
+    assert retrying.call(attempt) == 'ok'
+    assert len(calls) == 3
+    assert retrying.stats()['retries'] == 2
+
+
+def test_gives_up_after_max_retries():
+    attempt, calls = flaky(10)
+    with pytest.raises(OpenAIServiceError):
+        policy(max_retries=2).call(attempt)
+    assert len(calls) == 3
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    attempt, calls = flaky(1, OpenAIServiceError("bad request", retryable=False))
+    with pytest.raises(OpenAIServiceError):
+        policy(max_retries=3).call(attempt)
+    assert len(calls) == 1
+
+
+def test_retry_after_past_the_deadline_is_not_waited_for():
+    attempt, calls = flaky(1, OpenAIServiceError("slow down", retryable=True, retry_after=10))
+    started = time.monotonic()
+    with pytest.raises(OpenAIServiceError):
+        policy(max_retries=3, max_delay=10, deadline=0.5).call(attempt)
+    assert time.monotonic() - started < 0.5
+    assert len(calls) == 1
+
+
+def test_breaker_opens_then_half_opens_then_closes():
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.1)
+    breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.15)
+    # One trial call at a time while half-open
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.1)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['opened'] == 2
+
+
+def test_open_breaker_rejects_without_calling():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    guarded = policy(max_retries=0, breaker=breaker)
+    attempt, calls = flaky(10)
+    with pytest.raises(OpenAIServiceError):
+        guarded.call(attempt)
+    with pytest.raises(UpstreamUnavailableError):
+        guarded.call(attempt)
+    assert len(calls) == 1
+
+
+def test_client_errors_do_not_open_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1)
+    attempt, _ = flaky(1, OpenAIServiceError("bad request", retryable=False))
+    with pytest.raises(OpenAIServiceError):
+        policy(breaker=breaker).call(attempt)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_slow_attempt_is_hedged_and_the_backup_wins():
+    hedged = policy(hedge=True, hedge_min_samples=5)
+    for _ in range(5):
+        hedged.latency.record(0.05)
+    release = threading.Event()
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        if len(calls) == 1:
+            # The primary hangs until the test ends
+            release.wait(5)
+            return 'slow'
+        return 'fast'
+
+    started = time.monotonic()
+    try:
+        assert hedged.call(attempt) == 'fast'
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1
+    stats = hedged.stats()
+    assert stats['hedges'] == 1
+    assert stats['hedge_wins'] == 1
+
+
+def test_no_hedge_before_enough_samples():
+    hedged = policy(hedge=True, hedge_min_samples=5)
+    assert hedged.hedge_delay() is None
+    attempt, calls = flaky(0)
+    assert hedged.call(attempt) == 'ok'
+    assert len(calls) == 1
+
+
+def test_hung_attempts_end_at_the_deadline():
+    hedged = policy(hedge=True, hedge_min_samples=1, deadline=0.3, max_retries=0)
+    hedged.latency.record(0.05)
+    release = threading.Event()
+
+    def attempt(timeout):
+        release.wait(5)
+        return 'late'
+
+    started = time.monotonic()
+    try:
+        with pytest.raises(DeadlineExceededError):
+            hedged.call(attempt)
+    finally:
+        release.set()
+    assert time.monotonic() - started < 1
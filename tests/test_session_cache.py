@@ -0,0 +1,68 @@
+from utils.session_cache import SessionCache
+
+
+def counting_loader(value):
+    calls = []
+
+    def load():
+        calls.append(value)
+        return value
+    return load, calls
+
+
+def test_loader_runs_only_on_a_miss():
+    cache = SessionCache({})
+    load, calls = counting_loader([1, 2])
+    assert cache.get(('history', 1, None), load) == [1, 2]
+    assert cache.get(('history', 1, None), load) == [1, 2]
+    assert calls == [[1, 2]]
+    assert cache.stats() == {'entries': 1, 'hits': 1, 'misses': 1}
+
+
+def test_none_is_cached():
+    cache = SessionCache({})
+    load, calls = counting_loader(None)
+    cache.get(('stats', 1), load)
+    cache.get(('stats', 1), load)
+    assert len(calls) == 1
+
+
+def test_invalidate_drops_keys_with_the_prefix():
+    cache = SessionCache({})
+    for key in [('history', 1, None), ('history', 1, 'cursor'), ('history', 2, None),
+                ('stats', 1)]:
+        cache.get(key, lambda: key)
+    assert cache.invalidate('history', 1) == 2
+    assert cache.invalidate('history', 1) == 0
+    # Other users and other kinds of data are kept
+    assert cache.stats()['entries'] == 2
+    load, calls = counting_loader('fresh')
+    assert cache.get(('history', 1, None), load) == 'fresh'
+    assert cache.get(('history', 2, None), load) == ('history', 2, None)
+    assert calls == ['fresh']
+
+
+def test_invalidate_by_kind():
+    cache = SessionCache({})
+    cache.get(('stats', 1), lambda: 1)
+    cache.get(('stats', 2), lambda: 2)
+    cache.get(('history', 1), lambda: 3)
+    assert cache.invalidate('stats') == 2
+    assert cache.stats()['entries'] == 1
+
+
+def test_clear_keeps_the_counters():
+    cache = SessionCache({})
+    cache.get(('stats', 1), lambda: 1)
+    cache.clear()
+    assert cache.stats() == {'entries': 0, 'hits': 0, 'misses': 1}
+
+
+def test_state_lives_in_the_store():
+    store = {}
+    SessionCache(store).get(('stats', 1), lambda: 'loaded')
+    # A new cache on the same store (the next rerun) sees the entry
+    assert SessionCache(store).get(('stats', 1), lambda: 'reloaded') == 'loaded'
+    # A different name or store does not
+    assert SessionCache(store, name='other').get(('stats', 1), lambda: 'reloaded') == 'reloaded'
+    assert SessionCache({}).get(('stats', 1), lambda: 'reloaded') == 'reloaded'
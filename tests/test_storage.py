@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from database.storage import WalCheckpointer, is_busy_error, retry_on_busy
+
+
+class FlakyWriter:
+    write_retries = 3
+
+    def __init__(self, failures, error='database is locked'):
+        self.failures = failures
+        self.error = error
+        self.calls = 0
+        self.busy_retries = 0
+
+    @retry_on_busy
+    def write(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise sqlite3.OperationalError(self.error)
+        return 'written'
+
+
+def test_is_busy_error():
+    assert is_busy_error(sqlite3.OperationalError('database is locked'))
+    assert is_busy_error(sqlite3.OperationalError('database table is busy'))
+    assert not is_busy_error(sqlite3.OperationalError('no such table: x'))
+    assert not is_busy_error(ValueError('locked'))
+
+
+def test_busy_write_is_retried_until_it_succeeds():
+    writer = FlakyWriter(failures=2)
+    assert writer.write() == 'written'
+    assert writer.calls == 3
+    assert writer.busy_retries == 2
+
+
+def test_gives_up_after_write_retries():
+    writer = FlakyWriter(failures=10)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.write()
+    assert writer.calls == writer.write_retries + 1
+
+
+def test_other_errors_are_not_retried():
+    writer = FlakyWriter(failures=1, error='no such table: questions')
+    with pytest.raises(sqlite3.OperationalError):
+        writer.write()
+    assert writer.calls == 1
+    assert writer.busy_retries == 0
+
+
+def test_checkpointer_is_shared_until_the_last_user_releases_it(tmp_path):
+    path = str(tmp_path / 'wal.db')
+    connect = lambda: sqlite3.connect(path, check_same_thread=False)
+    first = WalCheckpointer.start_for_path(path, connect, interval=60)
+    second = WalCheckpointer.start_for_path(path, connect, interval=60)
+    assert first is second
+    WalCheckpointer.release_for_path(path)
+    assert not first._stop_event.is_set()
+    WalCheckpointer.release_for_path(path)
+    first.join(2)
+    assert not first.is_alive()
+
+
+def test_manager_uses_wal_and_checkpoints(db):
+    assert db.journal_mode == 'wal'
+    db.create_user('writer', 'writer@example.com', 'hash')
+    with db.connection() as conn:
+        busy, _, _ = db.checkpointer.checkpoint(conn)
+    assert busy == 0
+    assert db.storage_stats()['checkpoints'] >= 1
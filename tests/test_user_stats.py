@@ -0,0 +1,90 @@
+import pytest
+
+from database.migrator import load_migrations, split_statements
+
+STAT_FIELDS = ('total_interviews', 'completed_interviews', 'scored_interviews', 'score_sum')
+
+
+def new_interview(db, user_id):
+    return db.create_interview(user_id, None, None, 3, 'medium')
+
+
+def counts(db, user_id):
+    stats = db.get_user_stats(user_id)
+    return tuple(stats[field] for field in STAT_FIELDS)
+
+
+def test_completing_twice_counts_once(db, user_id):
+    interview_id = new_interview(db, user_id)
+    db.update_interview_status(interview_id, 'completed', 80)
+    db.update_interview_status(interview_id, 'completed', 80)
+    assert counts(db, user_id) == (1, 1, 1, 80)
+    assert db.get_user_stats(user_id)['average_score'] == 80
+
+
+def test_changing_the_score_replaces_it(db, user_id):
+    first, second = new_interview(db, user_id), new_interview(db, user_id)
+    db.update_interview_status(first, 'completed', 80)
+    db.update_interview_status(second, 'completed', 70)
+    db.update_interview_status(first, 'completed', 60)
+    assert counts(db, user_id) == (2, 2, 2, 130)
+    assert db.get_user_stats(user_id)['average_score'] == 65
+
+
+def test_completing_without_a_score(db, user_id):
+    interview_id = new_interview(db, user_id)
+    db.update_interview_status(interview_id, 'completed', 80)
+    db.update_interview_status(interview_id, 'completed')
+    assert counts(db, user_id) == (1, 1, 0, 0)
+    assert db.get_user_stats(user_id)['average_score'] is None
+
+
+def test_reverting_to_in_progress(db, user_id):
+    interview_id = new_interview(db, user_id)
+    db.update_interview_status(interview_id, 'completed', 80)
+    db.update_interview_status(interview_id, 'in_progress')
+    assert counts(db, user_id) == (1, 0, 0, 0)
+    assert db.get_user_stats(user_id)['average_score'] is None
+    # Completing it again counts it once more
+    db.update_interview_status(interview_id, 'completed', 90)
+    assert counts(db, user_id) == (1, 1, 1, 90)
+
+
+def test_user_without_interviews(db, user_id):
+    stats = db.get_user_stats(user_id)
+    assert counts(db, user_id) == (0, 0, 0, 0)
+    assert stats['average_score'] is None and stats['last_activity_at'] is None
+
+
+def aggregate(db, user_id):
+    """The stats computed directly from the interviews table."""
+    with db.connection() as conn:
+        rows = conn.execute('SELECT status, score FROM interviews WHERE user_id = ?',
+                            (user_id,)).fetchall()
+    completed = [row['score'] for row in rows if row['status'] == 'completed']
+    scored = [score for score in completed if score is not None]
+    return len(rows), len(completed), len(scored), pytest.approx(sum(scored))
+
+
+def test_backfill_matches_the_interviews_table(db, user_id):
+    other = db.create_user('other', 'other@example.com', 'hash')
+    ids = [new_interview(db, user_id) for _ in range(5)] + [new_interview(db, other)]
+    db.update_interview_status(ids[0], 'completed', 80)
+    db.update_interview_status(ids[1], 'completed', 55.5)
+    db.update_interview_status(ids[1], 'completed', 65.5)
+    db.update_interview_status(ids[2], 'completed')
+    db.update_interview_status(ids[3], 'completed', 90)
+    db.update_interview_status(ids[3], 'in_progress')
+    db.update_interview_status(ids[5], 'completed', 40)
+    incremental = {user: counts(db, user) for user in (user_id, other)}
+
+    backfill = next(sql for version, _, sql in load_migrations() if version == 8)
+    with db.connection() as conn:
+        conn.execute('DELETE FROM user_stats')
+        for statement in split_statements(backfill):
+            conn.execute(statement)
+        conn.commit()
+
+    for user in (user_id, other):
+        assert counts(db, user) == aggregate(db, user)
+        assert counts(db, user) == incremental[user]
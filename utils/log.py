@@ -0,0 +1,50 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from config import Config
+
+# Attributes every LogRecord has; anything else came from ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {
+    'message', 'asctime', 'taskName'
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line, with the ``extra=`` fields as top-level keys."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None):
+    """Send the application's logs to stderr as JSON lines or plain text.
+
+    Safe to call more than once; only the first call installs a handler.
+    """
+    root = logging.getLogger()
+    root.setLevel((level or Config.LOG_LEVEL).upper())
+    if any(getattr(handler, '_app_handler', False) for handler in root.handlers):
+        return
+    handler = logging.StreamHandler(sys.stderr)
+    if (fmt or Config.LOG_FORMAT) == 'json':
+        handler.setFormatter(JSONFormatter())
+    else:
+        handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    handler._app_handler = True
+    root.addHandler(handler)
+    # The OpenAI client logs every HTTP request at INFO
+    logging.getLogger('httpx').setLevel(logging.WARNING)
@@ -0,0 +1,348 @@
+import bisect
+import functools
+import inspect
+import threading
+import time
+import weakref
+from abc import ABC, abstractmethod
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import Config
+
+# Seconds; spans a cached SQLite read up to a slow completion
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str],
+                   extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    """A named family of samples, one per combination of label values."""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Exposition lines for every sample of the family."""
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}",
+                f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1.0, **labels):
+        self.inc_key(self._key(labels), amount)
+
+    def inc_key(self, key: Tuple[str, ...], amount: float = 1.0):
+        """``inc`` with the label values already in ``labelnames`` order."""
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        self.observe_key(self._key(labels), value)
+
+    def observe_key(self, key: Tuple[str, ...], value: float):
+        """``observe`` with the label values already in ``labelnames`` order."""
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (not cumulative) counts, then sum and count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state[2] if state else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, ([*state[0]], state[1], state[2]))
+                           for key, state in self._values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = ('le', _format_value(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} "
+                             f"{cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Collector(Metric):
+    """Samples read at scrape time from objects that keep their own stats.
+
+    ``collect(owner)`` returns ``{label values: value}`` for one object
+    added with :meth:`add`; values with the same labels are summed. Owners
+    are held weakly, so objects that are gone drop out of the output.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Callable[[Any], Dict[Tuple[str, ...], float]] = None,
+                 kind: str = 'gauge'):
+        super().__init__(name, documentation, labelnames)
+        self.kind = kind
+        self._collect = collect
+        self._owners = weakref.WeakSet()
+
+    def add(self, owner: Any):
+        with self._lock:
+            self._owners.add(owner)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            owners = list(self._owners)
+        values: Dict[Tuple[str, ...], float] = {}
+        for owner in owners:
+            for key, value in self._collect(owner).items():
+                values[key] = values.get(key, 0.0) + value
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Registry:
+    """Metrics of the process, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"metric {name} is already registered differently")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def collector(self, name: str, documentation: str, labelnames: Sequence[str],
+                  collect: Callable[[Any], Dict[Tuple[str, ...], float]],
+                  kind: str = 'gauge') -> Collector:
+        return self._get(Collector, name, documentation, labelnames, collect=collect, kind=kind)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return '\n'.join(line for metric in metrics for line in metric.render()) + '\n'
+
+
+REGISTRY = Registry()
+
+
+class Instrument:
+    """Latency histogram, error counter and in-flight gauge for one kind of call.
+
+    Creates ``<prefix>_duration_seconds``, ``<prefix>_errors_total`` and
+    ``<prefix>_in_flight``, all labelled with ``label`` (e.g. the method
+    name). Recording costs two clock reads and three short lock holds, so
+    it stays on in production; with ``Config.METRICS_ENABLED`` off nothing
+    is recorded and :meth:`wrap` returns functions unchanged.
+    """
+
+    def __init__(self, prefix: str, subject: str, label: str = 'operation',
+                 registry: Registry = REGISTRY):
+        self.label = label
+        self.enabled = Config.METRICS_ENABLED
+        title = subject[:1].upper() + subject[1:]
+        self.duration = registry.histogram(f"{prefix}_duration_seconds",
+                                           f"Duration of {subject} in seconds.", (label,))
+        self.errors = registry.counter(f"{prefix}_errors_total",
+                                       f"{title} that raised.", (label,))
+        self.in_flight = registry.gauge(f"{prefix}_in_flight",
+                                        f"{title} currently running.", (label,))
+
+    def track(self, name: str):
+        """Context manager timing the block as one call of ``name``."""
+        if not self.enabled:
+            return nullcontext()
+        return _Span(self, (name,))
+
+    def wrap(self, fn: Callable, name: Optional[str] = None) -> Callable:
+        """Decorate ``fn`` (plain, coroutine or generator function) to be tracked.
+
+        Generators are timed until they are exhausted or closed, not just
+        until the first call returns.
+        """
+        if not self.enabled:
+            return fn
+        key = (name or fn.__name__,)
+        instrument = self
+
+        def track():
+            return _Span(instrument, key)
+
+        if inspect.isasyncgenfunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with track():
+                    async for item in fn(*args, **kwargs):
+                        yield item
+        elif inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with track():
+                    return await fn(*args, **kwargs)
+        elif inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with track():
+                    return (yield from fn(*args, **kwargs))
+        else:
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with track():
+                    return fn(*args, **kwargs)
+        return wrapper
+
+
+class _Span:
+    """One tracked call; a class rather than a generator to keep overhead down."""
+
+    __slots__ = ('instrument', 'key', 'started')
+
+    def __init__(self, instrument: Instrument, key: Tuple[str, ...]):
+        self.instrument = instrument
+        self.key = key
+
+    def __enter__(self):
+        self.instrument.in_flight.inc_key(self.key)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        instrument = self.instrument
+        instrument.duration.observe_key(self.key, time.perf_counter() - self.started)
+        instrument.in_flight.inc_key(self.key, -1.0)
+        if exc_type is not None:
+            instrument.errors.inc_key(self.key)
+        return False
+
+
+def instrument_methods(instrument: Instrument, exclude: Iterable[str] = ()) -> Callable:
+    """Class decorator tracking every public method of the class with ``instrument``.
+
+    Static and class methods, properties and the names in ``exclude`` are
+    left alone.
+    """
+    excluded = set(exclude)
+
+    def decorate(cls):
+        for name, attribute in list(vars(cls).items()):
+            if name.startswith('_') or name in excluded or not inspect.isfunction(attribute):
+                continue
+            setattr(cls, name, instrument.wrap(attribute, name))
+        return cls
+
+    return decorate
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_metrics_server(host: Optional[str] = None, port: Optional[int] = None,
+                         registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serve ``/metrics`` for Prometheus from a daemon thread.
+
+    Raises:
+        OSError: if the address cannot be bound (e.g. another process has it).
+    """
+    server = ThreadingHTTPServer(
+        (host or Config.METRICS_HOST, Config.METRICS_PORT if port is None else port),
+        _MetricsHandler
+    )
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
@@ -0,0 +1,45 @@
+from typing import Any, Callable, Dict, MutableMapping, Tuple
+
+
+class SessionCache:
+    """Memo of database reads kept for one user session.
+
+    Entries live in ``store`` (``st.session_state`` in the app), so they
+    survive reruns but are never shared between users. Keys are tuples
+    that start with the kind of data, e.g. ``('history', user_id, cursor)``;
+    code that writes that data calls :meth:`invalidate` with the leading
+    part of the key so the next read goes to the database again.
+    """
+
+    def __init__(self, store: MutableMapping[str, Any], name: str = 'data_cache'):
+        if name not in store:
+            store[name] = {'entries': {}, 'hits': 0, 'misses': 0}
+        self._state = store[name]
+
+    def get(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key``, calling ``loader`` on a miss."""
+        entries = self._state['entries']
+        if key in entries:
+            self._state['hits'] += 1
+            return entries[key]
+        self._state['misses'] += 1
+        value = entries[key] = loader()
+        return value
+
+    def invalidate(self, *prefix: Any) -> int:
+        """Drop every entry whose key starts with ``prefix``; return how many."""
+        entries = self._state['entries']
+        stale = [key for key in entries if key[:len(prefix)] == prefix]
+        for key in stale:
+            del entries[key]
+        return len(stale)
+
+    def clear(self):
+        self._state['entries'].clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._state['entries']),
+            'hits': self._state['hits'],
+            'misses': self._state['misses'],
+        }
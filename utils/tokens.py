@@ -0,0 +1,25 @@
+import re
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a local approximation
+    tiktoken = None
+
+_encoding = None
+_WORD_PIECE = re.compile(r"\w+|[^\w\s]")
+
+def count_tokens(text: str) -> int:
+    """Count prompt tokens locally.
+
+    Uses tiktoken's cl100k_base encoding when it is installed; otherwise
+    approximates it by counting words and punctuation, splitting long words
+    into 4-character pieces.
+    """
+    global _encoding
+    if not text:
+        return 0
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding('cl100k_base')
+        return len(_encoding.encode(text))
+    return sum((len(piece) + 3) // 4 for piece in _WORD_PIECE.findall(text))